@@ -25,7 +25,7 @@ carp = openep.load_opencarp(
     scale_points=1000,
 )
 carp.add_landmark('a', 'b', point=np.array([0, 0, 0]))
-unipolar = np.loadtxt("/Users/paul/github/openep-misc/examples/data/pig21_endo_coarse_phie.dat")
+unipolar = openep.io.readers.load_opencarp_signals("/Users/paul/github/openep-misc/examples/data/pig21_endo_coarse_phie.dat")
 carp.add_unipolar_electrograms(unipolar=unipolar)
 
 openep.export_openep_mat(carp, 'test-export.mat')
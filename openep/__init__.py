@@ -16,10 +16,48 @@
 # You should have received a copy of the GNU General Public License along
 # with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
 
-__all__ = ['case', 'mesh', 'draw']
+__all__ = ['case', 'mesh', 'draw', 'batch']
 
-from .io.readers import load_openep_mat, load_opencarp, load_circle_cvi, load_vtk
-from .io.writers import export_openCARP, export_openep_mat, export_vtk
-from .converters.pyvista_converters import from_pyvista, to_pyvista
-from . import case, mesh, draw
-from .case import interpolators
+import importlib
+
+# Functions and modules are only imported when they are first accessed, e.g. `openep.draw`
+# does not import matplotlib and pyvista until it is used.
+_ATTRIBUTES = {
+    'load_openep_mat': '.io.readers',
+    'load_openep_npz': '.io.readers',
+    'load_opencarp': '.io.readers',
+    'load_opencarp_signals': '.io.readers',
+    'load_circle_cvi': '.io.readers',
+    'load_vtk': '.io.readers',
+    'export_openCARP': '.io.writers',
+    'export_openep_mat': '.io.writers',
+    'export_openep_npz': '.io.writers',
+    'export_vtk': '.io.writers',
+    'from_pyvista': '.converters.pyvista_converters',
+    'to_pyvista': '.converters.pyvista_converters',
+}
+_SUBMODULES = {
+    'case': '.case',
+    'mesh': '.mesh',
+    'draw': '.draw',
+    'batch': '.batch',
+    'io': '.io',
+    'interpolators': '.case.interpolators',
+}
+
+
+def __getattr__(name):
+
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(_ATTRIBUTES[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(_SUBMODULES[name], __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES) | set(_SUBMODULES))
@@ -0,0 +1,434 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""
+Analyse many cases in parallel - :mod:`openep.batch`
+====================================================
+
+This module provides methods for running the same analysis over many cases
+using a pool of worker processes.
+
+An analysis is defined as a pipeline: a list of :class:`Step` objects, each of
+which calls an openep routine. Each case is loaded and analysed in a worker
+process, and the results are written to a CSV file as soon as each case has
+been analysed. If loading or analysing a case fails, the error is recorded and
+the remaining cases are still analysed.
+
+.. autoclass:: Step
+
+.. autofunction:: run_batch
+
+.. autofunction:: voltage_pipeline
+
+.. autoclass:: CaseFailure
+
+Example
+-------
+
+    The area of tissue with a bipolar voltage below 0.5 mV, and the mean voltage,
+    in each region of every case in a directory can be calculated using::
+
+        import glob
+        import openep.batch
+
+        failures = openep.batch.run_batch(
+            paths=glob.glob('cases/*.mat'),
+            pipeline=openep.batch.voltage_pipeline(threshold=0.5),
+            output='results.csv',
+            n_jobs=8,
+        )
+
+Note
+----
+The results are written in 'long' format, with one row per value: the columns are the
+path to the case, the name of the step, the index of the value within the result of
+the step, the region of the value, and the value itself. This allows steps to return
+arrays whose size differs between cases, e.g. per-region results. The region is only
+written for steps that have `regions` set, such as the per-region steps of
+:func:`voltage_pipeline`, and is otherwise left empty.
+
+"""
+
+import csv
+import functools
+import multiprocessing
+import os
+import traceback
+from typing import Callable, Sequence
+
+import numpy as np
+from attr import attrs
+
+__all__ = ['Step', 'CaseFailure', 'run_batch', 'voltage_pipeline']
+
+_OUTPUT_COLUMNS = ['case', 'step', 'index', 'region', 'value']
+_FAILURE_COLUMNS = ['case', 'step', 'error_type', 'message']
+
+
+@attrs(auto_attribs=True, auto_detect=True)
+class Step:
+    """A single step of an analysis pipeline.
+
+    Each input is looked up by name when the step is run. An input can be:
+
+    * 'case' - the case being analysed.
+    * 'mesh' - a mesh of the case, created using :meth:`openep.data_structures.case.Case.create_mesh`.
+      The mesh is created only once per case.
+    * 'case.<attribute>' - an attribute of the case, e.g. 'case.fields.cell_region'.
+    * the name of an earlier step - the value returned by that step.
+
+    Args:
+        name (str): name of the step. This is used to identify the results in the output
+            and to refer to the value returned by the step in later steps.
+        function (callable): routine to call. This must be defined at the top level of
+            a module so that it can be sent to the worker processes.
+        inputs (Sequence[str]): names of the positional arguments to pass to `function`.
+            The default is ('case',).
+        kws (dict, optional): keyword arguments to pass to `function`.
+        target (str, optional): If provided, the value returned by `function` is also assigned
+            to this attribute of the case, e.g. 'case.electric.bipolar_egm.voltage'. This allows
+            later steps that read data from the case to use the value.
+        save (bool): If True, the value returned by `function` is written to the output.
+            The default is True.
+        regions (str, optional): For routines that return one value per region, such as
+            :func:`openep.mesh.mean_field_per_region`, the name of the input that gives the region
+            of each cell, e.g. 'case.fields.cell_region'. The values are then written with their
+            region labels, which are taken to be the unique regions in ascending order.
+    """
+
+    name: str
+    function: Callable
+    inputs: Sequence[str] = ('case',)
+    kws: dict = None
+    target: str = None
+    save: bool = True
+    regions: str = None
+
+    def __repr__(self):
+        return f"Step {self.name}: {getattr(self.function, '__name__', self.function)}{tuple(self.inputs)}"
+
+    def __call__(self, namespace):
+        """Run the step, looking up its inputs in the namespace of the case being analysed."""
+
+        args = [namespace[name] for name in self.inputs]
+        kws = {} if self.kws is None else self.kws
+
+        return self.function(*args, **kws)
+
+
+@attrs(auto_attribs=True, auto_detect=True)
+class CaseFailure:
+    """Details of a case that could not be analysed.
+
+    Args:
+        case (str): path to the case
+        step (str): name of the step that failed, or 'load' if the case could not be loaded
+        error_type (str): name of the exception that was raised
+        message (str): the exception message
+        traceback (str): the formatted traceback of the exception
+    """
+
+    case: str
+    step: str
+    error_type: str
+    message: str
+    traceback: str = ''
+
+    def __repr__(self):
+        return f"CaseFailure: {self.case} failed at step '{self.step}' with {self.error_type}: {self.message}"
+
+
+class _Namespace(dict):
+    """Values available as inputs to the steps of a pipeline, for a single case."""
+
+    def __init__(self, case):
+        super().__init__(case=case)
+
+    def __missing__(self, name):
+
+        if name == 'mesh':
+            self['mesh'] = self['case'].create_mesh()
+            return self['mesh']
+
+        if name.startswith('case.'):
+            return functools.reduce(getattr, name.split('.')[1:], self['case'])
+
+        raise KeyError(f"Unknown input '{name}'. Inputs must be 'case', 'mesh', 'case.<attribute>' or an earlier step.")
+
+
+def _set_attribute(case, target, value):
+    """Assign a value to an attribute of a case, given as 'case.<attribute>'."""
+
+    *parents, attribute = target.split('.')[1:]
+    setattr(functools.reduce(getattr, parents, case), attribute, value)
+
+
+def _to_rows(name, result, regions=None):
+    """Convert the result of a step to rows of (step, index, region, value).
+
+    If `regions` (the region of each cell) is given, the result must have one value per unique region.
+    Otherwise, the region of each row is left empty.
+    """
+
+    values = np.ravel(np.asarray(result)).tolist()
+    if regions is None:
+        return [(name, index, '', value) for index, value in enumerate(values)]
+
+    labels = np.unique(regions).tolist()
+    if len(labels) != len(values):
+        raise ValueError(f"Step '{name}' returned {len(values)} values, but there are {len(labels)} regions.")
+
+    return [(name, index, label, value) for index, (label, value) in enumerate(zip(labels, values))]
+
+
+def _load_case(path, **kwargs):
+    """Load a case from an OpenEP MATLAB file or an OpenEP npz file."""
+
+    from .io.readers import load_openep_mat, load_openep_npz
+
+    if os.path.splitext(path)[1].lower() == '.npz':
+        return load_openep_npz(path, **kwargs)
+
+    return load_openep_mat(path, **kwargs)
+
+
+def _create_pool(n_jobs, initializer=None, initargs=(), max_tasks_per_child=None):
+    """Create a pool of worker processes.
+
+    Where available, workers are forked from a server process rather than from the current
+    process. Forking a process after numba has started its threading layer (e.g. after calling
+    a function compiled with `parallel=True`) can cause the process to hang.
+    """
+
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['openep.batch', 'openep.io.readers'])
+    else:
+        context = multiprocessing.get_context()
+
+    return context.Pool(
+        processes=n_jobs,
+        initializer=initializer,
+        initargs=initargs,
+        maxtasksperchild=max_tasks_per_child,
+    )
+
+
+def _initialise_worker(memory_limit):
+    """Limit the virtual memory available to a worker process."""
+
+    if memory_limit is None:
+        return
+
+    import resource
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard_limit))
+
+
+def _analyse_case(path, pipeline, loader, load_kws):
+    """Load and analyse a single case.
+
+    Returns:
+        path (str): path to the case
+        rows (list): the results of all steps that are to be saved. Empty if any step failed.
+        failure (CaseFailure): details of the error if any step failed, otherwise None.
+    """
+
+    step_name = 'load'
+    try:
+        case = loader(path, **load_kws)
+        namespace = _Namespace(case)
+
+        rows = []
+        for step in pipeline:
+            step_name = step.name
+            result = step(namespace)
+            namespace[step.name] = result
+            if step.target is not None:
+                _set_attribute(case, step.target, result)
+            if step.save:
+                regions = None if step.regions is None else namespace[step.regions]
+                rows.extend(_to_rows(step.name, result, regions))
+
+    except Exception as error:
+        failure = CaseFailure(
+            case=path,
+            step=step_name,
+            error_type=type(error).__name__,
+            message=str(error),
+            traceback=traceback.format_exc(),
+        )
+        return path, [], failure
+
+    return path, rows, None
+
+
+def run_batch(
+    paths,
+    pipeline,
+    output,
+    failures_output=None,
+    loader=None,
+    load_kws=None,
+    n_jobs=None,
+    max_tasks_per_child=1,
+    memory_limit=None,
+):
+    """Run an analysis pipeline over many cases using a pool of worker processes.
+
+    Args:
+        paths (Sequence[str]): paths to the cases to analyse.
+        pipeline (Sequence[Step]): the steps to run for each case, in order.
+        output (str): path to the CSV file to which the results will be written. Results are
+            written as soon as each case has been analysed.
+        failures_output (str, optional): path to a CSV file to which the details of each case that
+            could not be analysed will be written.
+        loader (callable, optional): function used to load a case from its path. The default is to
+            use :func:`openep.load_openep_npz` for '.npz' files and :func:`openep.load_openep_mat`
+            otherwise.
+        load_kws (dict, optional): keyword arguments to pass to `loader`, e.g.
+            `{'exclude': {'electric.ecg'}}` to avoid reading data that are not needed.
+        n_jobs (int, optional): number of worker processes. The default is None, in which case
+            the number of CPUs is used. If 1 and `memory_limit` is None, the cases are analysed
+            in the current process.
+        max_tasks_per_child (int, optional): number of cases each worker process analyses before it
+            is replaced by a new process. This returns all memory used by a worker to the operating
+            system. The default is 1. If None, worker processes are never replaced.
+        memory_limit (int, optional): maximum number of bytes of virtual memory each worker process
+            can use. Cases that need more than this fail with a MemoryError rather than exhausting
+            the memory of the machine. Only available on Unix.
+
+    Returns:
+        failures (list[CaseFailure]): details of each case that could not be analysed.
+
+    Note
+    ----
+    If any step fails for a case, no results for that case are written to `output`.
+
+    Warning
+    -------
+    Worker processes are not forked from the current process, so the `pipeline` and `loader` must
+    be importable, and scripts that call this function must protect their entry point with
+    ``if __name__ == '__main__':``.
+
+    """
+
+    paths = [os.fspath(path) for path in paths]
+    analyse_case = functools.partial(
+        _analyse_case,
+        pipeline=list(pipeline),
+        loader=_load_case if loader is None else loader,
+        load_kws={} if load_kws is None else load_kws,
+    )
+
+    failures = []
+    pool = None
+
+    with open(output, 'w', newline='') as output_file, \
+            open(os.devnull if failures_output is None else failures_output, 'w', newline='') as failures_file:
+
+        writer = csv.writer(output_file)
+        writer.writerow(_OUTPUT_COLUMNS)
+        failures_writer = csv.writer(failures_file)
+        failures_writer.writerow(_FAILURE_COLUMNS)
+
+        if n_jobs == 1 and memory_limit is None:
+            results = map(analyse_case, paths)
+        else:
+            pool = _create_pool(
+                n_jobs,
+                initializer=_initialise_worker,
+                initargs=(memory_limit,),
+                max_tasks_per_child=max_tasks_per_child,
+            )
+            results = pool.imap_unordered(analyse_case, paths, chunksize=1)
+
+        try:
+            for path, rows, failure in results:
+
+                if failure is not None:
+                    failures.append(failure)
+                    failures_writer.writerow([failure.case, failure.step, failure.error_type, failure.message])
+                    failures_file.flush()
+                    continue
+
+                writer.writerows((path, *row) for row in rows)
+                output_file.flush()
+
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    return failures
+
+
+def voltage_pipeline(threshold=0.5, buffer=50, bipolar=True, neighbors=None):
+    """Create a pipeline for calculating low-voltage areas and mean voltages per region.
+
+    Voltages are calculated from the electrograms at each mapping point, then interpolated
+    onto the surface. The area of each region with a voltage at or below `threshold`, and the mean
+    voltage of each region, are then calculated. The regions are given by `case.fields.cell_region`.
+
+    Args:
+        threshold (float): cells with an interpolated voltage less than or equal to this value are
+            included in the low-voltage area.
+        buffer (float): passed to :func:`openep.case.calculate_voltage_from_electrograms`.
+        bipolar (bool): If True, bipolar electrograms are used. Otherwise, unipolar electrograms
+            are used.
+        neighbors (int, optional): passed to :func:`openep.case.interpolate_voltage_onto_surface`.
+
+    Returns:
+        pipeline (list[Step]): the steps of the pipeline, with results saved for the steps named
+        'low_voltage_area' and 'mean_voltage', each with the label of its region.
+    """
+
+    from .case.case_routines import calculate_voltage_from_electrograms, interpolate_voltage_onto_surface
+    from .mesh.mesh_routines import low_field_area_per_region, mean_field_per_region
+
+    egm_type = 'bipolar_egm' if bipolar else 'unipolar_egm'
+    cell_data = ('mesh', 'interpolated_voltage', 'case.fields.cell_region')
+
+    return [
+        Step(
+            name='voltage',
+            function=calculate_voltage_from_electrograms,
+            kws={'buffer': buffer, 'bipolar': bipolar},
+            target=f'case.electric.{egm_type}.voltage',
+            save=False,
+        ),
+        Step(
+            name='interpolated_voltage',
+            function=interpolate_voltage_onto_surface,
+            kws={'bipolar': bipolar, 'neighbors': neighbors},
+            save=False,
+        ),
+        Step(
+            name='low_voltage_area',
+            function=low_field_area_per_region,
+            inputs=cell_data,
+            kws={'threshold': threshold},
+            regions='case.fields.cell_region',
+        ),
+        Step(
+            name='mean_voltage',
+            function=mean_field_per_region,
+            inputs=cell_data,
+            regions='case.fields.cell_region',
+        ),
+    ]
@@ -1,13 +1,34 @@
 __all__ = ['case_routines']
 
-from .case_routines import (
-    get_mapping_points_within_woi,
-    get_electrograms_at_points,
-    calculate_voltage_from_electrograms,
-    calculate_distance,
-    calculate_points_within_distance,
-    Interpolator,
-    interpolate_activation_time_onto_surface,
-    interpolate_voltage_onto_surface,
-    bipolar_from_unipolar_surface_points,
-)
+import importlib
+
+# Functions are only imported from `case_routines` when they are first accessed
+_ATTRIBUTES = [
+    'get_mapping_points_within_woi',
+    'get_electrograms_at_points',
+    'calculate_voltage_from_electrograms',
+    'calculate_distance',
+    'calculate_points_within_distance',
+    'Interpolator',
+    'InterpolatorCache',
+    'interpolate_activation_time_onto_surface',
+    'interpolate_voltage_onto_surface',
+    'bipolar_from_unipolar_surface_points',
+]
+
+
+def __getattr__(name):
+
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module('.case_routines', __name__), name)
+    elif name in ['case_routines', 'interpolators', 'features']:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES) | {'case_routines', 'interpolators', 'features'})
@@ -56,15 +56,54 @@ Tip
     class and associated keyword arguments to the `method` and `method_kws`
     arugments respectively.
 
+Local interpolation
+^^^^^^^^^^^^^^^^^^^
+
+    The default interpolant is a global radial basis function, which requires solving
+    a dense linear system that grows with the square of the number of mapping points.
+    Creating the interpolant therefore takes time proportional to the cube of the number
+    of mapping points. For cases with many thousands of mapping points, a local interpolant
+    can be used instead by passing `neighbors` to :func:`interpolate_voltage_onto_surface` or
+    :func:`interpolate_activation_time_onto_surface`. The value at each surface point is then
+    calculated using only its `neighbors` nearest mapping points.
+
+    As a guide, for ~60,000 surface points and `neighbors=50`, the time taken to
+    interpolate is approximately independent of the number of mapping points (~5 s),
+    whereas the global interpolant took ~5 s for 5,000 mapping points and ~20 s for
+    10,000 mapping points. The median difference between the local and global
+    interpolants was <0.3% of the range of the interpolated field, and the maximum
+    difference ~1%. Increasing `neighbors` reduces this difference, but the cost of
+    the local interpolant grows with the cube of `neighbors`.
+
 .. autoclass:: Interpolator
     :members: __call__
 
+Reusing interpolators
+^^^^^^^^^^^^^^^^^^^^^
+
+    By default, :func:`interpolate_voltage_onto_surface` and :func:`interpolate_activation_time_onto_surface`
+    create a new interpolator each time they are called. If an :class:`InterpolatorCache` is passed
+    as `cache`, the interpolators are stored in it instead, and calling either function again with the
+    same mapping points, field values, method and method keyword arguments (e.g. while changing
+    `max_distance`) reuses the fitted interpolator rather than creating a new one. Least-recently used
+    interpolators are removed when the cache exceeds `cache.max_memory` bytes.
+
+.. autoclass:: InterpolatorCache
+    :members: get, clear, info
+
 """
 
 from attr import attrs
+from collections import OrderedDict
+import hashlib
+import types
 
 import numpy as np
+import numba
 import scipy.interpolate
+import scipy.spatial
+
+from ..data_structures.electric import Electrogram, _INT16_NAN
 
 __all__ = [
     'get_mapping_points_within_woi',
@@ -73,6 +112,7 @@ __all__ = [
     'calculate_distance',
     'calculate_points_within_distance',
     'Interpolator',
+    'InterpolatorCache',
     'interpolate_activation_time_onto_surface',
     'interpolate_voltage_onto_surface',
     'bipolar_from_unipolar_surface_points',
@@ -266,17 +306,9 @@ def get_sample_indices_within_woi(case, buffer=50, indices=None):
     # if we have a single index we need to ensure it is an array
     indices = np.asarray([indices], dtype=int) if isinstance(indices, int) else indices
 
-    if indices is None:
-        egm = case.electric.bipolar_egm.egm
-        woi = case.electric.annotations.window_of_interest
-        ref_annotations = case.electric.annotations.reference_activation_time[:, np.newaxis]
-    else:
-        egm = case.electric.bipolar_egm.egm[indices]
-        woi = case.electric.annotations.window_of_interest[indices]
-        ref_annotations = case.electric.annotations.reference_activation_time[indices, np.newaxis]
-
-    sample_indices = np.full_like(egm, fill_value=np.arange(egm.shape[1]), dtype=int)
-    start_time, stop_time = (woi + ref_annotations + [-buffer, buffer]).T
+    egm, _ = _stored_electrograms(case.electric.bipolar_egm)
+    start_time, stop_time = _window_of_interest_limits(case, buffer=buffer, indices=indices)
+    sample_indices = np.arange(egm.shape[1])
 
     within_woi = np.logical_and(
         sample_indices >= start_time[:, np.newaxis],
@@ -286,6 +318,109 @@ def get_sample_indices_within_woi(case, buffer=50, indices=None):
     return within_woi  # This is now a 2D array that can be used to index into electrograms and calculate voltages.
 
 
+def _window_of_interest_limits(case, buffer=50, indices=None):
+    """
+    Get the first and last time of the window of interest, plus/minus the buffer, for each mapping point.
+
+    Returns:
+        start_time, stop_time (ndarray): the limits of the window of interest of each point.
+    """
+
+    woi = _get_window_of_interest(case, indices=indices)
+    ref_annotations = _get_reference_annotation(case, indices=indices)[:, np.newaxis]
+    start_time, stop_time = (woi + ref_annotations + [-buffer, buffer]).T
+
+    return start_time, stop_time
+
+
+def _window_of_interest_samples(case, n_samples, buffer=50, indices=None):
+    """
+    Get the first and last sample within the window of interest, plus/minus the buffer, for each mapping point.
+
+    These are the first and last samples for which :func:`get_sample_indices_within_woi` is True.
+    If a window contains no samples, the last sample is before the first.
+
+    Returns:
+        first_sample, last_sample (ndarray): the first and last (inclusive) sample of each window.
+    """
+
+    start_time, stop_time = _window_of_interest_limits(case, buffer=buffer, indices=indices)
+
+    # Windows with a NaN limit (e.g. a missing reference annotation) contain no samples
+    is_empty = np.isnan(start_time) | np.isnan(stop_time)
+    start_time = np.where(is_empty, 0, start_time)
+    stop_time = np.where(is_empty, -1, stop_time)
+
+    first_sample = np.clip(np.ceil(start_time), 0, n_samples).astype(np.int64)
+    last_sample = np.clip(np.floor(stop_time), -1, n_samples - 1).astype(np.int64)
+
+    return first_sample, last_sample
+
+
+def _stored_electrograms(electrogram):
+    """
+    Get electrograms as they are stored, so that electrograms stored as int16 do not need to be decoded.
+
+    Args:
+        electrogram (Electrogram): bipolar, unipolar or reference electrograms.
+
+    Returns:
+        egm (ndarray): the stored electrograms of the electrical points.
+        scale (ndarray): the value of one int16 step of each trace, or None if the electrograms are
+            not stored as int16.
+    """
+
+    if isinstance(electrogram, Electrogram):
+        egm, scale = electrogram._stored_egm()
+    else:
+        egm, scale = electrogram.egm, None
+
+    return np.asarray(egm), scale
+
+
+@numba.jit(nopython=True, cache=True, parallel=True)
+def _peak_to_peak_within_window(signals, rows, first_sample, last_sample, missing):
+    """
+    Calculate the peak-to-peak amplitude of each selected signal within a window of samples.
+
+    Each signal is read once, and only within its window. Samples that are NaN or equal to `missing`
+    are ignored. The amplitude is NaN if no samples within the window are valid.
+
+    Args:
+        signals (np.ndarray): signals of shape (N_signals, N_samples)
+        rows (np.ndarray): index of each selected signal
+        first_sample (np.ndarray): first sample of the window of each selected signal
+        last_sample (np.ndarray): last sample (inclusive) of the window of each selected signal
+        missing (float): value that represents a missing sample, e.g. the int16 code of NaN
+
+    Returns:
+        amplitudes (np.ndarray): peak-to-peak amplitude of each selected signal
+    """
+
+    n_rows = rows.size
+    amplitudes = np.full(n_rows, fill_value=np.NaN)
+
+    for index in numba.prange(n_rows):
+
+        row = rows[index]
+        max_value = -np.inf
+        min_value = np.inf
+
+        for sample in range(first_sample[index], last_sample[index] + 1):
+            value = signals[row, sample]
+            if value != value or value == missing:
+                continue
+            if value > max_value:
+                max_value = value
+            if value < min_value:
+                min_value = value
+
+        if max_value >= min_value:
+            amplitudes[index] = max_value - min_value
+
+    return amplitudes
+
+
 def calculate_voltage_from_electrograms(case, buffer=50, bipolar=True, indices=None):
     """
     Calculates the peak-to-peak voltage from electrograms.
@@ -302,21 +437,34 @@ def calculate_voltage_from_electrograms(case, buffer=50, bipolar=True, indices=N
 
     Returns:
         voltages (ndarray): Bipolar voltages
+
+    Note
+    ----
+    The electrograms are not copied or masked. Each electrogram is read once, and only the
+    samples within its window of interest are read. Electrograms stored as int16 are used
+    without being decoded.
     """
 
     # if we have a single index we need to ensure it is an array
     indices = np.asarray([indices], dtype=int) if isinstance(indices, int) else indices
 
     if bipolar:
-        electrograms = case.electric.bipolar_egm.egm.copy() if indices is None else case.electric.bipolar_egm.egm[indices].copy()
+        electrograms, scale = _stored_electrograms(case.electric.bipolar_egm)
     else:
         # Use only the proximal unipolar data
-        electrograms = case.electric.unipolar_egm.egm[:, :, 0].copy() if indices is None else case.electric.unipolar_egm.egm[indices, :, 0].copy()
+        electrograms, scale = _stored_electrograms(case.electric.unipolar_egm)
+        electrograms = electrograms[:, :, 0]
+        scale = scale[:, 0] if scale is not None else None
+
+    n_points, n_samples = electrograms.shape
+    rows = np.arange(n_points) if indices is None else np.arange(n_points)[indices]
+    first_sample, last_sample = _window_of_interest_samples(case, n_samples, buffer=buffer, indices=indices)
 
-    sample_within_woi = get_sample_indices_within_woi(case, buffer=buffer, indices=indices)
-    electrograms[~sample_within_woi] = np.NaN
+    missing = _INT16_NAN if scale is not None else np.NaN
+    amplitudes = _peak_to_peak_within_window(electrograms, rows, first_sample, last_sample, missing)
 
-    amplitudes = np.nanmax(electrograms, axis=1) - np.nanmin(electrograms, axis=1)
+    if scale is not None:
+        amplitudes *= scale[rows]
 
     return amplitudes
 
@@ -422,7 +570,9 @@ class Interpolator:
             **self.method_kws,
         )
 
-    def __call__(self, surface_points, max_distance=None):
+        self._kdtree = None
+
+    def __call__(self, surface_points, max_distance=None, chunk_size=None):
         """Interpolate the scalar field onto a new set of coordinates
 
         Args:
@@ -431,35 +581,215 @@ class Interpolator:
             max_distance (float, optional): Surface points further than this distance from any of the
                 original points will not be used in the interpolation. Instead, their scalar field will
                 be set to NaN. Defaults to None, in which case all surface points will used.
+            chunk_size (int, optional): If provided, the surface points will be interpolated in blocks
+                of at most this many points, and the results written into a preallocated array. This
+                bounds the peak memory used when interpolating onto very dense meshes. Defaults to None,
+                in which case all surface points are interpolated at once.
 
         Returns:
             interpolated_field (ndarray): Scalar field interpolated onto the new points.
         """
 
-        interpolated_field = self.interpolate(surface_points)
+        if chunk_size is None or chunk_size >= len(surface_points):
+            return self._interpolate_chunk(surface_points, max_distance=max_distance)
 
-        if max_distance is not None:
-            within_distance = calculate_points_within_distance(
-                surface_points,
-                self.points,
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, not {chunk_size}.")
+
+        n_surface_points = len(surface_points)
+        interpolated_field = np.empty((n_surface_points, *np.shape(self.field)[1:]), dtype=float)
+
+        for start in range(0, n_surface_points, chunk_size):
+            stop = min(start + chunk_size, n_surface_points)
+            interpolated_field[start:stop] = self._interpolate_chunk(
+                surface_points[start:stop],
                 max_distance=max_distance,
-                return_distances=False
             )
-            within_distance = np.any(within_distance, axis=1)
-            interpolated_field[~within_distance] = np.NaN
 
         return interpolated_field
 
+    def _interpolate_chunk(self, surface_points, max_distance=None):
+        """Interpolate the scalar field onto a block of surface points."""
+
+        interpolated_field = self.interpolate(surface_points)
+
+        if max_distance is not None:
+            distance_to_nearest, _ = self.kdtree.query(surface_points)
+            interpolated_field[distance_to_nearest > max_distance] = np.NaN
+
+        return interpolated_field
+
+    @property
+    def kdtree(self):
+        """KD-tree of the points for which we know the values of the scalar field."""
+
+        if self._kdtree is None:
+            self._kdtree = scipy.spatial.cKDTree(self.points)
+
+        return self._kdtree
+
     def __repr__(self):
         return f"Interpolator: method={self.method}, kws={self.method_kws}"
 
 
+class InterpolatorCache:
+    """Least-recently-used cache of fitted interpolators.
+
+    Interpolators are identified by a hash of the points, field values, method
+    and method keyword arguments used to create them.
+
+    Args:
+        max_memory (int): Approximate maximum number of bytes used by the arrays
+            of all cached interpolators. The least-recently used interpolators are
+            removed when this is exceeded. Defaults to 256 MiB.
+    """
+
+    def __init__(self, max_memory=256 * 1024**2):
+        self.max_memory = max_memory
+        self._interpolators = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._interpolators)
+
+    def __repr__(self):
+        return f"InterpolatorCache with {len(self)} interpolators using {self.memory} bytes."
+
+    @property
+    def memory(self):
+        """Approximate number of bytes used by the cached interpolators."""
+        return sum(_interpolator_nbytes(interpolator) for interpolator in self._interpolators.values())
+
+    def get(self, points, field, method=scipy.interpolate.RBFInterpolator, method_kws=None):
+        """Get a fitted interpolator, creating it only if it is not already cached.
+
+        Args:
+            points (np.ndarray): (N,3) array of coordinates for which we know values
+                of the scalar field
+            field (np.ndarray): array of size N of scalar values
+            method (callable): method to use for interpolation
+            method_kws (dict): dictionary of keyword arguments to pass to `method`
+
+        Returns:
+            interpolator (Interpolator): the fitted interpolator
+        """
+
+        key = _hash_interpolator_inputs(points, field, method, method_kws)
+
+        if key in self._interpolators:
+            self.hits += 1
+            self._interpolators.move_to_end(key)
+            return self._interpolators[key]
+
+        self.misses += 1
+        interpolator = Interpolator(points, field, method=method, method_kws=method_kws)
+        self._interpolators[key] = interpolator
+
+        while self._interpolators and self.memory > self.max_memory:
+            self._interpolators.popitem(last=False)
+
+        return interpolator
+
+    def clear(self):
+        """Remove all interpolators from the cache and reset the hit and miss counts."""
+
+        self._interpolators.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Summarise the contents of the cache.
+
+        Returns:
+            info (dict): number of cached interpolators, approximate memory used, memory cap,
+                and the number of cache hits and misses.
+        """
+
+        return {
+            'n_interpolators': len(self),
+            'memory': self.memory,
+            'max_memory': self.max_memory,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+def _hash_interpolator_inputs(points, field, method, method_kws):
+    """Create a key that identifies an interpolator from the data used to create it."""
+
+    key = hashlib.sha1()
+
+    for array in (points, field):
+        array = np.ascontiguousarray(array)
+        key.update(f"{array.dtype}{array.shape}".encode())
+        key.update(array.tobytes())
+
+    key.update(f"{getattr(method, '__module__', '')}.{getattr(method, '__qualname__', repr(method))}".encode())
+
+    method_kws = {} if method_kws is None else method_kws
+    for name in sorted(method_kws):
+        value = method_kws[name]
+        key.update(name.encode())
+        if isinstance(value, np.ndarray):
+            key.update(np.ascontiguousarray(value).tobytes())
+        else:
+            key.update(repr(value).encode())
+
+    return key.hexdigest()
+
+
+def _interpolator_nbytes(interpolator):
+    """Approximate the memory used by the arrays of an interpolator.
+
+    The arrays in the attributes of the interpolator and of the objects they refer to (e.g. the
+    fitted `method` and any KD-trees) are counted, each only once. The memory is measured each time
+    it is needed, as the KD-tree used for `max_distance` is only created when it is first used.
+    """
+
+    nbytes = 0
+    seen = set()
+    objects = [interpolator]
+    while objects:
+
+        obj = objects.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            nbytes += obj.nbytes
+        elif isinstance(obj, scipy.spatial.cKDTree):
+            objects.extend([obj.data, obj.indices])
+        elif isinstance(obj, (list, tuple)):
+            objects.extend(obj)
+        elif isinstance(obj, dict):
+            objects.extend(obj.values())
+        elif hasattr(obj, '__dict__'):
+            objects.extend(vars(obj).values())
+
+    return nbytes
+
+
+def _add_neighbors_to_kws(method_kws, neighbors):
+    """Add the number of neighbours used for local interpolation to the method keyword arguments."""
+
+    if neighbors is None:
+        return method_kws
+
+    method_kws = {} if method_kws is None else method_kws
+    return {**method_kws, 'neighbors': neighbors}
+
+
 def interpolate_activation_time_onto_surface(
         case,
         method=scipy.interpolate.RBFInterpolator,
         method_kws=None,
         max_distance=None,
         include=None,
+        chunk_size=None,
+        neighbors=None,
+        cache=None,
 ):
     """Interpolate local activation times onto the points of a mesh.
 
@@ -477,6 +807,18 @@ def interpolate_activation_time_onto_surface(
             the distance from surface points to mapping points is not considered.
         include (np.ndarray, optional): Flag for which mapping points to include when creating
             the interpolator. If None, `case.electric.include` will be used.
+        chunk_size (int, optional): If provided, the activation times will be interpolated onto
+            blocks of at most this many surface points at a time. This bounds the peak memory used
+            for very dense meshes. The default is None, in which case all surface points are
+            interpolated at once.
+        neighbors (int, optional): If provided, a local interpolant will be used: the value at each
+            surface point is calculated using only this many of the nearest mapping points. This is
+            passed to `method` as the `neighbors` keyword argument, and so is only valid if `method`
+            is scipy.interpolate.RBFInterpolator. The default is None, in which case a global
+            interpolant is created using all mapping points.
+        cache (InterpolatorCache, optional): If provided, the interpolator is reused from this cache
+            if it has already been created from the same data, and is otherwise stored in it. The
+            default is None, in which case a new interpolator is created.
 
     Returns:
         interpolated_lat (ndarray): local activation times interpolated onto the surface of the mesh,
@@ -492,14 +834,14 @@ def interpolate_activation_time_onto_surface(
     points = points[include]
     local_activation_times = local_activation_times[include]
 
-    interpolator = Interpolator(
+    interpolator = (Interpolator if cache is None else cache.get)(
         points,
         local_activation_times,
         method=method,
-        method_kws=method_kws,
+        method_kws=_add_neighbors_to_kws(method_kws, neighbors),
     )
 
-    interpolated_lat = interpolator(surface_points, max_distance=max_distance)
+    interpolated_lat = interpolator(surface_points, max_distance=max_distance, chunk_size=chunk_size)
 
     # Any points that are not part of the mesh faces should have bipolar voltage set to NaN
     n_surface_points = surface_points.shape[0]
@@ -516,6 +858,9 @@ def interpolate_voltage_onto_surface(
         max_distance=None,
         include=None,
         bipolar=True,
+        chunk_size=None,
+        neighbors=None,
+        cache=None,
 ):
     """Interpolate voltage onto the points of a mesh.
 
@@ -537,6 +882,18 @@ def interpolate_voltage_onto_surface(
             the interpolator. If None, `case.electric.include` will be used.
         bipolar (bool, optional): If True, the bipolar voltage will be interpolated onto the
             surface. If False, the unipolar voltage will be used instead.
+        chunk_size (int, optional): If provided, the voltages will be interpolated onto
+            blocks of at most this many surface points at a time. This bounds the peak memory used
+            for very dense meshes. The default is None, in which case all surface points are
+            interpolated at once.
+        neighbors (int, optional): If provided, a local interpolant will be used: the value at each
+            surface point is calculated using only this many of the nearest mapping points. This is
+            passed to `method` as the `neighbors` keyword argument, and so is only valid if `method`
+            is scipy.interpolate.RBFInterpolator. The default is None, in which case a global
+            interpolant is created using all mapping points.
+        cache (InterpolatorCache, optional): If provided, the interpolator is reused from this cache
+            if it has already been created from the same data, and is otherwise stored in it. The
+            default is None, in which case a new interpolator is created.
 
     Returns:
         interpolated_voltages (ndarray): bipolar voltages, calculated from the
@@ -553,14 +910,14 @@ def interpolate_voltage_onto_surface(
         points = case.electric.unipolar_egm.points[include, :, 0]  # Use only the proximal unipolar data
         voltages = case.electric.unipolar_egm.voltage[include]
 
-    interpolator = Interpolator(
+    interpolator = (Interpolator if cache is None else cache.get)(
         points,
         voltages,
         method=method,
-        method_kws=method_kws,
+        method_kws=_add_neighbors_to_kws(method_kws, neighbors),
     )
 
-    interpolated_voltages = interpolator(surface_points, max_distance=max_distance)
+    interpolated_voltages = interpolator(surface_points, max_distance=max_distance, chunk_size=chunk_size)
 
     # Any points that are not part of the mesh faces should have bipolar voltage set to NaN
     n_surface_points = surface_points.shape[0]
@@ -573,6 +930,10 @@ def interpolate_voltage_onto_surface(
 def bipolar_from_unipolar_surface_points(unipolar, indices):
     """Calculate bipolar electrograms from unipolar electrograms for each point on a mesh.
 
+    For each point, the bipolar electrogram is the difference between the unipolar electrogram
+    of the point and that of the neighbouring point (i.e. connected by a single edge) that gives
+    the largest peak-to-peak voltage.
+
     Warning
     -------
     The number of unipolar traces **must** be equal to the number of points on the surface.
@@ -589,54 +950,160 @@ def bipolar_from_unipolar_surface_points(unipolar, indices):
         pair_indices (np.ndarray):
             Indices of unipolar electrograms that contribute to each bipolar electrogram.
 
+    Note
+    ----
+    Points that are not referenced by any triangle have no neighbours. Their bipolar
+    electrograms will be all NaN, and they will be paired with themselves.
     """
 
-    bipolar = np.full_like(unipolar, fill_value=np.NaN)
-    pair_indices = np.full((len(unipolar), 2), fill_value=0, dtype=int)
+    unipolar = np.ascontiguousarray(unipolar, dtype=float)
+    n_points = len(unipolar)
 
-    for index, index_unipolar in enumerate(unipolar):
+    # The neighbours are not bounds-checked by _bipolar_from_unipolar
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size > 0 and (indices.min() < 0 or indices.max() >= n_points):
+        raise IndexError(f"indices must refer to one of the {n_points} unipolar electrograms.")
 
-        connected_vertices = _find_connected_vertices(indices, index)
-        index_bipolar, pair_index = _bipolar_from_unipolar(
-            unipolar=index_unipolar,
-            neighbours=unipolar[connected_vertices],
-        )
-        bipolar[index] = index_bipolar
-        pair_indices[index] = [index, connected_vertices[pair_index]]
+    offsets, neighbours = _vertex_adjacency(indices, n_points=n_points)
+
+    bipolar = np.full_like(unipolar, fill_value=np.NaN)
+    pair_indices = np.repeat(np.arange(n_points)[:, np.newaxis], repeats=2, axis=1)
+
+    _bipolar_from_unipolar(
+        unipolar=unipolar,
+        offsets=offsets,
+        neighbours=neighbours,
+        bipolar=bipolar,
+        pair_indices=pair_indices,
+    )
 
     return bipolar, pair_indices
 
 
+def _vertex_adjacency(indices, n_points=None):
+    """
+    Find all points connected to each point by a single edge.
+
+    The adjacency is stored in compressed sparse row (CSR) format: the neighbours of
+    point `i` are given by `neighbours[offsets[i]:offsets[i+1]]`, sorted in ascending order.
+
+    Args:
+        indices (np.ndarray): triangular faces of a mesh
+        n_points (int, optional): number of points in the mesh. If None, this is
+            taken to be one more than the largest index in `indices`.
+
+    Returns:
+        offsets (np.ndarray): array of size n_points + 1 with the start and end positions
+            in `neighbours` of the neighbours of each point.
+        neighbours (np.ndarray): indices of the neighbours of each point.
+    """
+
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+    n_points = int(indices.max()) + 1 if n_points is None else n_points
+
+    # Each triangle contributes three edges, which we store in both directions
+    first = indices.ravel()
+    second = indices[:, [1, 2, 0]].ravel()
+    points = np.concatenate([first, second])
+    neighbours = np.concatenate([second, first])
+
+    # Encode each (point, neighbour) pair as a single integer. Sorting these
+    # groups the neighbours of each point together and lets us remove shared edges.
+    edges = np.unique(points * n_points + neighbours)
+    points, neighbours = np.divmod(edges, n_points)
+    not_degenerate = points != neighbours
+    points = points[not_degenerate]
+    neighbours = neighbours[not_degenerate]
+
+    offsets = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(np.bincount(points, minlength=n_points), out=offsets[1:])
+
+    return offsets, np.ascontiguousarray(neighbours)
+
+
 def _find_connected_vertices(indices, index):
     """
     Find all points connected to a given point by a single edge.
 
     Adapted from: https://github.com/pyvista/pyvista-support/issues/96#issuecomment-571864471
 
+    Note
+    ----
+    This searches every face of the mesh. To find the neighbours of all points,
+    use :func:`_vertex_adjacency` instead.
+
     Args:
         indices (np.ndarray): triangular faces of a mesh
         index (int): index of point for which we want to find the neighbouring points
     """
 
-    connected_faces = [i for i, face in enumerate(indices) if index in face]
+    connected_faces = np.any(indices == index, axis=1)
     connected_vertices = np.unique(indices[connected_faces])
 
     return connected_vertices[connected_vertices != index]
 
 
-def _bipolar_from_unipolar(unipolar, neighbours):
+@numba.jit(nopython=True, cache=True)
+def _peak_to_peak_difference(unipolar, row, other_row):
+    """Calculate the peak-to-peak voltage of `unipolar[row] - unipolar[other_row]`, or NaN if it contains NaNs."""
+
+    max_difference = -np.inf
+    min_difference = np.inf
+    for sample in range(unipolar.shape[1]):
+        difference = unipolar[row, sample] - unipolar[other_row, sample]
+        if np.isnan(difference):
+            return np.nan
+        max_difference = max(max_difference, difference)
+        min_difference = min(min_difference, difference)
+
+    return max_difference - min_difference
+
+
+@numba.jit(nopython=True, cache=True, parallel=True)
+def _bipolar_from_unipolar(unipolar, offsets, neighbours, bipolar, pair_indices):
     """
-    Calculate the bipolar electrogram of a given point from a series of unipolar electrograms.
+    Calculate the bipolar electrogram of every point from the unipolar electrograms.
+
+    For each point, the neighbour whose difference with the point's unipolar electrogram
+    has the largest peak-to-peak voltage is selected. The neighbours are considered in
+    ascending order of index, so the neighbour with the lowest index is selected in the
+    event of a tie. As with `np.argmax`, if the difference with any neighbour contains
+    NaNs, the first such neighbour is selected, whatever the voltages of the others.
+    Points with no neighbours are left unchanged.
+
+    The neighbours are not bounds-checked, and must be valid indices of `unipolar`.
 
     Args:
-        unipolar (np.ndarray): unipolar electrogram at a given point
-        neighbours (np.narray): unipolar electrograms at all points
-            neighbouring the given point
+        unipolar (np.ndarray): unipolar electrograms at all points
+        offsets (np.ndarray): CSR offsets of the neighbours of each point
+        neighbours (np.ndarray): CSR neighbours of each point
+        bipolar (np.ndarray): bipolar electrograms, modified in-place
+        pair_indices (np.ndarray): index of each point and its selected neighbour, modified in-place
     """
 
-    difference = neighbours - unipolar
-    voltage = np.ptp(difference, axis=1)
-    pair_index = np.argmax(voltage)
-    bipolar_electrogram = difference[pair_index]
+    n_points, n_samples = unipolar.shape
+
+    for index in numba.prange(n_points):
+
+        best_voltage = -np.inf
+        best_neighbour = -1
+
+        for neighbour in neighbours[offsets[index]:offsets[index + 1]]:
+
+            voltage = _peak_to_peak_difference(unipolar, neighbour, index)
+
+            if np.isnan(voltage):
+                # mirror np.argmax, which returns the first NaN
+                best_neighbour = neighbour
+                break
+
+            if voltage > best_voltage:
+                best_voltage = voltage
+                best_neighbour = neighbour
+
+        if best_neighbour == -1:
+            continue
 
-    return bipolar_electrogram, pair_index
+        for sample in range(n_samples):
+            bipolar[index, sample] = unipolar[best_neighbour, sample] - unipolar[index, sample]
+        pair_indices[index, 1] = best_neighbour
@@ -0,0 +1,376 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""
+Electrogram features - :mod:`openep.case.features`
+==================================================
+
+This module calculates features of the electrogram of every mapping point
+within its window of interest.
+
+.. autofunction:: calculate_electrogram_features
+
+The following features are available:
+
+* ``bipolar_voltage``: peak-to-peak amplitude of the bipolar electrogram, as calculated by
+  :func:`openep.case.calculate_voltage_from_electrograms`.
+* ``unipolar_voltage``: peak-to-peak amplitude of the proximal unipolar electrogram.
+* ``local_activation_time``: time (ms) of the maximum negative slope (-dV/dt) of the proximal
+  unipolar electrogram.
+* ``n_deflections``: number of deflections of the bipolar electrogram. A deflection is a
+  change in the signal, in one direction, of at least `deflection_threshold`.
+* ``duration``: time (ms) from the start of the first deflection to the end of the last.
+* ``fractionation_index``: mean duration (ms) of the deflections, i.e. ``duration / n_deflections``.
+  Lower values indicate more fractionated electrograms.
+
+Example
+-------
+
+    Calculate the bipolar voltage and number of deflections of each mapping point::
+
+        import openep
+        from openep.case.features import calculate_electrogram_features
+
+        case = openep.load_openep_mat('case.mat')
+        features = calculate_electrogram_features(case, features=['bipolar_voltage', 'n_deflections'])
+        fractionated = features['n_deflections'] >= 6
+
+"""
+
+import numpy as np
+import numba
+
+from .case_routines import _stored_electrograms, _window_of_interest_samples
+from ..data_structures.electric import _INT16_NAN
+
+__all__ = [
+    'FEATURES',
+    'calculate_electrogram_features',
+]
+
+FEATURES = (
+    'bipolar_voltage',
+    'unipolar_voltage',
+    'local_activation_time',
+    'n_deflections',
+    'duration',
+    'fractionation_index',
+)
+
+_BIPOLAR_FEATURES = {'bipolar_voltage', 'n_deflections', 'duration', 'fractionation_index'}
+_UNIPOLAR_FEATURES = {'unipolar_voltage', 'local_activation_time'}
+_FEATURE_DTYPES = {feature: np.int64 if feature == 'n_deflections' else float for feature in FEATURES}
+
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _bipolar_features(signal, scale, first_sample, last_sample, missing, threshold, out):
+    """
+    Calculate the voltage and deflections of a single bipolar electrogram in one pass.
+
+    Deflections are counted with hysteresis: the signal is in a deflection once it has moved by
+    at least `threshold` in one direction, and the deflection ends when the signal has moved back
+    by at least `threshold` from its extreme value.
+
+    Args:
+        signal (np.ndarray): the stored electrogram
+        scale (float): value of one stored unit (1 unless the electrogram is stored as int16)
+        first_sample, last_sample (int): first and last (inclusive) sample of the window
+        missing (float): value that represents a missing sample
+        threshold (float): minimum change of a deflection
+        out (np.ndarray): voltage, number of deflections, first and last sample of the deflections,
+            modified in-place
+    """
+
+    max_value = -np.inf
+    min_value = np.inf
+    max_index = -1
+    min_index = -1
+
+    direction = 0
+    extreme = 0.0
+    extreme_index = -1
+    start_index = -1
+    n_deflections = 0
+
+    for sample in range(first_sample, last_sample + 1):
+
+        stored = signal[sample]
+        if stored != stored or stored == missing:
+            continue
+        value = stored * scale
+
+        if value > max_value:
+            max_value = value
+            max_index = sample
+        if value < min_value:
+            min_value = value
+            min_index = sample
+
+        if direction == 0:
+            # The first deflection starts from the extreme value opposite to the one that triggers it
+            if max_value - min_value >= threshold:
+                direction = 1 if max_index == sample else -1
+                start_index = min_index if direction == 1 else max_index
+                extreme = value
+                extreme_index = sample
+                n_deflections = 1
+        elif direction * (value - extreme) > 0:
+            extreme = value
+            extreme_index = sample
+        elif direction * (extreme - value) >= threshold:
+            direction = -direction
+            extreme = value
+            extreme_index = sample
+            n_deflections += 1
+
+    if max_value >= min_value:
+        out[0] = max_value - min_value
+    out[1] = n_deflections
+    out[2] = start_index
+    out[3] = extreme_index
+
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _unipolar_features(signal, scale, first_sample, last_sample, missing, out):
+    """
+    Calculate the voltage and sample of the maximum negative slope of a single unipolar electrogram in one pass.
+
+    The slope at each sample is the difference between the next sample and this one.
+
+    Args:
+        signal (np.ndarray): the stored electrogram
+        scale (float): value of one stored unit (1 unless the electrogram is stored as int16)
+        first_sample, last_sample (int): first and last (inclusive) sample of the window
+        missing (float): value that represents a missing sample
+        out (np.ndarray): voltage and sample of the maximum negative slope, modified in-place
+    """
+
+    max_value = -np.inf
+    min_value = np.inf
+    steepest_slope = 0.0
+    steepest_sample = -1
+    previous = np.NaN
+
+    for sample in range(first_sample, last_sample + 1):
+
+        stored = signal[sample]
+        if stored != stored or stored == missing:
+            previous = np.NaN
+            continue
+        value = stored * scale
+
+        if value > max_value:
+            max_value = value
+        if value < min_value:
+            min_value = value
+
+        slope = value - previous
+        if slope < steepest_slope:
+            steepest_slope = slope
+            steepest_sample = sample - 1
+        previous = value
+
+    if max_value >= min_value:
+        out[0] = max_value - min_value
+    if steepest_sample >= 0:
+        out[1] = steepest_sample
+
+
+@numba.jit(nopython=True, nogil=True, cache=True, parallel=True)
+def _electrogram_features(
+    bipolar,
+    bipolar_scale,
+    bipolar_missing,
+    unipolar,
+    unipolar_scale,
+    unipolar_missing,
+    rows,
+    first_sample,
+    last_sample,
+    threshold,
+    bipolar_results,
+    unipolar_results,
+):
+    """
+    Calculate the features of the selected bipolar and unipolar electrograms in parallel.
+
+    Each electrogram is read once. The features of the bipolar (unipolar) electrograms are only
+    calculated if `bipolar_results` (`unipolar_results`) has one row per selected electrogram.
+
+    Args:
+        bipolar, unipolar (np.ndarray): stored electrograms of shape (N_signals, N_samples)
+        bipolar_scale, unipolar_scale (np.ndarray): value of one stored unit of each electrogram
+        bipolar_missing, unipolar_missing (float): value that represents a missing sample
+        rows (np.ndarray): index of each selected electrogram
+        first_sample, last_sample (np.ndarray): window of each selected electrogram
+        threshold (float): minimum change of a deflection of the bipolar electrograms
+        bipolar_results (np.ndarray): results for the bipolar electrograms, modified in-place
+        unipolar_results (np.ndarray): results for the unipolar electrograms, modified in-place
+    """
+
+    compute_bipolar = bipolar_results.shape[0] == rows.size
+    compute_unipolar = unipolar_results.shape[0] == rows.size
+
+    for index in numba.prange(rows.size):
+
+        row = rows[index]
+
+        if compute_bipolar:
+            _bipolar_features(
+                bipolar[row],
+                bipolar_scale[row],
+                first_sample[index],
+                last_sample[index],
+                bipolar_missing,
+                threshold,
+                bipolar_results[index],
+            )
+
+        if compute_unipolar:
+            _unipolar_features(
+                unipolar[row],
+                unipolar_scale[row],
+                first_sample[index],
+                last_sample[index],
+                unipolar_missing,
+                unipolar_results[index],
+            )
+
+
+def _signals_for_engine(electrogram, n_rows, unipolar=False):
+    """Get stored electrograms, the scale of each electrogram and the missing-sample value for the engine."""
+
+    if not unipolar and electrogram.n_points == 0:
+        raise ValueError("The case has no bipolar electrograms.")
+    if unipolar and electrogram.n_points == 0:
+        raise ValueError("The case has no unipolar electrograms.")
+
+    signals, scale = _stored_electrograms(electrogram)
+    if unipolar:
+        # Use only the proximal unipolar data
+        signals = signals[:, :, 0]
+        scale = scale[:, 0] if scale is not None else None
+
+    missing = _INT16_NAN if scale is not None else np.NaN
+    scale = np.ones(n_rows, dtype=float) if scale is None else np.asarray(scale, dtype=float)
+
+    return signals, scale, missing
+
+
+def calculate_electrogram_features(case, features=None, buffer=50, deflection_threshold=0.05, indices=None):
+    """
+    Calculate features of the electrograms of the mapping points.
+
+    All selected features are calculated in a single pass over the electrograms, using multiple
+    threads. Only the samples within the window of interest of each electrogram (see
+    :func:`openep.case.case_routines.get_sample_indices_within_woi`) are used.
+
+    Args:
+        case (Case): openep case object
+        features (list of str, optional): Features to calculate, from :data:`FEATURES`. The default
+            is None, in which case all features are calculated.
+        buffer (float): Features will be calculated using the window of interest
+            plus/minus this buffer time.
+        deflection_threshold (float): Minimum change in the bipolar electrogram (in mV) for a
+            deflection to be counted. Defaults to 0.05 mV.
+        indices (ndarray, optional): Indices of the mapping points for which the features will be
+            calculated. The default is None, in which case the features of all mapping points are
+            calculated.
+
+    Returns:
+        features (np.ndarray): Structured array with one element per mapping point and one field per
+            feature. Times are in ms. Features that cannot be calculated for a mapping point (e.g. the
+            window of interest contains no samples, or the electrogram has no deflections) are NaN,
+            except for `n_deflections`, which is 0.
+    """
+
+    features = list(FEATURES) if features is None else list(features)
+    unknown_features = [feature for feature in features if feature not in FEATURES]
+    if unknown_features:
+        raise ValueError(f"Unknown features: {unknown_features}. Features must be from {FEATURES}.")
+
+    # if we have a single index we need to ensure it is an array
+    indices = np.asarray([indices], dtype=int) if isinstance(indices, int) else indices
+
+    compute_bipolar = not _BIPOLAR_FEATURES.isdisjoint(features)
+    compute_unipolar = not _UNIPOLAR_FEATURES.isdisjoint(features)
+
+    n_points = case.electric.n_points if compute_bipolar else case.electric.unipolar_egm.n_points
+    n_samples = case.electric.n_samples if compute_bipolar else case.electric.unipolar_egm.n_samples
+    rows = np.arange(n_points) if indices is None else np.arange(n_points)[indices]
+    first_sample, last_sample = _window_of_interest_samples(case, n_samples, buffer=buffer, indices=indices)
+
+    empty_signals = np.empty((0, 0), dtype=float)
+    empty_scale = np.empty(0, dtype=float)
+
+    if compute_bipolar:
+        bipolar, bipolar_scale, bipolar_missing = _signals_for_engine(case.electric.bipolar_egm, n_points)
+        bipolar_results = np.full((rows.size, 4), fill_value=np.NaN)
+    else:
+        bipolar, bipolar_scale, bipolar_missing = empty_signals, empty_scale, np.NaN
+        bipolar_results = np.empty((0, 4), dtype=float)
+
+    if compute_unipolar:
+        unipolar, unipolar_scale, unipolar_missing = _signals_for_engine(case.electric.unipolar_egm, n_points, unipolar=True)
+        if unipolar.shape != (n_points, n_samples):
+            raise ValueError(
+                f"The unipolar electrograms must have the same number of points and samples as the bipolar "
+                f"electrograms, {(n_points, n_samples)}, not {unipolar.shape}."
+            )
+        unipolar_results = np.full((rows.size, 2), fill_value=np.NaN)
+    else:
+        unipolar, unipolar_scale, unipolar_missing = empty_signals, empty_scale, np.NaN
+        unipolar_results = np.empty((0, 2), dtype=float)
+
+    _electrogram_features(
+        bipolar,
+        bipolar_scale,
+        bipolar_missing,
+        unipolar,
+        unipolar_scale,
+        unipolar_missing,
+        rows,
+        first_sample,
+        last_sample,
+        float(deflection_threshold),
+        bipolar_results,
+        unipolar_results,
+    )
+
+    sample_to_ms = 1000 / case.electric.frequency
+    values = {}
+    if compute_bipolar:
+        voltage, n_deflections, start_index, end_index = bipolar_results.T
+        has_deflections = n_deflections > 0
+        duration = np.where(has_deflections, (end_index - start_index) * sample_to_ms, np.NaN)
+        values['bipolar_voltage'] = voltage
+        values['n_deflections'] = n_deflections
+        values['duration'] = duration
+        values['fractionation_index'] = np.divide(
+            duration, n_deflections, out=np.full_like(duration, np.NaN), where=has_deflections,
+        )
+    if compute_unipolar:
+        voltage, steepest_sample = unipolar_results.T
+        values['unipolar_voltage'] = voltage
+        values['local_activation_time'] = steepest_sample * sample_to_ms
+
+    results = np.empty(rows.size, dtype=[(feature, _FEATURE_DTYPES[feature]) for feature in features])
+    for feature in features:
+        results[feature] = values[feature]
+
+    return results
@@ -27,7 +27,7 @@ from attr import attrs
 
 import numpy as np
 import numba
-from .case_routines import calculate_distance
+import scipy.spatial
 
 __all__ = [
     'LocalSmoothingInterpolator',
@@ -53,9 +53,25 @@ class LocalSMoothingInterpolator:
     smoothing_length: int = 5
     fill_value: float = np.NaN
 
+    def __attrs_post_init__(self):
+        self._kdtree = None
+
+    @property
+    def kdtree(self):
+        """KD-tree of the data point coordinates."""
+
+        if self._kdtree is None:
+            self._kdtree = scipy.spatial.cKDTree(self.points)
+
+        return self._kdtree
+
     def __call__(self, new_points):
         """Evaluate the interpolant.
 
+        Only the data points within `smoothing_length` of each new point are
+        found and used, so memory scales with the number of neighbours rather
+        than with the product of the number of data points and new points.
+
         Args:
             new_points (np.ndarray): Coordinates at which to evaluate the interpolant.
 
@@ -66,38 +82,68 @@ class LocalSMoothingInterpolator:
         n_points = len(new_points)
         new_field = np.full(n_points, fill_value=self.fill_value, dtype=float)
 
-        distances = calculate_distance(
-            origin=new_points,
-            destination=self.points,
-        )
+        offsets, neighbours, distances = self._find_neighbours(new_points)
 
         new_field = _local_smoothing(
-            field=self.field,
-            smoothing_length=self.smoothing_length,
+            field=np.asarray(self.field, dtype=float),
+            smoothing_length=float(self.smoothing_length),
+            offsets=offsets,
+            neighbours=neighbours,
             distances=distances,
             out=new_field,
         )
 
         return new_field
 
+    def _find_neighbours(self, new_points):
+        """Find the data points within `smoothing_length` of each new point.
+
+        Returns:
+            offsets (np.ndarray): CSR offsets; the neighbours of new point `i` are
+                `neighbours[offsets[i]:offsets[i+1]]`.
+            neighbours (np.ndarray): Indices of the neighbouring data points.
+            distances (np.ndarray): Distance from each new point to each of its neighbours.
+        """
+
+        new_points = np.asarray(new_points, dtype=float).reshape(-1, 3)
+
+        pairs = scipy.spatial.cKDTree(new_points).sparse_distance_matrix(
+            self.kdtree,
+            max_distance=self.smoothing_length,
+            output_type='ndarray',
+        )
+        pairs = pairs[np.argsort(pairs['i'], kind='stable')]
+
+        offsets = np.zeros(len(new_points) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs['i'], minlength=len(new_points)), out=offsets[1:])
+
+        neighbours = np.ascontiguousarray(pairs['j'], dtype=np.int64)
+        distances = np.ascontiguousarray(pairs['v'], dtype=float)
+
+        return offsets, neighbours, distances
+
+
+@numba.jit(nopython=True, cache=True, fastmath=True, parallel=True)
+def _local_smoothing(field, smoothing_length, offsets, neighbours, distances, out):
 
-@numba.jit(nopython=True, cache=True, fastmath=True)
-def _local_smoothing(field, smoothing_length, distances, out):
+    for index in numba.prange(out.shape[0]):
 
-    within_cutoff = distances < smoothing_length
+        total_weight = 0.0
+        field_value = 0.0
 
-    for index in range(out.shape[0]):
+        for neighbour_index in range(offsets[index], offsets[index + 1]):
 
-        if not np.any(within_cutoff[index]):
-            continue
+            distance = distances[neighbour_index]
+            if distance >= smoothing_length:
+                continue
 
-        # Calculate field at new points
-        distance = distances[index]
-        exponent = distance[distance < smoothing_length] / smoothing_length
-        weights = np.exp(-exponent**2)
-        normalised_weights = weights / weights.sum()
+            # Calculate field at new points
+            exponent = distance / smoothing_length
+            weight = np.exp(-exponent**2)
+            total_weight += weight
+            field_value += field[neighbours[neighbour_index]] * weight
 
-        field_value = sum(field[distance < smoothing_length] * normalised_weights)
-        out[index] = field_value
+        if total_weight > 0:
+            out[index] = field_value / total_weight
 
     return out
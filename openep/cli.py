@@ -0,0 +1,330 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""
+Command-line interface - :mod:`openep.cli`
+==========================================
+
+The `openep` command converts and analyses cases without writing a Python script.
+It has three subcommands:
+
+* ``openep info`` loads each case and prints a summary of it.
+* ``openep convert`` converts each case to another format.
+* ``openep analyse`` calculates the low-voltage area and mean voltage of each region
+  of each case using :func:`openep.batch.voltage_pipeline`.
+
+Inputs can be given as glob patterns, which are expanded by `openep` itself (so they work
+in shells that do not expand them, and can include '**' to search directories recursively).
+The format of each input is determined by its extension: OpenEP MATLAB files (.mat), OpenEP
+npz files (.npz), VTK files (.vtk, .vtp) and openCARP meshes (.pts, .bpts). For openCARP
+meshes, the elements are read from the file with the same name and a .elem (or .belem)
+extension, and fibres from the .lon file if it exists.
+
+Example
+-------
+
+    Convert all MATLAB files in a directory to openCARP binary files, using four
+    worker processes::
+
+        openep convert 'cases/*.mat' --to opencarp --binary --output-dir meshes --jobs 4
+
+    The time taken to load and export each file is printed when the file has been
+    converted. Files that cannot be converted are reported and the remaining files are
+    still converted; the exit status is 1 if any file failed. Input files are never
+    overwritten: converting a file to its own format requires a different ``--output-dir``.
+
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+__all__ = ['main']
+
+_FORMATS = {
+    '.mat': 'mat',
+    '.npz': 'npz',
+    '.vtk': 'vtk',
+    '.vtp': 'vtk',
+    '.pts': 'opencarp',
+    '.bpts': 'opencarp',
+}
+_EXTENSIONS = {'mat': '.mat', 'npz': '.npz', 'vtk': '.vtk', 'opencarp': ''}
+
+
+def _expand_inputs(patterns):
+    """Expand glob patterns, keeping the order of the patterns and removing duplicates."""
+
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        paths.extend(matches if matches else [pattern])
+
+    return list(dict.fromkeys(paths))
+
+
+def _load(path, scale_points=1):
+    """Load a case, determining the format from the extension of `path`."""
+
+    from .io import readers
+
+    stem, extension = os.path.splitext(path)
+    file_format = _FORMATS.get(extension.lower())
+
+    if file_format == 'mat':
+        return readers.load_openep_mat(path)
+    if file_format == 'npz':
+        return readers.load_openep_npz(path)
+    if file_format == 'vtk':
+        return readers.load_vtk(path)
+    if file_format == 'opencarp':
+        binary = extension.lower() == '.bpts'
+        fibres = f'{stem}.lon'
+        return readers.load_opencarp(
+            points=path,
+            indices=f'{stem}.belem' if binary else f'{stem}.elem',
+            fibres=fibres if os.path.exists(fibres) else None,
+            name=os.path.basename(stem),
+            scale_points=scale_points,
+        )
+
+    raise ValueError(f"Cannot determine the format of {path}. Supported extensions are: {', '.join(_FORMATS)}")
+
+
+def _export(case, path, file_format, binary=False, scale_points=1):
+    """Export a case to the given format."""
+
+    from .io import writers
+
+    if file_format == 'mat':
+        writers.export_openep_mat(case, path)
+    elif file_format == 'npz':
+        writers.export_openep_npz(case, path)
+    elif file_format == 'vtk':
+        writers.export_vtk(case, path)
+    elif file_format == 'opencarp':
+        writers.export_openCARP(case, path, scale_points=scale_points, binary=binary)
+
+
+def _output_path(path, file_format, output_dir=None):
+    """Path of the converted file: the input path with its extension replaced."""
+
+    stem = os.path.splitext(path)[0]
+    if output_dir is not None:
+        stem = os.path.join(output_dir, os.path.basename(stem))
+
+    return stem + _EXTENSIONS[file_format]
+
+
+def _overwrites_input(path, output, file_format):
+    """Whether exporting to `output` would overwrite the input file (or, for openCARP, its other files)."""
+
+    if file_format == 'opencarp':
+        stem, extension = os.path.splitext(path)
+        return _FORMATS.get(extension.lower()) == 'opencarp' and os.path.abspath(stem) == os.path.abspath(output)
+
+    return os.path.abspath(path) == os.path.abspath(output)
+
+
+def _run_task(task):
+    """Run a single task, returning the time taken and any error rather than raising it."""
+
+    function, path, kwargs = task
+    try:
+        message, timings = function(path, **kwargs)
+    except Exception as error:
+        return path, None, None, f"{type(error).__name__}: {error}"
+
+    return path, message, timings, None
+
+
+def _info(path, scale_points=1):
+    """Load a case and summarise it."""
+
+    start = time.perf_counter()
+    case = _load(path, scale_points=scale_points)
+    load_time = time.perf_counter() - start
+
+    n_points = 0 if case.points is None else len(case.points)
+    n_cells = 0 if case.indices is None else len(case.indices)
+    message = f"{case.name}: {n_points} points, {n_cells} cells, {case.electric.n_points} mapping points"
+
+    return message, {'load': load_time}
+
+
+def _convert(path, to, output_dir=None, binary=False, scale_points=1, export_scale_points=1):
+    """Load a case and export it to another format."""
+
+    output = _output_path(path, to, output_dir=output_dir)
+    if _overwrites_input(path, output, to):
+        raise ValueError(f"Converting {path} would overwrite it. Use --output-dir to write the converted files elsewhere.")
+
+    start = time.perf_counter()
+    case = _load(path, scale_points=scale_points)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _export(case, output, to, binary=binary, scale_points=export_scale_points)
+    export_time = time.perf_counter() - start
+
+    return f"-> {output}", {'load': load_time, 'export': export_time}
+
+
+def _run(function, paths, n_jobs, **kwargs):
+    """Run `function` on each path using a pool of `n_jobs` processes and print the timing of each."""
+
+    from .batch import _create_pool
+
+    tasks = [(function, path, kwargs) for path in paths]
+
+    if n_jobs == 1:
+        results = map(_run_task, tasks)
+        pool = None
+    else:
+        pool = _create_pool(n_jobs, max_tasks_per_child=1)
+        results = pool.imap_unordered(_run_task, tasks, chunksize=1)
+
+    n_failed = 0
+    try:
+        for path, message, timings, error in results:
+
+            if error is not None:
+                n_failed += 1
+                print(f"FAILED {path}: {error}", file=sys.stderr, flush=True)
+                continue
+
+            timing = ', '.join(f"{step} {seconds:.2f} s" for step, seconds in timings.items())
+            print(f"{path} {message} ({timing})", flush=True)
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return n_failed
+
+
+def _analyse(args, paths):
+    """Run the voltage analysis on all cases using :func:`openep.batch.run_batch`."""
+
+    from . import batch
+
+    start = time.perf_counter()
+    failures = batch.run_batch(
+        paths,
+        pipeline=batch.voltage_pipeline(threshold=args.threshold, buffer=args.buffer, bipolar=not args.unipolar),
+        output=args.output,
+        failures_output=args.failures,
+        n_jobs=args.jobs,
+        memory_limit=args.memory_limit,
+    )
+    elapsed = time.perf_counter() - start
+
+    for failure in failures:
+        print(f"FAILED {failure.case} at step '{failure.step}': {failure.error_type}: {failure.message}", file=sys.stderr)
+
+    print(f"Analysed {len(paths) - len(failures)} of {len(paths)} cases in {elapsed:.2f} s -> {args.output}")
+
+    return len(failures)
+
+
+def _create_parser():
+
+    parser = argparse.ArgumentParser(
+        prog='openep',
+        description='Convert and analyse OpenEP cases.',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common_arguments(subparser):
+        subparser.add_argument('inputs', nargs='+', help='input files or glob patterns')
+        subparser.add_argument(
+            '-j', '--jobs', type=int, default=1,
+            help='number of worker processes (default: 1, or 0 to use all CPUs)',
+        )
+
+    info_parser = subparsers.add_parser('info', help='load cases and print a summary of each')
+    add_common_arguments(info_parser)
+    info_parser.add_argument('--scale-points', type=float, default=1, help='scale openCARP points by this number')
+
+    convert_parser = subparsers.add_parser('convert', help='convert cases to another format')
+    add_common_arguments(convert_parser)
+    convert_parser.add_argument('--to', required=True, choices=sorted(_EXTENSIONS), help='output format')
+    convert_parser.add_argument('-o', '--output-dir', help='directory for converted files (default: next to inputs)')
+    convert_parser.add_argument('--binary', action='store_true', help='write openCARP binary .bpts/.belem files')
+    convert_parser.add_argument(
+        '--scale-points', type=float, default=1,
+        help='scale openCARP points by this number when loading',
+    )
+    convert_parser.add_argument(
+        '--export-scale-points', type=float, default=1,
+        help='scale points by this number when exporting to openCARP',
+    )
+
+    analyse_parser = subparsers.add_parser('analyse', help='calculate low-voltage areas and mean voltages per region')
+    add_common_arguments(analyse_parser)
+    analyse_parser.add_argument('-o', '--output', required=True, help='CSV file for the results')
+    analyse_parser.add_argument('--failures', help='CSV file for details of cases that could not be analysed')
+    analyse_parser.add_argument('--threshold', type=float, default=0.5, help='low-voltage threshold (default: 0.5)')
+    analyse_parser.add_argument('--buffer', type=float, default=50, help='window of interest buffer (default: 50)')
+    analyse_parser.add_argument('--unipolar', action='store_true', help='use unipolar rather than bipolar voltages')
+    analyse_parser.add_argument('--memory-limit', type=int, help='maximum bytes of memory per worker process')
+
+    return parser
+
+
+def main(argv=None):
+    """Run the `openep` command.
+
+    Args:
+        argv (list[str], optional): command-line arguments, excluding the program name. The
+            default is None, in which case `sys.argv[1:]` is used.
+
+    Returns:
+        status (int): 0 if all inputs were processed successfully, otherwise 1.
+    """
+
+    args = _create_parser().parse_args(argv)
+    args.jobs = None if args.jobs == 0 else args.jobs
+    paths = _expand_inputs(args.inputs)
+
+    if args.command == 'info':
+        n_failed = _run(_info, paths, args.jobs, scale_points=args.scale_points)
+    elif args.command == 'convert':
+        if args.output_dir is not None:
+            os.makedirs(args.output_dir, exist_ok=True)
+        n_failed = _run(
+            _convert,
+            paths,
+            args.jobs,
+            to=args.to,
+            output_dir=args.output_dir,
+            binary=args.binary,
+            scale_points=args.scale_points,
+            export_scale_points=args.export_scale_points,
+        )
+    else:
+        n_failed = _analyse(args, paths)
+
+    return 1 if n_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""Helpers for copying the arrays of the data structures, either deeply or copy-on-write."""
+
+import numpy as np
+
+__all__ = []
+
+
+def _copy_array(array, deep=True):
+    """Copy an array.
+
+    Args:
+        array (np.ndarray): array to copy, or None
+        deep (bool): If True, the data are copied. Otherwise, a read-only view that shares the
+            data of `array` is returned. `array` itself is not changed, so (as with any numpy view)
+            the view reflects later in-place modifications of `array`.
+
+    Returns:
+        copy (np.ndarray): the copy, or None if `array` is None
+    """
+
+    if array is None:
+        return None
+
+    if deep:
+        return np.array(array)
+
+    view = np.asarray(array).view()
+    view.flags.writeable = False
+
+    return view
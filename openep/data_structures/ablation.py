@@ -21,6 +21,8 @@
 from attr import attrs
 import numpy as np
 
+from ._copy import _copy_array
+
 __all__ = []
 
 
@@ -45,15 +47,19 @@ class AblationForce:
     def __repr__(self):
         return f"Ablation forces with {len(self.times)} sites."
 
-    def copy(self):
-        """Create a deep copy of AblationForce"""
+    def copy(self, deep=True):
+        """Create a copy of AblationForce.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         ablation_force = AblationForce(
-            times=np.array(self.times) if self.times is not None else None,
-            force=np.array(self.force) if self.force is not None else None,
-            axial_angle=np.array(self.axial_angle) if self.axial_angle is not None else None,
-            lateral_angle=np.array(self.lateral_angle) if self.lateral_angle is not None else None,
-            points=np.array(self.points) if self.points is not None else None,
+            times=_copy_array(self.times, deep),
+            force=_copy_array(self.force, deep),
+            axial_angle=_copy_array(self.axial_angle, deep),
+            lateral_angle=_copy_array(self.lateral_angle, deep),
+            points=_copy_array(self.points, deep),
         )
 
         return ablation_force
@@ -88,15 +94,19 @@ class Ablation:
         n_sites = {len(self.times)} if self.times is not None else 0
         return f"Ablations with {n_sites} ablation sites."
 
-    def copy(self):
-        """Create a deep copy of Ablation"""
+    def copy(self, deep=True):
+        """Create a copy of Ablation.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         ablation = Ablation(
-            times=np.array(self.times) if self.times is not None else None,
-            power=np.array(self.power) if self.power is not None else None,
-            impedance=np.array(self.impedance) if self.impedance is not None else None,
-            temperature=np.array(self.temperature) if self.temperature is not None else None,
-            force=self.force.copy(),
+            times=_copy_array(self.times, deep),
+            power=_copy_array(self.power, deep),
+            impedance=_copy_array(self.impedance, deep),
+            temperature=_copy_array(self.temperature, deep),
+            force=self.force.copy(deep),
         )
 
         return ablation
@@ -35,7 +35,9 @@ Tip
     :func:`create_mesh` method, and then use functions in :mod:`openep.mesh.mesh_routines`.
 
 .. autoclass:: Case
-    :members: create_mesh, get_surface_data, get_field
+    :members: create_mesh, get_mesh, get_point_normals, get_cell_normals, get_cell_areas,
+        get_surface_data, get_field, get_surface_kdtree, clear_spatial_index, add_landmark,
+        add_landmarks, update_electric_surface
 
 Note
 ----
@@ -76,23 +78,32 @@ Ablation data
 """
 
 from attr import attrs
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, TYPE_CHECKING
 
 import numpy as np
-import scipy.stats
-import pyvista
+import scipy.spatial
 
 from .surface import Fields
-from .electric import Electric, Electrogram, Annotations, ElectricSurface
+from .electric import Electric, Electrogram, Annotations, ElectricSurface, _append_rows
 from .ablation import Ablation
-from ..case.case_routines import (
-    bipolar_from_unipolar_surface_points,
-    calculate_distance,
-)
+from ._copy import _copy_array
+
+# pyvista is imported when a mesh is first created, as importing it takes a long time
+if TYPE_CHECKING:
+    import pyvista
 
 __all__ = []
 
 
+def _read_only(array):
+    """Get a read-only copy of an array, for values that are shared by the cache."""
+
+    array = np.array(array)
+    array.flags.writeable = False
+
+    return array
+
+
 class Case:
     """
     The fundamental OpenEP object.
@@ -110,6 +121,13 @@ class Case:
         ablation (Ablation, optional): Ablation data obtained during a clinical mapping procedure.
         notes (list, optional): Notes associated with the dataset.
 
+    Note
+    ----
+    A KD-tree of the surface points, the surface mesh, and its normals and cell areas are
+    built the first time they are needed and then cached. The cache is cleared when `points`
+    or `indices` is set, or when the case is translated or transformed. If you modify `points`
+    or `indices` in-place by some other means, you must call `case.clear_spatial_index()` yourself.
+
     """
 
     def __init__(
@@ -123,6 +141,10 @@ class Case:
         notes: Optional[List] = None,
     ):
 
+        self._surface_kdtree = None
+        self._geometry_version = 0
+        self._mesh_cache = {}
+
         self.name = name
         self.points = points
         self.indices = indices
@@ -134,6 +156,47 @@ class Case:
     def __repr__(self):
         return f"{self.name}( nodes: {self.points.shape} indices: {self.indices.shape} {self.fields} )"
 
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        self._points = points
+        self.clear_spatial_index()
+
+    @property
+    def indices(self):
+        return self._indices
+
+    @indices.setter
+    def indices(self, indices):
+        self._indices = indices
+        self.clear_spatial_index()
+
+    def clear_spatial_index(self):
+        """Remove the cached KD-tree of the surface points and the cached surface mesh."""
+
+        self._surface_kdtree = None
+        self._geometry_version += 1
+        self._mesh_cache = {}
+
+    def get_surface_kdtree(self) -> scipy.spatial.cKDTree:
+        """
+        Get a KD-tree of the points on the surface.
+
+        The tree is built the first time this method is called and is then reused
+        until the surface points change.
+
+        Returns:
+            tree (scipy.spatial.cKDTree): KD-tree of `case.points`
+        """
+
+        if self._surface_kdtree is None:
+            self._surface_kdtree = scipy.spatial.cKDTree(self.points)
+
+        return self._surface_kdtree
+
     def remove_unreferenced_points(self):
         """Remove surface points not reference in the triangulation."""
 
@@ -145,6 +208,7 @@ class Case:
 
         # Renumber indices to takes into account changed number of points.
         # -1 to convert rank to index
+        import scipy.stats
         self.indices = scipy.stats.rankdata(self.indices, method='dense').reshape(-1, 3) - 1
 
         # Remove unused point data from the fields
@@ -173,15 +237,17 @@ class Case:
             translate_by (np.ndarray): 3D coordinates by which to translate the case
         """
 
-        self.points += translate_by
+        # The arrays are replaced rather than modified in-place, as they may be shared with a copy
+        self.points = self.points + translate_by  # setting points clears the spatial index
         if self.electric.bipolar_egm._points is not None:
-            self.electric.bipolar_egm._points += translate_by
+            self.electric.bipolar_egm._points = self.electric.bipolar_egm._points + translate_by
+            self.electric.landmark_points._points = self.electric.bipolar_egm._points
         elif self.electric.landmark_points._points is not None:
-            self.electric.landmark_points._points += translate_by
+            self.electric.landmark_points._points = self.electric.landmark_points._points + translate_by
         if self.electric.unipolar_egm._points is not None:
-            self.electric.unipolar_egm._points += translate_by[:, np.newaxis]
+            self.electric.unipolar_egm._points = self.electric.unipolar_egm._points + translate_by[:, np.newaxis]
         if self.electric.surface._nearest_point is not None:
-            self.electric.surface._nearest_point += translate_by
+            self.electric.surface._nearest_point = self.electric.surface._nearest_point + translate_by
 
     def transform(self, transform_matrix):
         """Apply a transformation to all coordinates.
@@ -200,26 +266,33 @@ class Case:
         rotation_matrix = transform_matrix[:3, :3]
         translation_vector = transform_matrix[:3, 3]
 
-        self.points[:] = np.dot(self.points, rotation_matrix.T) + translation_vector
+        def _transform(points):
+            return np.dot(points, rotation_matrix.T) + translation_vector
+
+        # The arrays are replaced rather than modified in-place, as they may be shared with a copy
+        self.points = _transform(self.points)  # setting points clears the spatial index
         if self.electric.bipolar_egm._points is not None:
-            self.electric.bipolar_egm._points[:] = np.dot(self.electric.bipolar_egm._points, rotation_matrix.T) + translation_vector
+            self.electric.bipolar_egm._points = _transform(self.electric.bipolar_egm._points)
+            self.electric.landmark_points._points = self.electric.bipolar_egm._points
         elif self.electric.landmark_points._points is not None:
-            self.electric.landmark_points._points[:] = np.dot(self.electric.landmark_points._points, rotation_matrix.T) + translation_vector
+            self.electric.landmark_points._points = _transform(self.electric.landmark_points._points)
         if self.electric.unipolar_egm._points is not None:
             proximal_points, distal_points = self.electric.unipolar_egm._points.T
-            self.electric.unipolar_egm._points[:, :, 0] = np.dot(proximal_points.T, rotation_matrix.T) + translation_vector
-            self.electric.unipolar_egm._points[:, :, 1] = np.dot(distal_points.T, rotation_matrix.T) + translation_vector
+            self.electric.unipolar_egm._points = np.stack(
+                [_transform(proximal_points.T), _transform(distal_points.T)],
+                axis=-1,
+            )
         if self.electric.surface._nearest_point is not None:
-            self.electric.surface._nearest_point[:] = np.dot(self.electric.surface._nearest_point, rotation_matrix.T) + translation_vector
+            self.electric.surface._nearest_point = _transform(self.electric.surface._nearest_point)
         if self.electric.surface._normals is not None:
-            self.electric.surface._normals[:] = np.dot(self.electric.surface._normals, rotation_matrix.T)
+            self.electric.surface._normals = np.dot(self.electric.surface._normals, rotation_matrix.T)
 
     def add_landmark(
         self,
         name: str,
         internal_name: str,
         point: np.ndarray,
-        mesh: pyvista.PolyData = None,
+        mesh: 'pyvista.PolyData' = None,
     ):
         """Add a landmark to a case.
 
@@ -232,123 +305,357 @@ class Case:
                 case.electric.surface.normals
         """
 
-        self.electric._add_landmark(name, internal_name, point)
+        self.add_landmarks([name], [internal_name], np.reshape(point, (1, 3)), mesh=mesh)
+
+    def add_landmarks(
+        self,
+        names: np.ndarray,
+        internal_names: np.ndarray,
+        points: np.ndarray,
+        mesh: 'pyvista.PolyData' = None,
+    ):
+        """Add many landmarks to a case.
+
+        This is much faster than calling :meth:`add_landmark` for each landmark, as the electric
+        data and electric surface data are only updated once.
+
+        Args:
+            names (np.ndarray): User-defined name of each landmark
+            internal_names (np.ndarray): Name given by a mapping system to each landmark
+            points (np.ndarray): 3D position of each landmark, with shape (N, 3)
+            mesh (pyvista.PolyData, optional): If provided, this mesh will be used
+                to update case.electric.surface.nearest_point and
+                case.electric.surface.normals
+        """
+
+        n_points = self.electric.bipolar_egm._points.shape[0] if self.electric.bipolar_egm._points is not None else 0
+        self.electric._add_landmarks(names, internal_names, points)
 
         # We also need to update the case.electric.surface data (nearest surface point and normals)
-        # Create a mesh if one is not provided
-        mesh = self.create_mesh() if mesh is None else mesh
-        if 'Normals' not in mesh.point_data:
+        # Only the new landmarks need to be projected onto the surface if the existing points have already been projected
+        if mesh is not None and 'Normals' not in mesh.point_data:
             mesh.compute_normals(cell_normals=False, point_normals=True, inplace=True)
 
-        self._create_electric_surface(mesh=mesh)
+        surface = self.electric.surface
+        if surface._nearest_point is not None and surface._nearest_point.shape[0] == n_points:
+            self.update_electric_surface(indices=np.arange(n_points, self.electric.bipolar_egm._points.shape[0]), mesh=mesh)
+        else:
+            self._create_electric_surface(mesh=mesh)
+
+    def update_electric_surface(self, indices=None, mesh: 'pyvista.PolyData' = None):
+        """Update the projection of mapping points onto the surface.
+
+        The nearest surface point and surface normal of the given mapping points (including landmark
+        points) are recalculated, and those of all other points are kept. This should be called after
+        mapping points have been moved, e.g. by modifying `case.electric.bipolar_egm._points` in-place.
+
+        Args:
+            indices (np.ndarray, optional): Indices of the points to project onto the surface, in the
+                arrays of all mapping points (i.e. including landmark points). Points that are beyond the
+                end of `case.electric.surface.nearest_point` are added to it. The default is None, in
+                which case all points are projected.
+            mesh (pyvista.PolyData, optional): If provided, the points are projected onto this mesh,
+                which must have point normals. The default is None, in which case they are projected
+                onto the surface of the case, using the cached KD-tree and point normals.
+        """
+
+        surface = self.electric.surface
+        if indices is None or surface._nearest_point is None or surface._normals is None:
+            self._create_electric_surface(mesh=mesh)
+            return
+
+        indices = np.asarray(indices, dtype=int)
+        nearest_point, normals = self._project_onto_surface(self.electric.bipolar_egm._points[indices], mesh=mesh)
+
+        # Rows for new points are added to the buffers used for adding landmarks, so adding
+        # landmarks one at a time takes amortised O(1) time.
+        n_points = self.electric.bipolar_egm._points.shape[0]
+        n_new = n_points - surface._nearest_point.shape[0]
+        # Existing rows may be shared with a copy of the case, so they are not modified in-place.
+        copy_existing_rows = np.any(indices < n_points - n_new)
+        arrays = {}
+        for name, array in [('nearest_point', surface._nearest_point), ('normals', surface._normals)]:
+            if n_new > 0:
+                array = _append_rows(
+                    self.electric._landmark_buffers,
+                    f'surface.{name}',
+                    array,
+                    np.full((n_new, 3), fill_value=np.NaN),
+                )
+            arrays[name] = np.array(array) if copy_existing_rows else array
+
+        arrays['nearest_point'][indices] = nearest_point
+        arrays['normals'][indices] = normals
+        surface._nearest_point = arrays['nearest_point']
+        surface._normals = arrays['normals']
+        surface._is_electrical = self.electric._is_electrical
+
+    def _project_onto_surface(self, points, mesh: 'pyvista.PolyData' = None):
+        """Find the nearest point on the surface, and the normal at that point, of each point.
 
-    def _create_electric_surface(self, mesh: pyvista.PolyData):
+        Args:
+            points (np.ndarray): Points to project, with shape (N, 3).
+            mesh (pyvista.PolyData, optional): Surface onto which the points are projected. It must have
+                point normals. The default is None, in which case the surface of the case is used, with
+                the cached KD-tree and point normals.
+
+        Returns:
+            nearest_point (np.ndarray): The nearest surface point to each point.
+            normals (np.ndarray): The normal to the surface at each nearest point.
+        """
+
+        if mesh is None:
+            _, nearest_point_indices = self.get_surface_kdtree().query(points)
+            return self.points[nearest_point_indices], self.get_point_normals()[nearest_point_indices]
+
+        # Reuse the cached surface KD-tree if the mesh has the same points as the case
+        surface_points = np.asarray(mesh.points)
+        if surface_points.shape == np.shape(self.points) and np.array_equal(surface_points, self.points):
+            surface_kdtree = self.get_surface_kdtree()
+        else:
+            surface_kdtree = scipy.spatial.cKDTree(surface_points)
+
+        _, nearest_point_indices = surface_kdtree.query(points)
+
+        return mesh.points[nearest_point_indices], mesh.point_normals[nearest_point_indices]
+
+    def _create_electric_surface(self, mesh: 'pyvista.PolyData' = None):
         """Add ElectricSurface data."""
 
         # can't find nearest point if we have no mapping/landmark points!
         if self.electric.bipolar_egm._points is None:
             return
 
-        surface_points = mesh.points
-        distance_to_surface = calculate_distance(
-            origin=self.electric.bipolar_egm._points,
-            destination=surface_points,
-        )
-        nearest_point_indices = np.argmin(distance_to_surface, axis=1)
+        nearest_point, normals = self._project_onto_surface(self.electric.bipolar_egm._points, mesh=mesh)
 
         self.electric.surface = ElectricSurface(
-            nearest_point=mesh.points[nearest_point_indices],
-            normals=mesh.point_normals[nearest_point_indices],
+            nearest_point=nearest_point,
+            normals=normals,
             is_electrical=self.electric._is_electrical
         )
 
     def separate_regions(self):
-        """Create a list of Case objects by separating regions defined in case.fields.cell_regions."""
+        """Create a list of Case objects by separating regions defined in case.fields.cell_regions.
+
+        The cells are sorted by region once, and the points of all regions are renumbered together,
+        so the time taken does not grow with the number of regions. The points of each region are
+        in the same order as in the original case.
+
+        Each region case has its own read-only views of the electric and ablation data of this case
+        rather than a copy of them (see :meth:`copy`). This case is not changed, and methods of either
+        this case or a region case (e.g. :meth:`translate`) do not change the others. Modifying the
+        electric or ablation arrays of this case in-place, however, also changes the region cases.
+
+        Returns:
+            cases (list): One Case per region, in ascending order of region id.
+        """
 
         if self.fields.cell_region is None:
             return [self]
 
-        region_ids = np.unique(self.fields.cell_region)
+        cell_region = np.asarray(self.fields.cell_region).ravel()
+        cell_order = np.argsort(cell_region, kind='stable')
+        region_ids, region_starts = np.unique(cell_region[cell_order], return_index=True)
         if region_ids.size == 1:
             return [self]
 
-        mesh = self.create_mesh()
-        for field in self.fields:
-            if self.fields[field] is None:
-                continue
-            if len(self.fields[field]) == mesh.n_points:
-                mesh.point_data[field] = self.fields[field]
-            elif len(self.fields[field]) == mesh.n_cells:
-                mesh.cell_data[field] = self.fields[field]
+        # Pair the region of each cell with each of its points, then find the unique (region, point)
+        # pairs of all regions at once. The pairs are sorted by region and then by point, so the
+        # position of a pair within its region is the new index of the point in that region.
+        n_points = len(self.points)
+        n_vertices = self.indices.shape[1]
+        region_of_cell = np.repeat(np.arange(region_ids.size), np.diff(np.append(region_starts, cell_region.size)))
+        region_point_pairs = region_of_cell[:, np.newaxis] * n_points + self.indices[cell_order]
+        unique_pairs, new_indices = np.unique(region_point_pairs, return_inverse=True)
+        new_indices = new_indices.reshape(-1, n_vertices)
+
+        pair_regions, pair_points = np.divmod(unique_pairs, n_points)
+        pair_starts = np.searchsorted(pair_regions, np.arange(region_ids.size + 1))
+        cell_starts = np.append(region_starts, cell_region.size)
 
         region_cases = []
-        for region_id in region_ids:
-            
-            cells_to_extract = mesh.cell_data['cell_region'] == region_id
-            region = mesh.extract_cells(cells_to_extract)
+        for region_index in range(region_ids.size):
+
+            cells = cell_order[cell_starts[region_index]:cell_starts[region_index + 1]]
+            points = pair_points[pair_starts[region_index]:pair_starts[region_index + 1]]
 
             fields = Fields()
-            for point_data in region.point_data:
-                if point_data not in fields:
+            for field in self.fields:
+                if self.fields[field] is None:
                     continue
-                fields[point_data] = region.point_data[point_data]
-            for cell_data in region.cell_data:
-                if cell_data not in fields:
-                    continue
-                fields[cell_data] = region.cell_data[cell_data]
-
-            case = self.copy()
-            case.points = region.points
-            case.indices = region.cells.reshape(region.n_cells, 4)[:, 1:]
-            case.fields = fields
+                if len(self.fields[field]) == n_points:
+                    fields[field] = self.fields[field][points]
+                elif len(self.fields[field]) == cell_region.size:
+                    fields[field] = self.fields[field][cells]
+
+            case = Case(
+                name=self.name,
+                points=self.points[points],
+                indices=new_indices[cell_starts[region_index]:cell_starts[region_index + 1]] - pair_starts[region_index],
+                fields=fields,
+                electric=self.electric.copy(deep=False),
+                ablation=self.ablation.copy(deep=False) if self.ablation is not None else None,
+                notes=self.notes,
+            )
             region_cases.append(case)
 
         return region_cases
 
-    def copy(self):
-        """Create a deep copy of a Case."""
+    def copy(self, deep: bool = True):
+        """Create a copy of a Case.
+
+        Args:
+            deep (bool, optional): If True (the default), all arrays are copied. Otherwise, the
+                copy shares the arrays of this case as read-only views, so it takes almost no time
+                or memory to create. This case is not changed. Methods of either case that change
+                its arrays (e.g. :meth:`translate` or :meth:`add_landmark`) replace them rather than
+                modifying them in-place, so they do not change the other case. As with numpy views,
+                however, modifying an array of this case in-place (e.g. `case.points[0] = 0`) also
+                changes the copy. The cached KD-tree and mesh are shared until the geometry of either
+                case changes.
+
+        Returns:
+            case (Case): the copy
+        """
 
         case = Case(
             name=self.name,
-            points=np.array(self.points),
-            indices=np.array(self.indices),
-            fields=self.fields.copy(),
-            electric=self.electric.copy(),
-            ablation=self.ablation.copy(),
-            notes=np.array(self.notes) if self.notes is not None else None,        
+            points=_copy_array(self.points, deep),
+            indices=_copy_array(self.indices, deep),
+            fields=self.fields.copy(deep),
+            electric=self.electric.copy(deep),
+            ablation=self.ablation.copy(deep),
+            notes=_copy_array(self.notes, deep),
         )
 
+        if not deep:
+            case._surface_kdtree = self._surface_kdtree
+            case._mesh_cache = dict(self._mesh_cache)
+
         return case
 
     def create_mesh(
         self,
         back_faces: bool = False,
-    ) -> pyvista.PolyData:
+    ) -> 'pyvista.PolyData':
         """
         Create a new mesh object from the stored nodes and indices
 
+        The mesh is a copy of the cached mesh returned by :meth:`get_mesh`, and so can be
+        modified without affecting the case.
+
         Args:
-            recenter: if True, recenter the mesh to the origin
             back_faces: if True, calculate back face triangles
 
         Returns:
             mesh (pyvista.Polydata): a mesh created from the case's points and indices
         """
 
-        indices = self.indices
-        num_points_per_face = np.full(shape=(len(indices)), fill_value=3, dtype=int)  # all faces have three vertices
-        faces = np.concatenate([num_points_per_face[:, np.newaxis], indices], axis=1)
+        return self.get_mesh(back_faces=back_faces).copy(deep=True)
+
+    def get_mesh(
+        self,
+        back_faces: bool = False,
+    ) -> 'pyvista.PolyData':
+        """
+        Get the cached mesh of the stored nodes and indices.
+
+        The mesh is created the first time this method is called and is then reused until the
+        surface points or indices change.
+
+        Warning
+        -------
+        The mesh is shared, and must not be modified. Use :meth:`create_mesh` to get a mesh that can
+        be modified, or `mesh.copy(deep=False)` to add point or cell data to a mesh that shares the
+        geometry of the cached mesh.
+
+        Args:
+            back_faces: if True, calculate back face triangles
+
+        Returns:
+            mesh (pyvista.Polydata): a mesh of the case's points and indices
+        """
+
+        key = 'back_faces_mesh' if back_faces else 'mesh'
+        if key not in self._mesh_cache:
+
+            faces = self._get_faces()
+            if back_faces:
+                faces_inverted = faces.reshape(-1, 4)[:, [0, 1, 3, 2]]
+                faces = np.concatenate([faces, faces_inverted.ravel()])  # include each face twice for both surfaces
+
+            import pyvista
+            self._mesh_cache[key] = pyvista.PolyData(self.points.copy(), faces)
 
-        if back_faces:
-            indices_inverted = indices[:, [0, 2, 1]]
-            faces_inverted = np.concatenate([num_points_per_face[:, np.newaxis], indices_inverted], axis=1)
-            faces = np.vstack(
-                [faces, faces_inverted]
-            )  # include each face twice for both surfaces
+        return self._mesh_cache[key]
 
-        mesh = pyvista.PolyData(self.points.copy(), faces.ravel())
+    def get_point_normals(self) -> np.ndarray:
+        """
+        Get the normal to the surface at each point of the surface.
+
+        The normals are calculated the first time they are needed, and then reused until the
+        surface points or indices change.
+
+        Returns:
+            normals (np.ndarray): Read-only array of the normal at each point, of shape (N_points, 3)
+        """
+
+        if 'point_normals' not in self._mesh_cache:
+            self._compute_normals()
+
+        return self._mesh_cache['point_normals']
+
+    def get_cell_normals(self) -> np.ndarray:
+        """
+        Get the normal to the surface of each cell.
+
+        The normals are calculated the first time they are needed, and then reused until the
+        surface points or indices change.
+
+        Returns:
+            normals (np.ndarray): Read-only array of the normal of each cell, of shape (N_cells, 3)
+        """
+
+        if 'cell_normals' not in self._mesh_cache:
+            self._compute_normals()
+
+        return self._mesh_cache['cell_normals']
 
-        return mesh
+    def get_cell_areas(self) -> np.ndarray:
+        """
+        Get the area of each cell.
+
+        The areas are calculated the first time they are needed, and then reused until the
+        surface points or indices change.
+
+        Returns:
+            areas (np.ndarray): Read-only array of the area of each cell, of shape (N_cells,)
+        """
+
+        if 'cell_areas' not in self._mesh_cache:
+            areas = self.get_mesh().compute_cell_sizes(length=False, area=True, volume=False)['Area']
+            self._mesh_cache['cell_areas'] = _read_only(areas)
+
+        return self._mesh_cache['cell_areas']
+
+    def _get_faces(self):
+        """Get the cached faces array of the mesh, in the format used by VTK."""
+
+        if 'faces' not in self._mesh_cache:
+            indices = self.indices
+            faces = np.empty((len(indices), 4), dtype=int)
+            faces[:, 0] = 3  # all faces have three vertices
+            faces[:, 1:] = indices
+            self._mesh_cache['faces'] = faces.ravel()
+
+        return self._mesh_cache['faces']
+
+    def _compute_normals(self):
+        """Calculate the point and cell normals of the mesh, and add them to the cache."""
+
+        mesh = self.get_mesh().compute_normals(cell_normals=True, point_normals=True, inplace=False)
+        self._mesh_cache['point_normals'] = _read_only(mesh.point_data['Normals'])
+        self._mesh_cache['cell_normals'] = _read_only(mesh.cell_data['Normals'])
 
     def get_surface_data(self, copy: bool = False) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -398,6 +705,7 @@ class Case:
         add_bipolar=True,
         add_reference=True,
         add_annotations=True,
+        dtype=None,
     ):
         """Add unipolar electrograms into the Case object.
 
@@ -418,6 +726,9 @@ class Case:
                 be created and returned. The window of interest will be set to
                 cover the entire period of the electrogram traces, and the reference
                 annotations will all be set to 0 ms.
+            dtype (np.dtype, optional): Data type used to store the electrograms, either a floating
+                point type (e.g. np.float32) or np.int16 (see :class:`openep.data_structures.electric.Electrogram`).
+                The default is None, in which case they are stored with the data type of `unipolar`.
         """
 
         # TODO: This method assumes that all mapping points are on the surface, and that there is
@@ -440,25 +751,23 @@ class Case:
         self.electric._include = np.ones_like(names, dtype=int)
         self.electric.frequency = 1000
 
+        from ..case.case_routines import bipolar_from_unipolar_surface_points
         bipolar, pair_indices = bipolar_from_unipolar_surface_points(
             unipolar=unipolar,
             indices=self.indices,
         )
 
-        pairs_A, pairs_B = pair_indices.T
-        unipolar_A = unipolar[pairs_A]
-        unipolar_B = unipolar[pairs_B]
-        points_A = self.points[pairs_A]
-        points_B = self.points[pairs_B]
-
-        # Use both unipolar_A and unipolar_B for `egm`` to mirror the data structure obtained from the clinical cases.
+        # Use both electrodes of each pair for `egm` to mirror the data structure obtained from the clinical cases.
+        # The pairs are gathered once, with shape (N, 2, M), and the last two axes swapped to give (N, M, 2).
+        paired_unipolar = unipolar[pair_indices]
         unipolar_egm = Electrogram(
-            egm=np.concatenate([unipolar_A[:, :, np.newaxis], unipolar_B[:, :, np.newaxis]], axis=2),
-            points=np.concatenate([points_A[:, :, np.newaxis], points_B[:, :, np.newaxis]], axis=2),
-            voltage=np.ptp(unipolar[pair_indices], axis=2)[:, 0],  # axis=2 because of the shape of unipolar[pairs_indices]
+            egm=np.moveaxis(paired_unipolar, 1, 2),
+            points=np.moveaxis(self.points[pair_indices], 1, 2),
+            voltage=np.ptp(paired_unipolar[:, 0], axis=1),
             names=names[pair_indices],
             gain=np.zeros((len(unipolar), 2)),
             is_electrical=self.electric._is_electrical,
+            dtype=dtype,
         )
 
         self.electric._time_indices = np.arange(unipolar_egm.n_samples)
@@ -475,20 +784,20 @@ class Case:
                 gain=np.ones_like(voltage, dtype=float),
                 names=names,
                 is_electrical=self.electric._is_electrical,
+                dtype=dtype,
             )
             self.electric.bipolar_egm = bipolar_egm
 
-            # Update electric surface data
-            mesh = self.create_mesh()
-            mesh.compute_normals(cell_normals=False, point_normals=True, inplace=True)
-            self._create_electric_surface(mesh=mesh)
+            # Update electric surface data, using the cached KD-tree and normals of the surface
+            self._create_electric_surface()
 
         if add_reference:
 
             reference_egm = Electrogram(
-                egm=np.zeros_like(bipolar),
+                egm=np.zeros(bipolar.shape, dtype=bipolar.dtype if dtype is None else dtype),
                 gain=np.full(len(unipolar), dtype=float, fill_value=-4),
                 is_electrical=self.electric._is_electrical,
+                dtype=dtype,
             )
             self.electric.reference_egm = reference_egm
 
@@ -22,8 +22,249 @@ from threading import local
 from attr import attrs, field
 import numpy as np
 
+from ._copy import _copy_array
+
 __all__ = []
 
+_INT16_NAN = np.iinfo(np.int16).min
+_INT16_MAX = np.iinfo(np.int16).max
+_ENCODE_CHUNK_SIZE = 1024
+
+
+def _select_rows(array, mask):
+    """Select the rows of an array for which the mask is True.
+
+    If the selected rows are contiguous, a view of the array is returned rather than a copy.
+    """
+
+    if not isinstance(mask, np.ndarray) or mask.dtype != bool or mask.shape[:1] != np.shape(array)[:1]:
+        return array[mask]
+
+    indices = np.flatnonzero(mask)
+    if indices.size == 0 or indices[-1] - indices[0] + 1 == indices.size:
+        start = indices[0] if indices.size > 0 else 0
+        return array[start:start + indices.size]
+
+    return array[mask]
+
+
+def _encode_signals(signals, dtype):
+    """Convert signals to the data type used to store them.
+
+    Signals have the number of points as their first dimension and the number of samples as their
+    second, e.g. (n_points, n_samples) for bipolar electrograms or (n_points, n_samples, n_channels)
+    for ECGs.
+
+    Floating point types are stored by casting the signals. For int16, each trace (i.e. each point
+    and channel) is scaled so that its largest absolute value is stored as 32767, and NaNs are stored
+    as -32768. The signals are converted a block of points at a time to avoid creating temporary
+    arrays the size of all signals.
+
+    Args:
+        signals (np.ndarray): Signals to convert.
+        dtype (np.dtype): Data type used to store the signals. If None, the signals are stored as given.
+
+    Returns:
+        signals (np.ndarray): The converted signals.
+        scale (np.ndarray): The value of one int16 step of each trace, with shape (n_points, ...).
+            None unless `dtype` is int16.
+    """
+
+    if signals is None or dtype is None:
+        return signals, None
+
+    dtype = np.dtype(dtype)
+    if dtype == np.int16:
+        return _quantise_signals(signals)
+
+    if dtype.kind != 'f':
+        raise ValueError(f"Signals can only be stored as floating point numbers or int16, not {dtype}.")
+
+    return signals.astype(dtype, copy=False), None
+
+
+def _quantise_signals(signals):
+    """Convert signals to int16, returning the codes and the scale of each trace."""
+
+    n_points, _, *n_channels = signals.shape
+    codes = np.empty(signals.shape, dtype=np.int16)
+    scale = np.ones((n_points, *n_channels), dtype=float)
+
+    for start in range(0, n_points, _ENCODE_CHUNK_SIZE):
+        stop = min(start + _ENCODE_CHUNK_SIZE, n_points)
+        block = np.array(signals[start:stop], dtype=float)
+
+        # fmax ignores NaNs. Traces that are entirely NaN or zero keep a scale of one.
+        peak = np.fmax.reduce(np.abs(block), axis=1)
+        is_scaled = np.isfinite(peak) & (peak > 0)
+        scale[start:stop][is_scaled] = peak[is_scaled] / _INT16_MAX
+
+        block /= scale[start:stop, np.newaxis]
+        np.rint(block, out=block)
+        np.clip(block, -_INT16_MAX, _INT16_MAX, out=block)
+        block[np.isnan(block)] = _INT16_NAN
+        codes[start:stop] = block
+
+    return codes, scale
+
+
+def _decode_signals(signals, scale):
+    """Convert stored signals to floating point numbers.
+
+    Signals stored as int16 are returned as float32, which represents every int16 value exactly.
+    Signals stored as floating point numbers (i.e. `scale` is None) are returned unchanged.
+    """
+
+    if signals is None or scale is None:
+        return signals
+
+    decoded = signals.astype(np.float32)
+    decoded *= scale[:, np.newaxis]
+    decoded[signals == _INT16_NAN] = np.NaN
+
+    return decoded
+
+
+def _append_rows(buffers, key, array, rows):
+    """Append rows to an array, amortising the cost of appending repeatedly.
+
+    The returned array is a view of the first rows of a buffer, `buffers[key]`, that has spare
+    capacity. If `array` is the view returned by the previous call with the same key, the new rows
+    are written into the spare capacity and `array` is not copied. Otherwise, or if the buffer is
+    full, a new buffer with capacity for twice the number of rows is allocated. Appending rows one
+    at a time therefore takes amortised O(1) time per row. The spare capacity is not initialised,
+    so (on most operating systems) it does not use physical memory until it is written to.
+
+    Args:
+        buffers (dict): Buffers of the arrays that can be appended to, modified in-place.
+        key (str): Key of the buffer of this array in `buffers`.
+        array (np.ndarray): Array to which the rows will be appended. Can be None.
+        rows (np.ndarray): Rows to append.
+
+    Returns:
+        array (np.ndarray): The array with the rows appended.
+    """
+
+    rows = np.asarray(rows)
+    array = np.empty((0, *rows.shape[1:]), dtype=rows.dtype) if array is None else np.asarray(array)
+    n_rows = len(array)
+    n_total = n_rows + len(rows)
+    dtype = np.result_type(array.dtype, rows.dtype)
+
+    buffer = buffers.get(key)
+    is_buffer_view = (
+        buffer is not None
+        and array.base is buffer
+        and array.__array_interface__['data'][0] == buffer.__array_interface__['data'][0]
+        and array.strides == buffer.strides
+    )
+    if not is_buffer_view or len(buffer) < n_total or buffer.dtype != dtype:
+        buffer = np.empty((2 * n_total, *array.shape[1:]), dtype=dtype)
+        buffer[:n_rows] = array
+        buffers[key] = buffer
+
+    buffer[n_rows:n_total] = rows
+
+    return buffer[:n_total]
+
+
+def _landmark_arrays(names, internal_names, points):
+    """Convert the names, internal names and 3D positions of new landmark points to arrays.
+
+    Raises:
+        ValueError: If there is not one name and one internal name for each point, or if any
+            name or internal name is an empty string.
+    """
+
+    names = np.atleast_1d(np.asarray(names, dtype=str))
+    internal_names = np.atleast_1d(np.asarray(internal_names, dtype=str))
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+
+    if names.size != len(points) or internal_names.size != len(points):
+        raise ValueError("There must be one name and one internal name for each landmark point.")
+    if np.any(names == ''):
+        raise ValueError("name cannot be an empty string.")
+    if np.any(internal_names == ''):
+        raise ValueError("internal_name cannot be an empty string.")
+
+    return names, internal_names, points
+
+
+def _append_electrogram_rows(append, key, electrogram, is_electrical, gain, names, points=None):
+    """Append rows for landmark points, which have no electrical data, to the arrays of an electrogram.
+
+    Args:
+        append (callable): Function that appends rows to an array, e.g. :func:`_append_rows` with
+            the buffers of the electric data.
+        key (str): Prefix of the keys of the buffers of the electrogram's arrays, e.g. 'bipolar_egm'.
+        electrogram (Electrogram): Electrogram to which rows are appended, modified in-place.
+        is_electrical (np.ndarray): Flag for whether each point, including the new ones, has electrical data.
+        gain (np.ndarray): Gain of each new point.
+        names (np.ndarray): Electrode names of each new point.
+        points (np.ndarray, optional): Coordinates of each new point. If None, the electrogram has no points.
+    """
+
+    n_landmarks = len(gain)
+    egm, scale = _missing_signals(electrogram._egm, electrogram._egm_scale, n_landmarks)
+    electrogram._egm = append(f'{key}.egm', electrogram._egm, egm)
+    if scale is not None:
+        electrogram._egm_scale = append(f'{key}.egm_scale', electrogram._egm_scale, scale)
+    if points is not None:
+        electrogram._points = append(f'{key}.points', electrogram._points, points)
+    electrogram._voltage = append(f'{key}.voltage', electrogram._voltage, np.full(n_landmarks, fill_value=np.NaN))
+    electrogram._gain = append(f'{key}.gain', electrogram._gain, gain)
+    electrogram._names = append(f'{key}.names', electrogram._names, names)
+    electrogram._is_electrical = is_electrical
+
+
+def _missing_signals(signals, scale, n_rows):
+    """Create signals for points with no electrical data (i.e. NaNs) in the same format as the stored signals.
+
+    Returns:
+        signals (np.ndarray): The missing signals, with `n_rows` rows.
+        scale (np.ndarray): The scale of each trace if the signals are stored as int16, otherwise None.
+    """
+
+    shape = (n_rows, *np.shape(signals)[1:])
+
+    if scale is not None:
+        return np.full(shape, fill_value=_INT16_NAN, dtype=np.int16), np.ones((n_rows, *scale.shape[1:]))
+
+    dtype = signals.dtype if signals.dtype.kind == 'f' else float
+
+    return np.full(shape, fill_value=np.NaN, dtype=dtype), None
+
+
+def _masked(array, mask, scale=None):
+    """Get the rows of an array for which the mask is True, optionally multiplied by `scale`.
+
+    This is used by the properties of the electric data classes (e.g. `Electrogram.egm`), which
+    return only the rows of the underlying arrays (e.g. `Electrogram._egm`) for which the mask
+    (e.g. `Electrogram._is_electrical`) is True. If these rows are contiguous, e.g. if all points
+    are electrical or landmark points are stored after the electrical points, and `scale` is None,
+    a view of the underlying array is returned rather than a copy.
+    """
+
+    if array is None:
+        return None
+
+    masked = _select_rows(array, mask)
+    if scale is not None:
+        masked = masked * scale
+
+    return masked
+
+
+def _count_rows(array, mask):
+    """Count the rows of an array for which the mask is True, without selecting them."""
+
+    if array is None:
+        return 0
+    if isinstance(mask, np.ndarray) and mask.dtype == bool and mask.shape[:1] == np.shape(array)[:1]:
+        return int(np.count_nonzero(mask))
+
+    return len(array[mask])
+
 
 class LandmarkPoints:
     """Class for storing information about landmark points.
@@ -55,7 +296,7 @@ class LandmarkPoints:
 
     @property
     def points(self):
-        return self._points[self._is_landmark] if self._points is not None else None
+        return _masked(self._points, self._is_landmark)
 
     @property
     def n_points(self):
@@ -63,11 +304,11 @@ class LandmarkPoints:
 
     @property
     def names(self):
-        return self._names[self._is_landmark] if self._names is not None else None
+        return _masked(self._names, self._is_landmark)
 
     @property
     def internal_names(self):
-        return self._internal_names[self._is_landmark] if self._internal_names is not None else None
+        return _masked(self._internal_names, self._is_landmark)
 
     def __repr__(self):
         return f"Landmarks with {self.n_points} landmark points."
@@ -84,6 +325,16 @@ class Electrogram:
         gain (np.ndarray): gain to apply to each signal
         names (np.ndarray): Names of the associated electrodes.
         is_electrical (np.ndarray): Flag for whether each point has electrical data
+        dtype (np.dtype, optional): Data type used to store the electrograms, either a floating
+            point type (e.g. np.float32) or np.int16. The default is None, in which case `egm` is
+            stored as given.
+
+    Note
+    ----
+    Electrograms stored as int16 are quantised separately for each trace, with the largest absolute
+    value of the trace stored as 32767. This uses a quarter of the memory of float64 and preserves
+    the signals to within 1/65534 of their peak amplitude. The electrograms are decoded to float32
+    each time `Electrogram.egm` is accessed, and the decoded array is not cached.
     """
 
     def __init__(
@@ -94,6 +345,7 @@ class Electrogram:
         gain: np.ndarray = None,
         names: np.ndarray = None,
         is_electrical: np.ndarray = None,
+        dtype: np.dtype = None,
     ):
 
         if egm is not None and gain is None:
@@ -108,7 +360,7 @@ class Electrogram:
         if egm is not None and is_electrical is None:
             is_electrical = np.ones(egm.shape[0], dtype=bool)
 
-        self._egm = egm
+        self._egm, self._egm_scale = _encode_signals(egm, dtype)
         self._points = points
         self._voltage = voltage
         self._gain = gain
@@ -120,60 +372,99 @@ class Electrogram:
 
     @property
     def egm(self):
-        return self._egm[self._is_electrical] if self._egm is not None else None
+        return _decode_signals(*self._stored_egm())
+
+    def _stored_egm(self):
+        """Get the electrograms of the electrical points as they are stored, without decoding them.
+
+        Returns:
+            egm (np.ndarray): The stored electrograms.
+            scale (np.ndarray): The value of one int16 step of each trace, or None if the electrograms
+                are not stored as int16.
+        """
+
+        return (
+            _masked(self._egm, self._is_electrical),
+            _masked(self._egm_scale, self._is_electrical),
+        )
+
+    @property
+    def dtype(self):
+        """Data type used to store the electrograms."""
+        return self._egm.dtype if self._egm is not None else None
+
+    def set_dtype(self, dtype):
+        """Change the data type used to store the electrograms.
+
+        Args:
+            dtype (np.dtype): Either a floating point type (e.g. np.float32) or np.int16.
+        """
+
+        if self._egm is None:
+            return
+
+        egm = _decode_signals(self._egm, self._egm_scale)
+        self._egm, self._egm_scale = _encode_signals(egm, dtype)
 
     @property
     def points(self):
-        return self._points[self._is_electrical] if self._points is not None else None
+        return _masked(self._points, self._is_electrical)
 
     @property
     def n_points(self):
-        return self.egm.shape[0] if self._egm is not None else 0
+        return _count_rows(self._egm, self._is_electrical)
 
     @property
     def n_samples(self):
-        return self.egm.shape[1] if self.n_points > 0 else 0
+        return self._egm.shape[1] if self.n_points > 0 else 0
 
     @property
     def voltage(self):
-        return self._voltage[self._is_electrical] if self._voltage is not None else None
+        return _masked(self._voltage, self._is_electrical)
 
     @voltage.setter
     def voltage(self, voltage):
         if isinstance(voltage, np.ndarray) and voltage.shape[0] == self.n_points:
+            self._voltage = np.array(self._voltage)
             self._voltage[self._is_electrical] = voltage
         else:
             self._voltage = voltage
 
     @property
     def gain(self):
-        return self._gain[self._is_electrical] if self._gain is not None else None
+        return _masked(self._gain, self._is_electrical)
 
     @gain.setter
     def gain(self, gain):
         if isinstance(gain, np.ndarray) and gain.shape[0] == self.n_points:
+            self._gain = np.array(self._gain)
             self._gain[self._is_electrical] = gain
         else:
             self._gain = gain
 
     @property
     def names(self):
-        return self._names[self._is_electrical] if self._names is not None else None
+        return _masked(self._names, self._is_electrical)
 
     def __repr__(self):
         return f"Electrograms with {self.n_points} mapping points."
 
-    def copy(self):
-        """Return a deep copy of Electrogram"""
+    def copy(self, deep=True):
+        """Create a copy of Electrogram.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         egm = Electrogram(
-            egm=np.array(self._egm) if self._egm is not None else None,
-            points=np.array(self._points) if self._points is not None else None,
-            voltage=np.array(self._voltage) if self._voltage is not None else None,
-            gain=np.array(self._gain) if self._gain is not None else None,
-            names=np.array(self._names) if self._names is not None else None,
-            is_electrical=np.array(self._is_electrical) if self._is_electrical is not None else None,
+            egm=_copy_array(self._egm, deep),
+            points=_copy_array(self._points, deep),
+            voltage=_copy_array(self._voltage, deep),
+            gain=_copy_array(self._gain, deep),
+            names=_copy_array(self._names, deep),
+            is_electrical=_copy_array(self._is_electrical, deep),
         )
+        egm._egm_scale = _copy_array(self._egm_scale, deep)
 
         return egm
 
@@ -187,6 +478,9 @@ class ECG:
         channel_names (np.ndarray): ECG channel names
         gain (np.ndarray): gain to apply to each signal
         is_electrical: Flag for whether each point has electrical data
+        dtype (np.dtype, optional): Data type used to store the ECGs, either a floating point type
+            (e.g. np.float32) or np.int16. The default is None, in which case `ecg` is stored as
+            given. See :class:`Electrogram` for details of the int16 storage.
     """
 
     def __init__(
@@ -195,6 +489,7 @@ class ECG:
         channel_names: np.ndarray = None,
         gain: np.ndarray = None,
         is_electrical: np.ndarray = None,
+        dtype: np.dtype = None,
     ):
 
         # Ensure gain is present is necessary, and that is has the correct shape
@@ -205,7 +500,7 @@ class ECG:
             n_points, n_samples, n_channels = ecg.shape
             gain = gain.reshape((n_points, n_channels))
 
-        self._ecg = ecg
+        self._ecg, self._ecg_scale = _encode_signals(ecg, dtype)
         self._channel_names = channel_names
         self._gain = gain
 
@@ -215,7 +510,28 @@ class ECG:
 
     @property
     def ecg(self):
-        return self._ecg[self._is_electrical, :, :] if self._ecg is not None else None
+        return _decode_signals(
+            _masked(self._ecg, self._is_electrical),
+            _masked(self._ecg_scale, self._is_electrical),
+        )
+
+    @property
+    def dtype(self):
+        """Data type used to store the ECGs."""
+        return self._ecg.dtype if self._ecg is not None else None
+
+    def set_dtype(self, dtype):
+        """Change the data type used to store the ECGs.
+
+        Args:
+            dtype (np.dtype): Either a floating point type (e.g. np.float32) or np.int16.
+        """
+
+        if self._ecg is None:
+            return
+
+        ecg = _decode_signals(self._ecg, self._ecg_scale)
+        self._ecg, self._ecg_scale = _encode_signals(ecg, dtype)
 
     @property
     def channel_names(self):
@@ -223,23 +539,24 @@ class ECG:
 
     @property
     def n_points(self):
-        return self.ecg.shape[0] if self._ecg is not None else 0
+        return _count_rows(self._ecg, self._is_electrical)
 
     @property
     def n_samples(self):
-        return self.ecg.shape[1] if self.n_points > 0 else 0
+        return self._ecg.shape[1] if self.n_points > 0 else 0
 
     @property
     def n_channels(self):
-        return self.ecg.shape[2] if self.n_points > 0 else 0
+        return self._ecg.shape[2] if self.n_points > 0 else 0
 
     @property
     def gain(self):
-        return self._gain[self._is_electrical, :] if self._gain is not None else None
+        return _masked(self._gain, self._is_electrical)
 
     @gain.setter
     def gain(self, gain):
         if isinstance(gain, np.ndarray) and gain.shape[0] == self.n_points:
+            self._gain = np.array(self._gain)
             self._gain[self._is_electrical] = gain
         else:
             self._gain = gain
@@ -247,15 +564,20 @@ class ECG:
     def __repr__(self):
         return f"ECGs with {self.n_points} signals."
 
-    def copy(self):
-        """Return a deep copy of ECG"""
+    def copy(self, deep=True):
+        """Create a copy of ECG.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         ecg = ECG(
-            ecg=np.array(self._ecg) if self._ecg is not None else None,
-            channel_names=np.array(self._channel_names) if self._channel_names is not None else None,
-            gain=np.array(self._gain) if self._gain is not None else None,
-            is_electrical=np.array(self._is_electrical) if self._is_electrical is not None else None,
+            ecg=_copy_array(self._ecg, deep),
+            channel_names=_copy_array(self._channel_names, deep),
+            gain=_copy_array(self._gain, deep),
+            is_electrical=_copy_array(self._is_electrical, deep),
         )
+        ecg._ecg_scale = _copy_array(self._ecg_scale, deep)
 
         return ecg
 
@@ -278,14 +600,20 @@ class Impedance:
         n_traces = len(self.values) if self.values is not None else 0
         return f"Impedance measurements with {n_traces} traces."
 
-    def copy(self):
-        """Create a deep copy of Impedance"""
+    def copy(self, deep=True):
+        """Create a copy of Impedance.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         impedance = Impedance(
-            times=np.array(self.times) if self.times is not None else None,
-            values=np.array(self.values) if self.values is not None else None,
+            times=_copy_array(self.times, deep),
+            values=_copy_array(self.values, deep),
         )
 
+        return impedance
+
 
 class ElectricSurface:
     """
@@ -317,22 +645,24 @@ class ElectricSurface:
         
     @property
     def nearest_point(self):
-        return self._nearest_point[self._is_electrical] if self._nearest_point is not None else None
+        return _masked(self._nearest_point, self._is_electrical)
 
     @nearest_point.setter
     def nearest_point(self, nearest_point):
         if isinstance(nearest_point, np.ndarray) and nearest_point.shape[0] == self.n_points:
+            self._nearest_point = np.array(self._nearest_point)
             self._nearest_point[self._is_electrical] = nearest_point
         else:
             self._nearest_point = nearest_point
 
     @property
     def normals(self):
-        return self._normals[self._is_electrical] if self._normals is not None else None
+        return _masked(self._normals, self._is_electrical)
 
     @normals.setter
     def normals(self, normals):
         if isinstance(normals, np.ndarray) and normals.shape[0] == self.n_points:
+            self._normals = np.array(self._normals)
             self._normals[self._is_electrical] = normals
         else:
             self._normals = normals
@@ -344,13 +674,17 @@ class ElectricSurface:
     def __repr__(self):
         return f"ElectricSurface with {self.n_points} mapping points."
 
-    def copy(self):
-        """Return a deep copy of ElectricSurface"""
+    def copy(self, deep=True):
+        """Create a copy of ElectricSurface.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         electric_surface = ElectricSurface(
-            nearest_point=np.array(self._nearest_point) if self._nearest_point is not None else None,
-            normals=np.array(self._normals) if self._normals is not None else None,
-            is_electrical=np.array(self._is_electrical) if self._is_electrical is not None else None,
+            nearest_point=_copy_array(self._nearest_point, deep),
+            normals=_copy_array(self._normals, deep),
+            is_electrical=_copy_array(self._is_electrical, deep),
         )
 
         return electric_surface
@@ -385,24 +719,27 @@ class Annotations:
 
     @property
     def window_of_interest(self):
-        try:
-            return self._window_of_interest_indices[self._is_electrical] * 1000.0 / self._frequency
-        except TypeError as e:
-            return None
+        return _masked(
+            self._window_of_interest_indices,
+            self._is_electrical,
+            scale=1000.0 / self._frequency,
+        )
 
     @property
     def local_activation_time(self):
-        try:
-            return self._local_activation_time_indices[self._is_electrical] * 1000.0 / self._frequency
-        except TypeError as e:
-            return None
+        return _masked(
+            self._local_activation_time_indices,
+            self._is_electrical,
+            scale=1000.0 / self._frequency,
+        )
 
     @property
     def reference_activation_time(self):
-        try:
-            return self._reference_activation_time_indices[self._is_electrical] * 1000.0 / self._frequency
-        except TypeError as e:
-            return None
+        return _masked(
+            self._reference_activation_time_indices,
+            self._is_electrical,
+            scale=1000.0 / self._frequency,
+        )
 
     @property
     def n_points(self):
@@ -415,14 +752,18 @@ class Annotations:
     def __repr__(self):
         return f"Annotations with {self.n_points} mapping points."
 
-    def copy(self):
-        """Return a deep copy of Annotations"""
+    def copy(self, deep=True):
+        """Create a copy of Annotations.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
 
         annotations = Annotations(
-            window_of_interest=np.array(self._window_of_interest_indices) if self._window_of_interest_indices is not None else None,
-            local_activation_time=np.array(self._local_activation_time_indices) if self._local_activation_time_indices is not None else None,
-            reference_activation_time=np.array(self._reference_activation_time_indices) if self._reference_activation_time_indices is not None else None,
-            is_electrical=np.array(self._is_electrical) if self._is_electrical is not None else None,
+            window_of_interest=_copy_array(self._window_of_interest_indices, deep),
+            local_activation_time=_copy_array(self._local_activation_time_indices, deep),
+            reference_activation_time=_copy_array(self._reference_activation_time_indices, deep),
+            is_electrical=_copy_array(self._is_electrical, deep),
             frequency=self._frequency,
         )
 
@@ -477,6 +818,7 @@ class Electric:
         self._include = include
         self._is_electrical = is_electrical
         self._is_electrical_indices = np.nonzero(is_electrical)[0].ravel()
+        self._landmark_buffers = {}
         self.bipolar_egm = bipolar_egm
         self.unipolar_egm = unipolar_egm
         self.reference_egm = reference_egm
@@ -528,19 +870,20 @@ class Electric:
 
     @property
     def names(self):
-        return self._names[self._is_electrical] if self._names is not None else None
+        return _masked(self._names, self._is_electrical)
 
     @property
     def internal_names(self):
-        return self._internal_names[self._is_electrical] if self._internal_names is not None else None
+        return _masked(self._internal_names, self._is_electrical)
 
     @property
     def include(self):
-        return self._include[self._is_electrical] if self._include is not None else None
+        return _masked(self._include, self._is_electrical)
 
     @include.setter
     def include(self, include):
         if isinstance(include, np.ndarray) and include.size == self.n_points:
+            self._include = np.array(self._include)
             self._include[self._is_electrical] = include
         else:
             self._include = include
@@ -560,7 +903,6 @@ class Electric:
     def __repr__(self):
         return f"Electric data for {self.n_points} mapping points."
 
-
     def _add_landmark(
         self,
         name: str,
@@ -569,75 +911,63 @@ class Electric:
     ):
         """Add a landmark point."""
 
-        # We need to add rows to **all** all signals
-        # Not necessary for openep-py, but it is for openep-matlab
-
-        if name == '':
-            raise ValueError("name cannot be an empty string.")
-        if internal_name == '':
-            raise ValueError("internal_name cannot be an empty string.")
+        self._add_landmarks([name], [internal_name], np.reshape(point, (1, 3)))
 
-        if isinstance(internal_name, str):
-            internal_name = np.array([internal_name], dtype=str)
-        if isinstance(name, str):
-            name = np.array([name], dtype=str)
-
-        is_electrical = np.array([False], dtype=bool)
-        is_landmark = np.array([True], dtype=bool)
-        include = np.array([False], dtype=int)
+    def _add_landmarks(
+        self,
+        names: np.ndarray,
+        internal_names: np.ndarray,
+        points: np.ndarray,
+    ):
+        """Add landmark points.
 
-        if self._names is None:
-            self._names = name
-        else:
-            self._names = np.hstack([self._names, name])
+        Rows are appended to the arrays of all data using :func:`_append_rows`, so adding many
+        landmarks at once allocates each array once, and adding landmarks one at a time takes
+        amortised O(1) time per landmark.
+        """
 
-        if self._internal_names is None:
-            self._internal_names = internal_name
-        else:
-            self._internal_names = np.hstack([self._internal_names, internal_name])
+        # We need to add rows to **all** all signals
+        # Not necessary for openep-py, but it is for openep-matlab
 
-        if self._is_electrical is None:
-            self._is_electrical = is_electrical
-        else:
-            self._is_electrical = np.hstack([self._is_electrical, is_electrical])
+        names, internal_names, points = _landmark_arrays(names, internal_names, points)
+        n_landmarks = len(points)
 
-        self._is_electrical_indices = np.nonzero(self._is_electrical)[0].ravel()
+        buffers = self._landmark_buffers
 
-        if self._is_landmark is None:
-            self._is_landmark = is_landmark
-        else:
-            self._is_landmark = np.hstack([self._is_landmark, is_landmark])
+        def append(key, array, rows):
+            return _append_rows(buffers, key, array, rows)
 
-        if self._include is None:
-            self._include = include
-        else:
-            self._include = np.hstack([self._include, include])
+        self._names = append('names', self._names, names)
+        self._internal_names = append('internal_names', self._internal_names, internal_names)
+        self._is_electrical = append('is_electrical', self._is_electrical, np.zeros(n_landmarks, dtype=bool))
+        self._is_landmark = append('is_landmark', self._is_landmark, np.ones(n_landmarks, dtype=bool))
+        self._include = append('include', self._include, np.zeros(n_landmarks, dtype=int))
 
-        point = np.asarray(point)
-        if point.ndim == 1:
-            point = point[np.newaxis, :]
+        # Landmarks are added after all existing points, so `self._is_electrical_indices` does not change
 
         # set n_samples to 1 if we have no electrical data
         n_samples = self.bipolar_egm.n_samples or self.unipolar_egm.n_samples or self.ecg.n_samples or 1
-        egm = np.full(n_samples, fill_value=np.NaN, dtype=float)
 
         # We need to create bipolar egm data if it does not exist
         # This is because openep-matlab stores landmark data with the bipolar data
         if self.bipolar_egm._points is None:
 
             self.bipolar_egm = Electrogram(
-                egm=egm,
-                points=point,
+                egm=np.full((n_landmarks, n_samples), fill_value=np.NaN, dtype=float),
+                points=points,
                 is_electrical=self._is_electrical,
             )
 
         else:
-            self.bipolar_egm._egm = np.vstack([self.bipolar_egm._egm, egm])
-            self.bipolar_egm._points = np.vstack([self.bipolar_egm._points, point])
-            self.bipolar_egm._voltage = np.hstack([self.bipolar_egm._voltage, [np.NaN]])
-            self.bipolar_egm._gain = np.hstack([self.bipolar_egm._gain, [1]])
-            self.bipolar_egm._names = np.hstack([self.bipolar_egm._names, [' ']])
-            self.bipolar_egm._is_electrical = self._is_electrical
+            _append_electrogram_rows(
+                append,
+                'bipolar_egm',
+                self.bipolar_egm,
+                is_electrical=self._is_electrical,
+                gain=np.ones(n_landmarks),
+                names=np.full(n_landmarks, fill_value=' '),
+                points=points,
+            )
 
         # Add all landmarks
         self.landmark_points = LandmarkPoints(
@@ -649,68 +979,76 @@ class Electric:
 
         # Update unipolar data if necessary
         if self.unipolar_egm._egm is not None:
-            
-            unipolar_egm = np.full((1, n_samples, 2), fill_value=np.NaN, dtype=float)
-            unipolar_point = np.full((1, 3, 2), fill_value=np.NaN, dtype=float)
-            unipolar_gain = np.zeros((1, 2))
-            unipolar_name = np.full((1, 2), fill_value=' ', dtype=str)
-
-            self.unipolar_egm._egm = np.vstack([self.unipolar_egm._egm, unipolar_egm])
-            self.unipolar_egm._points = np.vstack([self.unipolar_egm._points, unipolar_point])
-            self.unipolar_egm._voltage = np.hstack([self.unipolar_egm._voltage, [np.NaN]])
-            self.unipolar_egm._gain = np.vstack([self.unipolar_egm._gain, unipolar_gain])
-            self.unipolar_egm._names = np.vstack([self.unipolar_egm._names, unipolar_name])
-            self.unipolar_egm._is_electrical = self._is_electrical
+            _append_electrogram_rows(
+                append,
+                'unipolar_egm',
+                self.unipolar_egm,
+                is_electrical=self._is_electrical,
+                gain=np.zeros((n_landmarks, 2)),
+                names=np.full((n_landmarks, 2), fill_value=' '),
+                points=np.full((n_landmarks, 3, 2), fill_value=np.NaN),
+            )
 
         # Update reference data if necessary
         if self.reference_egm._egm is not None:
-            self.reference_egm._egm = np.vstack([self.reference_egm._egm, egm])
-            self.reference_egm._voltage = np.hstack([self.reference_egm._voltage, [np.NaN]])
-            self.reference_egm._gain = np.hstack([self.reference_egm._gain, [1]])
-            self.reference_egm._names = np.hstack([self.reference_egm._names, [' ']])
-            self.reference_egm._is_electrical = self._is_electrical
+            _append_electrogram_rows(
+                append,
+                'reference_egm',
+                self.reference_egm,
+                is_electrical=self._is_electrical,
+                gain=np.ones(n_landmarks),
+                names=np.full(n_landmarks, fill_value=' '),
+            )
 
         # Update ecg data if necessary
         if self.ecg._ecg is not None:
-            ecg = np.full((1, self.ecg.n_samples, self.ecg.n_channels), fill_value=np.NaN, dtype=float)
-            ecg_gain = np.ones((1, self.ecg.n_channels), dtype=float)
 
-            self.ecg._ecg = np.vstack([self.ecg._ecg, ecg])
-            self.ecg._gain = np.vstack([self.ecg._gain, ecg_gain])
+            ecg, scale = _missing_signals(self.ecg._ecg, self.ecg._ecg_scale, n_landmarks)
+            self.ecg._ecg = append('ecg.ecg', self.ecg._ecg, ecg)
+            if scale is not None:
+                self.ecg._ecg_scale = append('ecg.ecg_scale', self.ecg._ecg_scale, scale)
+            self.ecg._gain = append('ecg.gain', self.ecg._gain, np.ones((n_landmarks, self.ecg._ecg.shape[2])))
             self.ecg._is_electrical = self._is_electrical
 
         # Update annotations if necesary
         if self.annotations._window_of_interest_indices is not None:
 
-            woi = np.array([[-8000, 8000]], dtype=int)
-            reference_activation_time = [0]
-            local_activation_time = [0]
-
-            self.annotations._window_of_interest_indices = np.vstack([
-                self.annotations._window_of_interest_indices, woi,
-            ])
-            self.annotations._reference_activation_time_indices = np.hstack([
-                self.annotations._reference_activation_time_indices, reference_activation_time,
-            ])
-            self.annotations._local_activation_time_indices = np.hstack([
-                self.annotations._local_activation_time_indices, local_activation_time,
-            ])
-            self.annotations._is_electrical = self._is_electrical
-
-    def copy(self):
-        """Create a deep copy of Electric."""
-
-        names = np.array(self._names) if self._names is not None else None
-        internal_names = np.array(self._internal_names) if self._internal_names is not None else None
-        include = np.array(self._include) if self._include is not None else None
-        is_electrical = np.array(self._is_electrical) if self._is_electrical is not None else None        
-        bipolar_egm = self.bipolar_egm.copy()
-        unipolar_egm = self.unipolar_egm.copy()
-        reference_egm = self.reference_egm.copy()
-        ecg = self.ecg.copy()
-        impedance = self.impedance.copy()
-        surface = self.surface.copy()
-        annotations = self.annotations.copy()
+            annotations = self.annotations
+            annotations._window_of_interest_indices = append(
+                'annotations.window_of_interest',
+                annotations._window_of_interest_indices,
+                np.tile([-8000, 8000], reps=(n_landmarks, 1)),
+            )
+            annotations._reference_activation_time_indices = append(
+                'annotations.reference_activation_time',
+                annotations._reference_activation_time_indices,
+                np.zeros(n_landmarks, dtype=int),
+            )
+            annotations._local_activation_time_indices = append(
+                'annotations.local_activation_time',
+                annotations._local_activation_time_indices,
+                np.zeros(n_landmarks, dtype=int),
+            )
+            annotations._is_electrical = self._is_electrical
+
+    def copy(self, deep=True):
+        """Create a copy of Electric.
+
+        Args:
+            deep (bool): If False, the arrays are shared with this object as read-only views rather than copied.
+        """
+
+        names = _copy_array(self._names, deep)
+        internal_names = _copy_array(self._internal_names, deep)
+        include = _copy_array(self._include, deep)
+        is_electrical = _copy_array(self._is_electrical, deep)        
+        bipolar_egm = self.bipolar_egm.copy(deep)
+        unipolar_egm = self.unipolar_egm.copy(deep)
+        reference_egm = self.reference_egm.copy(deep)
+        ecg = self.ecg.copy(deep)
+        impedance = self.impedance.copy(deep)
+        surface = self.surface.copy(deep)
+        annotations = self.annotations.copy(deep)
         frequency = self.frequency
 
         bipolar_egm._is_electrical = is_electrical if bipolar_egm._is_electrical is not None else None
@@ -747,59 +1085,73 @@ def _decode_string_arrays(arr):
     return np.asarray([item if isinstance(item, str) else item.tobytes().decode('utf-16') for item in arr])
 
 
-def extract_electric_data(electric_data):
-    """Extract electric data from a dictionary.
+def _find_electrical_points(egm):
+    """Determine which mapping points have electrical data.
+
+    Landmark-only points have NaN values for every sample of their bipolar electrogram.
+    Only the whole electrogram of points whose first sample is NaN is checked, as the
+    electrograms may not have been read into memory yet (see :class:`openep.io.matlab.LazyArray`).
 
     Args:
-        electric_data (dict): Dictionary containing numpy arrays that describe the
-            electric data associated with electrograms taken at various mapping points.
+        egm (np.ndarray): Bipolar electrograms of all mapping points.
 
     Returns:
-        electric (Electric): object containing electric data associated with electrograms
-            taken at various mapping points.
+        is_electrical (np.ndarray): Flag for whether each point has electrical data.
     """
 
-    if electric_data['egm'].size == 0 and electric_data['egmUni'].size == 0:
-        return Electric()
+    is_electrical = ~np.isnan(np.asarray(egm[:, 0], dtype=float))
+    maybe_landmark = np.nonzero(~is_electrical)[0]
+    if maybe_landmark.size > 0:
+        maybe_landmark_egm = np.asarray(egm[maybe_landmark], dtype=float)
+        is_electrical[maybe_landmark] = ~np.all(np.isnan(maybe_landmark_egm), axis=1)
 
-    names = electric_data['tags'].astype(str)
-    internal_names = electric_data['names'].astype(str)
+    return is_electrical
 
-    # electric.include is a later addition to the openep format
-    if 'include' in electric_data:
-        include = electric_data['include'].astype(int)
-    else:
-        include = np.full_like(
-            names,
-            fill_value=True,
-            dtype=int,
-        )
 
-    # We need to know which points are landmark only and have no electrical data.
-    # Those that have NaN values for 
-    is_electrical = ~np.all(np.isnan(electric_data['egm'].astype(float)), axis=1)
+def _array_or_none(array, dtype=None):
+    """Get an array of electric data, or None if it is empty (i.e. the data were not exported).
+
+    Args:
+        array (np.ndarray): The array, or None.
+        dtype (type, optional): Data type to which the array is converted. The default is None, in
+            which case the array is returned as it is (e.g. electrograms that have not been loaded yet).
+    """
+
+    if array is None or array.size == 0:
+        return None
+
+    return array if dtype is None else array.astype(dtype)
+
+
+def _extract_unipolar_data(electric_data, egm_dtype=None):
+    """Add default unipolar data and electrode names, which older OpenEP datasets do not have, in-place."""
 
-    # Older versions of OpenEP datasets did not have unipolar data or electrode names. Add deafult ones here.
     if 'electrodeNames_bip' not in electric_data:
+        internal_names = electric_data['names']
         electric_data['electrodeNames_bip'] = np.full_like(internal_names, fill_value="", dtype=str)
-    electric_data['electrodeNames_bip'] = _decode_string_arrays(electric_data['electrodeNames_bip'])
-    electric_data['electrodeNames_bip'] =  electric_data['electrodeNames_bip'].astype(str)
+    electric_data['electrodeNames_bip'] = _decode_string_arrays(electric_data['electrodeNames_bip']).astype(str)
 
     if 'egmUni' not in electric_data:
-        electric_data['egmUni'] =  np.array([])
+        electric_data['egmUni'] = np.array([])
         electric_data['egmUniX'] = np.array([])
         electric_data['voltages']['unipolar'] = np.array([])
         electric_data['electrodeNames_uni'] = np.array([])
     else:
-        electric_data['egmUni'] = electric_data['egmUni'].astype(float)
+        if egm_dtype is None:
+            electric_data['egmUni'] = electric_data['egmUni'].astype(float)
         electric_data['egmUniX'] = electric_data['egmUniX'].astype(float)
         electric_data['voltages']['unipolar'] = electric_data['voltages']['unipolar'].astype(float)
+
     if 'electrodeNames_uni' not in electric_data:
-            electric_data['electrodeNames_uni'] = np.full((len(electric_data['egmUni']), 2), fill_value="", dtype=str)
+        electric_data['electrodeNames_uni'] = np.full((len(electric_data['egmUni']), 2), fill_value="", dtype=str)
     if electric_data['electrodeNames_uni'].ndim == 2:
         electric_data['electrodeNames_uni'][:, 0] = _decode_string_arrays(electric_data['electrodeNames_uni'][:, 0])
         electric_data['electrodeNames_uni'][:, 1] = _decode_string_arrays(electric_data['electrodeNames_uni'][:, 1])
-    electric_data['electrodeNames_uni'] =  electric_data['electrodeNames_uni'].astype(str)
+    electric_data['electrodeNames_uni'] = electric_data['electrodeNames_uni'].astype(str)
+
+
+def _extract_ecg_data(electric_data, egm_dtype=None):
+    """Reshape the ECGs to (N_points x N_samples x N_channels) and add default channel names, in-place."""
 
     # Make ecgs correct shape
     ecg_dims = electric_data['ecg'].ndim
@@ -819,10 +1171,13 @@ def extract_electric_data(electric_data):
     if electric_data['ecgNames'].size == 0:
         electric_data['ecg'] = None
         electric_data['ecgNames'] = None
-    else:
+    elif egm_dtype is None:
         electric_data['ecg'] = electric_data['ecg'].astype(float)
 
-    # Not all datasets have gain values
+
+def _extract_gains(electric_data):
+    """Add default gains, which not all datasets have, in-place."""
+
     egm_types = ['', 'Ref', 'Uni']  # bipolar, reference, unipolar
     default_gain_values = [1.0, -4.0, 0.0]
     for egm_type, default_gain_value in zip(egm_types, default_gain_values):
@@ -842,39 +1197,86 @@ def extract_electric_data(electric_data):
     if electric_data['egmUniGain'] is not None and electric_data['egmUniGain'].ndim == 1:
         electric_data['egmUniGain'] = np.tile(electric_data['egmUniGain'], reps=(2, 1)).T
 
-    if 'ecgGain' not in electric_data or electric_data['ecgGain'].size == 0:
-        electric_data['ecgGain'] = None
+    electric_data['ecgGain'] = _array_or_none(electric_data.get('ecgGain'), dtype=float)
+
+
+def extract_electric_data(electric_data, egm_dtype=None):
+    """Extract electric data from a dictionary.
+
+    Args:
+        electric_data (dict): Dictionary containing numpy arrays that describe the
+            electric data associated with electrograms taken at various mapping points.
+        egm_dtype (np.dtype, optional): Data type used to store the bipolar, unipolar and reference
+            electrograms and the ECGs, either a floating point type or np.int16 (see :class:`Electrogram`).
+            The default is None, in which case they are stored as float64.
+
+    Returns:
+        electric (Electric): object containing electric data associated with electrograms
+            taken at various mapping points.
+    """
+
+    # If the bipolar electrograms were not loaded, the reader will have determined which points are electrical
+    if 'isElectrical' in electric_data:
+        is_electrical = electric_data['isElectrical'].astype(bool)
+    elif electric_data['egm'].size == 0 and electric_data['egmUni'].size == 0:
+        return Electric()
     else:
-        electric_data['ecgGain'] = electric_data['ecgGain'].astype(float)
+        is_electrical = _find_electrical_points(electric_data['egm'])
+
+    names = _array_or_none(electric_data['tags'], dtype=str)
+    internal_names = _array_or_none(electric_data['names'], dtype=str)
+
+    # electric.include is a later addition to the openep format
+    if 'include' in electric_data:
+        include = electric_data['include'].astype(int)
+    else:
+        include = np.full_like(
+            is_electrical,
+            fill_value=True,
+            dtype=int,
+        )
+
+    _extract_unipolar_data(electric_data, egm_dtype=egm_dtype)
+    _extract_ecg_data(electric_data, egm_dtype=egm_dtype)
+    _extract_gains(electric_data)
+
+    has_unipolar = electric_data['egmUni'].size > 0
+    has_reference = electric_data['egmRef'].size > 0
+    has_ecg = electric_data['ecg'] is not None and electric_data['ecg'].size > 0
+    has_surface = electric_data['egmSurfX'].size > 0
 
     # Create objects to pass to Electric
     bipolar_egm = Electrogram(
-        egm=electric_data['egm'].astype(float),
-        points=electric_data['egmX'].astype(float),
-        voltage=electric_data['voltages']['bipolar'].astype(float),
+        egm=_array_or_none(electric_data['egm']),
+        points=_array_or_none(electric_data['egmX'], dtype=float),
+        voltage=_array_or_none(electric_data['voltages']['bipolar'], dtype=float),
         gain=electric_data['egmGain'],
-        names=electric_data['electrodeNames_bip'].astype(str) if electric_data['electrodeNames_bip'].size > 0 else None,
+        names=_array_or_none(electric_data['electrodeNames_bip'], dtype=str),
         is_electrical=is_electrical,
+        dtype=float if egm_dtype is None else egm_dtype,
     )
     unipolar_egm = Electrogram(
-        egm=electric_data['egmUni'] if electric_data['egmUni'].size > 0 else None,
-        points=electric_data['egmUniX'] if electric_data['egmUniX'].size > 0 else None,
-        voltage=electric_data['voltages']['unipolar'] if electric_data['voltages']['unipolar'].size > 0 else None,
+        egm=_array_or_none(electric_data['egmUni']),
+        points=_array_or_none(electric_data['egmUniX']),
+        voltage=_array_or_none(electric_data['voltages']['unipolar']),
         gain=electric_data['egmUniGain'],
-        names=electric_data['electrodeNames_uni'] if electric_data['electrodeNames_uni'].size > 0 else None,
-        is_electrical=is_electrical if electric_data['egmUni'].size > 0 else None,
+        names=_array_or_none(electric_data['electrodeNames_uni']),
+        is_electrical=is_electrical if has_unipolar else None,
+        dtype=egm_dtype,
     )
     reference_egm = Electrogram(
-        egm=electric_data['egmRef'].astype(float) if electric_data['egmRef'].size > 0 else None,
+        egm=_array_or_none(electric_data['egmRef']),
         gain=electric_data['egmRefGain'],
-        is_electrical=is_electrical if electric_data['egmRef'].size > 0 else None,
+        is_electrical=is_electrical if has_reference else None,
+        dtype=float if egm_dtype is None else egm_dtype,
     )
 
     ecg = ECG(
         ecg=electric_data['ecg'],
         channel_names=electric_data['ecgNames'],
         gain=electric_data['ecgGain'],
-        is_electrical=is_electrical if electric_data['ecg'] is not None and electric_data['ecg'].size > 0 else None,
+        is_electrical=is_electrical if has_ecg else None,
+        dtype=egm_dtype,
     )
 
     try:
@@ -891,9 +1293,9 @@ def extract_electric_data(electric_data):
     )
 
     surface = ElectricSurface(
-        nearest_point=electric_data['egmSurfX'].astype(float) if electric_data['egmSurfX'].astype(float).size > 0 else None,
-        normals=electric_data['barDirection'].astype(float) if electric_data['barDirection'].astype(float).size > 0 else None,
-        is_electrical=is_electrical if electric_data['egmSurfX'].size > 0 else None,
+        nearest_point=_array_or_none(electric_data['egmSurfX'], dtype=float),
+        normals=_array_or_none(electric_data['barDirection'], dtype=float),
+        is_electrical=is_electrical if has_surface else None,
     )
 
     # If no sample frequency is specified, assume it's 1000 Hz
@@ -904,9 +1306,9 @@ def extract_electric_data(electric_data):
         frequency = 1000.0
 
     annotations = Annotations(
-        window_of_interest=electric_data['annotations']['woi'].astype(int),
-        local_activation_time=electric_data['annotations']['mapAnnot'].astype(int),
-        reference_activation_time=electric_data['annotations']['referenceAnnot'].astype(int),
+        window_of_interest=_array_or_none(electric_data['annotations']['woi'], dtype=int),
+        local_activation_time=_array_or_none(electric_data['annotations']['mapAnnot'], dtype=int),
+        reference_activation_time=_array_or_none(electric_data['annotations']['referenceAnnot'], dtype=int),
         frequency=frequency,
         is_electrical=is_electrical,
     )
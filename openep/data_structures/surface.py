@@ -21,6 +21,8 @@
 from attr import attrs
 import numpy as np
 
+from ._copy import _copy_array
+
 __all__ = []
 
 
@@ -72,14 +74,19 @@ class Fields:
     def __contains__(self, field):
         return field in self.__dict__.keys()
 
-    def copy(self):
-        """Create a deep copy of Fields"""
+    def copy(self, deep=True):
+        """Create a copy of Fields.
+
+        Args:
+            deep (bool): If False, the fields are shared with this object as read-only views rather
+                than copied. Assign a new array to a field to change it.
+        """
 
         fields = Fields()
         for field in self:
             if self[field] is None:
                 continue
-            fields[field] = np.array(self[field])
+            fields[field] = _copy_array(self[field], deep)
 
         return fields
 
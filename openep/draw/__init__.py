@@ -1,7 +1,27 @@
 __all__ = ['draw_routines']
 
-from .draw_routines import (
-    draw_free_boundaries,
-    draw_map,
-    plot_electrograms,
-)
+import importlib
+
+# Functions are only imported from `draw_routines` when they are first accessed
+_ATTRIBUTES = [
+    'draw_free_boundaries',
+    'draw_map',
+    'plot_electrograms',
+]
+
+
+def __getattr__(name):
+
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module('.draw_routines', __name__), name)
+    elif name == 'draw_routines':
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES) | {'draw_routines'})
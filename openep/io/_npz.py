@@ -0,0 +1,291 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""Native binary format for OpenEP cases.
+
+A case is stored as an uncompressed numpy `.npz` archive. Each array is stored as a
+separate member, named by its location in the Case, e.g. 'points', 'fields/bipolar_voltage'
+and 'electric/bipolar_egm/egm'. Attributes that are None are not stored. Ragged arrays
+(e.g. impedance traces of different lengths) are stored as the concatenation of all
+arrays, '<key>/data', and the length of each array, '<key>/lengths'.
+
+As the members are not compressed, each array can be memory-mapped directly from the
+archive.
+
+Signals stored as int16 (see :class:`openep.data_structures.electric.Electrogram`) are saved
+as int16, with the scale of each trace saved as e.g. 'electric/bipolar_egm/egm_scale'. Such
+files have schema version 2; all other files have version 1, so they can still be read by
+earlier versions of openep.
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+
+from ..data_structures.surface import Fields
+from ..data_structures.electric import Electric, Electrogram, ECG, Impedance, ElectricSurface, Annotations
+from ..data_structures.ablation import Ablation, AblationForce
+from ..data_structures.case import Case
+
+__all__ = []
+
+SCHEMA_VERSION = 2
+
+_ELECTROGRAM_ATTRIBUTES = ['egm', 'points', 'voltage', 'gain', 'names']
+_FORCE_ATTRIBUTES = ['times', 'force', 'axial_angle', 'lateral_angle', 'points']
+_ABLATION_ATTRIBUTES = ['times', 'power', 'impedance', 'temperature']
+
+
+def _add_array(arrays, key, value):
+    """Add an array to the dictionary of arrays to be saved, unless it is None."""
+
+    if value is None:
+        return
+
+    if isinstance(value, list):
+        value = [np.ravel(element) for element in value]
+        arrays[f'{key}/data'] = np.concatenate(value) if value else np.array([], dtype=float)
+        arrays[f'{key}/lengths'] = np.array([element.size for element in value], dtype=np.int64)
+        return
+
+    value = np.asarray(value)
+    arrays[key] = value.astype(str) if value.dtype == object else value
+
+
+def _get_array(arrays, key):
+    """Get an array from the loaded arrays. Return None if the array was not stored."""
+
+    if key in arrays:
+        return arrays[key]
+
+    if f'{key}/lengths' not in arrays:
+        return None
+
+    data = arrays[f'{key}/data']
+    lengths = arrays[f'{key}/lengths']
+    elements = np.split(data, np.cumsum(lengths)[:-1]) if lengths.size > 0 else []
+
+    return [element if element.size > 1 else float(element[0]) for element in elements]
+
+
+def _case_to_arrays(case):
+    """Create a flat dictionary of all arrays in a case."""
+
+    arrays = {}
+    arrays['name'] = np.array(case.name, dtype=str)
+
+    _add_array(arrays, 'notes', case.notes)
+    _add_array(arrays, 'points', case.points)
+    _add_array(arrays, 'indices', case.indices)
+
+    for field in case.fields:
+        _add_array(arrays, f'fields/{field}', case.fields[field])
+
+    electric = case.electric
+    _add_array(arrays, 'electric/names', electric._names)
+    _add_array(arrays, 'electric/internal_names', electric._internal_names)
+    _add_array(arrays, 'electric/include', electric._include)
+    _add_array(arrays, 'electric/is_electrical', electric._is_electrical)
+    _add_array(arrays, 'electric/frequency', electric.frequency)
+
+    for egm_type in ['bipolar_egm', 'unipolar_egm', 'reference_egm']:
+        egm = getattr(electric, egm_type)
+        for attribute in _ELECTROGRAM_ATTRIBUTES:
+            _add_array(arrays, f'electric/{egm_type}/{attribute}', getattr(egm, f'_{attribute}'))
+        _add_array(arrays, f'electric/{egm_type}/egm_scale', egm._egm_scale)
+
+    _add_array(arrays, 'electric/ecg/ecg', electric.ecg._ecg)
+    _add_array(arrays, 'electric/ecg/ecg_scale', electric.ecg._ecg_scale)
+    _add_array(arrays, 'electric/ecg/channel_names', electric.ecg._channel_names)
+    _add_array(arrays, 'electric/ecg/gain', electric.ecg._gain)
+
+    _add_array(arrays, 'electric/impedance/times', electric.impedance.times)
+    _add_array(arrays, 'electric/impedance/values', electric.impedance.values)
+
+    _add_array(arrays, 'electric/surface/nearest_point', electric.surface._nearest_point)
+    _add_array(arrays, 'electric/surface/normals', electric.surface._normals)
+
+    annotations = electric.annotations
+    _add_array(arrays, 'electric/annotations/window_of_interest', annotations._window_of_interest_indices)
+    _add_array(arrays, 'electric/annotations/local_activation_time', annotations._local_activation_time_indices)
+    _add_array(arrays, 'electric/annotations/reference_activation_time', annotations._reference_activation_time_indices)
+    _add_array(arrays, 'electric/annotations/frequency', annotations.frequency)
+
+    # Files without int16 signals can still be read by versions of openep that only read schema version 1
+    scales = [getattr(electric, egm_type)._egm_scale for egm_type in ['bipolar_egm', 'unipolar_egm', 'reference_egm']]
+    scales.append(electric.ecg._ecg_scale)
+    arrays['version'] = np.array(SCHEMA_VERSION if any(scale is not None for scale in scales) else 1)
+
+    arrays['has_ablation'] = np.array(case.ablation is not None)
+    if case.ablation is not None:
+        for attribute in _ABLATION_ATTRIBUTES:
+            _add_array(arrays, f'ablation/{attribute}', getattr(case.ablation, attribute))
+        if case.ablation.force is not None:
+            for attribute in _FORCE_ATTRIBUTES:
+                _add_array(arrays, f'ablation/force/{attribute}', getattr(case.ablation.force, attribute))
+
+    return arrays
+
+
+def _arrays_to_case(arrays, name=None):
+    """Create a case from a flat dictionary of arrays."""
+
+    version = int(arrays['version'])
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"The case was saved with schema version {version}, but only versions up to "
+            f"{SCHEMA_VERSION} can be read. Please update openep."
+        )
+
+    name = str(arrays['name']) if name is None else name
+
+    fields = Fields()
+    for field in fields:
+        fields[field] = _get_array(arrays, f'fields/{field}')
+
+    is_electrical = _get_array(arrays, 'electric/is_electrical')
+
+    def _electrogram(egm_type):
+        egm_arrays = {
+            attribute: _get_array(arrays, f'electric/{egm_type}/{attribute}') for attribute in _ELECTROGRAM_ATTRIBUTES
+        }
+        if all(value is None for value in egm_arrays.values()):
+            return None
+        electrogram = Electrogram(**egm_arrays, is_electrical=is_electrical if egm_arrays['egm'] is not None else None)
+        electrogram._egm_scale = _get_array(arrays, f'electric/{egm_type}/egm_scale')
+
+        return electrogram
+
+    ecg = ECG(
+        ecg=_get_array(arrays, 'electric/ecg/ecg'),
+        channel_names=_get_array(arrays, 'electric/ecg/channel_names'),
+        gain=_get_array(arrays, 'electric/ecg/gain'),
+        is_electrical=is_electrical if 'electric/ecg/ecg' in arrays else None,
+    )
+    ecg._ecg_scale = _get_array(arrays, 'electric/ecg/ecg_scale')
+
+    nearest_point = _get_array(arrays, 'electric/surface/nearest_point')
+    frequency = _get_array(arrays, 'electric/frequency')
+
+    electric = Electric(
+        names=_get_array(arrays, 'electric/names'),
+        internal_names=_get_array(arrays, 'electric/internal_names'),
+        include=_get_array(arrays, 'electric/include'),
+        is_electrical=is_electrical,
+        bipolar_egm=_electrogram('bipolar_egm'),
+        unipolar_egm=_electrogram('unipolar_egm'),
+        reference_egm=_electrogram('reference_egm'),
+        ecg=ecg,
+        impedance=Impedance(
+            times=_get_array(arrays, 'electric/impedance/times'),
+            values=_get_array(arrays, 'electric/impedance/values'),
+        ),
+        surface=ElectricSurface(
+            nearest_point=nearest_point,
+            normals=_get_array(arrays, 'electric/surface/normals'),
+            is_electrical=is_electrical if nearest_point is not None else None,
+        ),
+        annotations=Annotations(
+            window_of_interest=_get_array(arrays, 'electric/annotations/window_of_interest'),
+            local_activation_time=_get_array(arrays, 'electric/annotations/local_activation_time'),
+            reference_activation_time=_get_array(arrays, 'electric/annotations/reference_activation_time'),
+            is_electrical=is_electrical,
+            frequency=float(arrays.get('electric/annotations/frequency', 1000)),
+        ),
+        frequency=float(frequency) if frequency is not None else 1000,
+    )
+
+    ablation = None
+    if bool(arrays['has_ablation']):
+        force = AblationForce(**{
+            attribute: _get_array(arrays, f'ablation/force/{attribute}') for attribute in _FORCE_ATTRIBUTES
+        })
+        ablation = Ablation(
+            **{attribute: _get_array(arrays, f'ablation/{attribute}') for attribute in _ABLATION_ATTRIBUTES},
+            force=force,
+        )
+
+    return Case(
+        name=name,
+        points=_get_array(arrays, 'points'),
+        indices=_get_array(arrays, 'indices'),
+        fields=fields,
+        electric=electric,
+        ablation=ablation,
+        notes=_get_array(arrays, 'notes'),
+    )
+
+
+def _save_npz(filename, arrays):
+    """Save arrays to an uncompressed .npz file."""
+
+    np.savez(filename, **arrays)
+
+
+def _load_npz(filename, mmap_mode=None):
+    """Load all arrays from an .npz file.
+
+    Args:
+        filename (str): Path to the .npz file.
+        mmap_mode (str, optional): If not None, arrays are memory-mapped from the file using
+            the given mode (see :func:`numpy.memmap`) rather than being read into memory.
+
+    Returns:
+        arrays (dict): The arrays, with the '.npy' extension removed from each key.
+    """
+
+    arrays = {}
+    with zipfile.ZipFile(filename) as archive, open(filename, 'rb') as file_pointer:
+
+        for info in archive.infolist():
+
+            key = info.filename[:-len('.npy')]
+
+            if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[key] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # The size of the local file header is 30 bytes plus the size of the member name
+            # and extra field. These sizes can differ from those in the central directory.
+            file_pointer.seek(info.header_offset + 26)
+            name_size, extra_size = struct.unpack('<HH', file_pointer.read(4))
+            file_pointer.seek(info.header_offset + 30 + name_size + extra_size)
+
+            version = np.lib.format.read_magic(file_pointer)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file_pointer)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file_pointer)
+
+            # Empty and zero-dimensional arrays cannot be memory-mapped
+            if len(shape) == 0 or 0 in shape:
+                arrays[key] = np.fromfile(file_pointer, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+                continue
+
+            arrays[key] = np.memmap(
+                filename,
+                dtype=dtype,
+                mode=mmap_mode,
+                offset=file_pointer.tell(),
+                shape=shape,
+                order='F' if fortran_order else 'C',
+            )
+
+    return arrays
@@ -0,0 +1,634 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+"""Readers and writers for openCARP mesh files.
+
+Text files (.pts, .elem, .lon) are written a block of rows at a time, with each block
+formatted by a single string-formatting operation. When reading, text files are memory-mapped
+and parsed in a single pass by a compiled tokenizer, directly into a preallocated array.
+
+Binary files (.bpts, .belem) have a 1024-byte text header, which contains the number of items
+and an endianness flag (0 for little-endian, 1 for big-endian), followed by the data as 32-bit
+floats (.bpts) or integers (.belem). In a .belem file, each element is stored as its type, its
+node indices, and its region tag.
+"""
+
+import os
+
+import numba
+import numpy as np
+
+__all__ = []
+
+_BINARY_HEADER_SIZE = 1024
+_WRITE_BLOCK_SIZE = 100_000  # rows
+_BINARY_TRIANGLE = 6  # element type of triangles in binary openCARP files
+
+# Powers of ten that can be represented exactly by a float64
+_EXACT_POWERS_OF_TEN = 10.0 ** np.arange(23)
+
+
+@numba.jit(nopython=True, cache=True)
+def _is_space(char):
+    return char == 32 or 9 <= char <= 13
+
+
+@numba.jit(nopython=True, cache=True)
+def _count_tokens(buffer):
+    """Count the whitespace-separated tokens in a buffer of bytes."""
+
+    n_tokens = 0
+    in_token = False
+    for char in buffer:
+        is_space = _is_space(char)
+        if not is_space and not in_token:
+            n_tokens += 1
+        in_token = not is_space
+
+    return n_tokens
+
+
+@numba.jit(nopython=True, cache=True)
+def _is_digit(char):
+    return 48 <= char <= 57
+
+
+@numba.jit(nopython=True, cache=True)
+def _is_letter(char):
+    return 65 <= char <= 90 or 97 <= char <= 122
+
+
+@numba.jit(nopython=True, cache=True)
+def _is_token_end(buffer, index):
+    return index >= buffer.size or _is_space(buffer[index])
+
+
+@numba.jit(nopython=True, cache=True)
+def _match_token(buffer, index, token):
+    """Check that the token that starts at `index` is equal to `token`.
+
+    Returns:
+        index (int): Index of the byte after the token, or -1 if it is not equal to `token`.
+    """
+
+    start = index
+    while not _is_token_end(buffer, index):
+        index += 1
+    if index - start != token.size:
+        return -1
+    for offset in range(token.size):
+        if buffer[start + offset] != token[offset]:
+            return -1
+
+    return index
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_sign(buffer, index):
+    """Parse an optional '-' or '+'.
+
+    Returns:
+        sign (int): -1 or 1.
+        index (int): Index of the byte after the sign.
+    """
+
+    if index < buffer.size and (buffer[index] == 45 or buffer[index] == 43):  # '-' or '+'
+        return (-1 if buffer[index] == 45 else 1), index + 1
+
+    return 1, index
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_digits(buffer, index, value, n_significant, max_significant):
+    """Parse a run of decimal digits, appending them to the digits of `value`.
+
+    Parsing stops early if there are more than `max_significant` significant digits, which the
+    caller must check for.
+
+    Returns:
+        value (int): `value` with the digits appended.
+        n_significant (int): `n_significant` plus the number of digits that are not leading zeros.
+        n_digits (int): Number of digits parsed.
+        index (int): Index of the byte after the digits.
+    """
+
+    start = index
+    while index < buffer.size and _is_digit(buffer[index]) and n_significant <= max_significant:
+        value = 10 * value + (buffer[index] - 48)
+        n_significant += 1 if value > 0 else 0
+        index += 1
+
+    return value, n_significant, index - start, index
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_int(buffer, index):
+    """Parse the integer that starts at `index`.
+
+    Returns:
+        value (int): The integer.
+        index (int): Index of the byte after the integer, or -1 if the token is not an integer.
+    """
+
+    sign, index = _parse_sign(buffer, index)
+    value, n_significant, n_digits, index = _parse_digits(buffer, index, 0, 0, 18)
+    if n_digits == 0 or n_significant > 18 or not _is_token_end(buffer, index):
+        return 0, -1
+
+    return sign * value, index
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_exponent(buffer, index):
+    """Parse the optional exponent of a decimal number, e.g. 'e-5'.
+
+    Returns:
+        exponent (int): The exponent, or 0 if there is none.
+        index (int): Index of the byte after the exponent, or -1 if the exponent is invalid.
+    """
+
+    if index >= buffer.size or (buffer[index] != 101 and buffer[index] != 69):  # 'e' or 'E'
+        return 0, index
+
+    sign, index = _parse_sign(buffer, index + 1)
+    exponent, n_significant, n_digits, index = _parse_digits(buffer, index, 0, 0, 4)
+    if n_digits == 0 or n_significant > 4:
+        return 0, -1
+
+    return sign * exponent, index
+
+
+@numba.jit(nopython=True, cache=True)
+def _scale(significand, exponent, powers_of_ten):
+    """Calculate significand * 10**exponent.
+
+    Returns:
+        value (float): The result.
+        is_exact (bool): False if the power of ten cannot be represented exactly.
+    """
+
+    if significand == 0:
+        return 0.0, True
+    if exponent > 22 or exponent < -22:
+        return 0.0, False
+    if exponent >= 0:
+        return significand * powers_of_ten[exponent], True
+
+    return significand / powers_of_ten[-exponent], True
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_float(buffer, index, powers_of_ten):
+    """Parse the decimal number that starts at `index`.
+
+    Returns:
+        value (float): The number.
+        index (int): Index of the byte after the number, or -1 if it cannot be parsed exactly.
+    """
+
+    sign, index = _parse_sign(buffer, index)
+    significand, n_significant, n_integer_digits, index = _parse_digits(buffer, index, 0, 0, 15)
+
+    n_fraction_digits = 0
+    if index < buffer.size and buffer[index] == 46 and n_significant <= 15:  # '.'
+        significand, n_significant, n_fraction_digits, index = _parse_digits(
+            buffer, index + 1, significand, n_significant, 15,
+        )
+
+    exponent, index = _parse_exponent(buffer, index)
+    if n_significant > 15 or n_integer_digits + n_fraction_digits == 0 or index == -1:
+        return 0.0, -1
+
+    value, is_exact = _scale(significand, exponent - n_fraction_digits, powers_of_ten)
+    if not is_exact or not _is_token_end(buffer, index):
+        return 0.0, -1
+
+    return sign * value, index
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_ints(buffer, out, element_type):
+    """Parse whitespace-separated integers from a buffer of bytes.
+
+    Tokens that start with a letter are skipped, but must be equal to `element_type`.
+
+    Returns:
+        n_values (int): Number of integers parsed. This is -1 if a token is not an integer or
+            is an element of a different type, or if there are more integers than fit in `out`.
+    """
+
+    n_values = 0
+    index = 0
+    while index < buffer.size:
+
+        if _is_space(buffer[index]):
+            index += 1
+            continue
+
+        if _is_letter(buffer[index]):
+            index = _match_token(buffer, index, element_type)
+        elif n_values < out.size:
+            out[n_values], index = _parse_int(buffer, index)
+            n_values += 1
+        else:
+            index = -1
+
+        if index == -1:
+            return -1
+
+    return n_values
+
+
+@numba.jit(nopython=True, cache=True)
+def _parse_floats(buffer, out, powers_of_ten):
+    """Parse whitespace-separated decimal numbers from a buffer of bytes.
+
+    Numbers are only parsed if they can be converted exactly, i.e. if the significand has
+    at most 15 digits and the magnitude of the decimal exponent is at most 22. The result is
+    then identical to that of `float`.
+
+    Returns:
+        n_values (int): Number of numbers parsed. This is -1 if any number cannot be parsed
+            exactly, or if there are more numbers than fit in `out`.
+    """
+
+    n_values = 0
+    index = 0
+    while index < buffer.size:
+
+        if _is_space(buffer[index]):
+            index += 1
+            continue
+
+        if n_values == out.size:
+            return -1
+        out[n_values], index = _parse_float(buffer, index, powers_of_ten)
+        n_values += 1
+        if index == -1:
+            return -1
+
+    return n_values
+
+
+def _parse_text(buffer, n_columns, dtype, n_rows=None, element_type=b''):
+    """Parse the whitespace-separated values in a buffer of bytes.
+
+    Args:
+        buffer (np.ndarray): Bytes to parse, e.g. a memory-mapped file without its header.
+        n_columns (int): Number of values on each line.
+        dtype (type): Data type of the values, either int or float.
+        n_rows (int, optional): Number of lines. If None, this is determined by counting the values.
+        element_type (bytes, optional): Type of element that begins each line (integers only).
+
+    Returns:
+        values (np.ndarray): Array of shape (n_rows, n_columns).
+    """
+
+    if n_rows is None:
+        n_values = _count_tokens(buffer)
+        n_rows = (n_values // (n_columns + 1)) if element_type else (n_values // n_columns)
+
+    values = np.empty(n_rows * n_columns, dtype=dtype)
+
+    if dtype is int:
+        element_type = np.frombuffer(element_type, dtype=np.uint8)
+        n_values = _parse_ints(buffer, values, element_type)
+    else:
+        n_values = _parse_floats(buffer, values, _EXACT_POWERS_OF_TEN)
+
+    if n_values == -1 and dtype is float:
+        # Some numbers cannot be converted exactly by the tokenizer. Let numpy parse the text.
+        values = np.fromstring(buffer.tobytes(), dtype=float, sep=' ')
+        n_values = values.size
+
+    if n_values != n_rows * n_columns:
+        raise ValueError(f"Expected {n_rows} lines of {n_columns} values.")
+
+    return values.reshape(n_rows, n_columns)
+
+
+def _map_text(filename):
+    """Memory-map a text file.
+
+    Returns:
+        header (bytes): The first line of the file.
+        buffer (np.ndarray): The remainder of the file.
+    """
+
+    with open(filename, 'rb') as file_pointer:
+        header = file_pointer.readline()
+
+    buffer = np.memmap(filename, dtype=np.uint8, mode='r') if len(header) > 0 else np.empty(0, dtype=np.uint8)
+
+    return header, buffer[len(header):]
+
+
+def _read_pts(filename):
+    """Read the coordinates of points from a .pts file."""
+
+    header, buffer = _map_text(filename)
+
+    return _parse_text(buffer, n_columns=3, dtype=float, n_rows=int(header))
+
+
+def _read_elem(filename):
+    """Read triangles and their regions from an .elem file.
+
+    Returns:
+        indices (np.ndarray): Indices of the points that make up each triangle.
+        cell_region (np.ndarray): Region of each triangle.
+    """
+
+    header, buffer = _map_text(filename)
+
+    first_element_type = bytes(buffer[:16]).split()[0] if buffer.size > 0 else b'Tr'
+    if first_element_type != b'Tr':
+        raise ValueError(f"Only triangular meshes are supported, not elements of type {first_element_type.decode()}.")
+
+    try:
+        elements = _parse_text(buffer, n_columns=4, dtype=int, n_rows=int(header), element_type=b'Tr')
+    except ValueError as e:
+        raise ValueError("Only triangular meshes, with a region for each element, are supported.") from e
+
+    return elements[:, :3], elements[:, 3]
+
+
+def _read_lon(filename):
+    """Read the fibre orientation of each element from a .lon file."""
+
+    header, buffer = _map_text(filename)
+
+    return _parse_text(buffer, n_columns=3 * int(header), dtype=float)
+
+
+def _read_binary_header(file_pointer):
+    """Read the header of a binary openCARP file.
+
+    Returns:
+        n_items (int): Number of points or elements in the file.
+        byte_order (str): '<' for little-endian data or '>' for big-endian data.
+    """
+
+    header = file_pointer.read(_BINARY_HEADER_SIZE).split(b'\x00')[0].split()
+    n_items = int(header[0])
+    byte_order = '>' if len(header) > 1 and int(header[1]) == 1 else '<'
+
+    return n_items, byte_order
+
+
+def _read_bpts(filename):
+    """Read the coordinates of points from a binary .bpts file."""
+
+    with open(filename, 'rb') as file_pointer:
+        n_points, byte_order = _read_binary_header(file_pointer)
+        points = np.fromfile(file_pointer, dtype=f'{byte_order}f4', count=3 * n_points)
+
+    return points.reshape(n_points, 3).astype(float)
+
+
+def _read_belem(filename):
+    """Read triangles and their regions from a binary .belem file.
+
+    Returns:
+        indices (np.ndarray): Indices of the points that make up each triangle.
+        cell_region (np.ndarray): Region of each triangle.
+    """
+
+    with open(filename, 'rb') as file_pointer:
+        n_elements, byte_order = _read_binary_header(file_pointer)
+        elements = np.fromfile(file_pointer, dtype=f'{byte_order}i4', count=5 * n_elements)
+
+    if elements.size > 0 and elements[0] != _BINARY_TRIANGLE:
+        raise ValueError(f"Only triangular meshes are supported, not elements of type {elements[0]}.")
+
+    elements = elements.reshape(n_elements, 5)
+    if np.any(elements[:, 0] != _BINARY_TRIANGLE):
+        raise ValueError("Only triangular meshes are supported.")
+
+    return elements[:, 1:4].astype(int), elements[:, 4].astype(int)
+
+
+_IGB_HEADER_SIZE = 1024
+_IGB_DTYPES = {
+    'byte': 'u1',
+    'char': 'i1',
+    'short': 'i2',
+    'int': 'i4',
+    'long': 'i8',
+    'float': 'f4',
+    'double': 'f8',
+}
+
+
+def _read_igb_header(filename):
+    """Read the header of an .igb file.
+
+    The header is 1024 bytes of text containing 'key:value' pairs, e.g. 'x:1000 y:1 z:1 t:500
+    type:float systeme:little_endian'.
+
+    Returns:
+        n_points (int): Number of vertices.
+        n_samples (int): Number of time steps.
+        dtype (np.dtype): Data type of the values.
+    """
+
+    with open(filename, 'rb') as file_pointer:
+        header = file_pointer.read(_IGB_HEADER_SIZE).decode('ascii', errors='ignore')
+
+    items = dict(item.split(':', 1) for item in header.split() if ':' in item)
+
+    data_type = items.get('type', 'float')
+    if data_type not in _IGB_DTYPES:
+        raise ValueError(f"Cannot read .igb files of type '{data_type}'.")
+
+    byte_order = '>' if items.get('systeme', 'little_endian') == 'big_endian' else '<'
+    n_points = int(items['x']) * int(items.get('y', 1)) * int(items.get('z', 1))
+    n_samples = int(items['t'])
+
+    return n_points, n_samples, np.dtype(byte_order + _IGB_DTYPES[data_type])
+
+
+def _check_vertices(vertices, n_points):
+    """Convert the indices of the vertices to load to an integer array.
+
+    Negative indices are wrapped, as they would be by numpy.
+
+    Raises:
+        IndexError: If any index is outside the range [-n_points, n_points).
+    """
+
+    if vertices is None:
+        return np.arange(n_points)
+
+    vertices = np.asarray(vertices, dtype=np.int64).reshape(-1)
+
+    out_of_bounds = (vertices < -n_points) | (vertices >= n_points)
+    if np.any(out_of_bounds):
+        raise IndexError(f"Index {vertices[out_of_bounds][0]} is out of bounds for a file with {n_points} vertices.")
+
+    return np.where(vertices < 0, vertices + n_points, vertices)
+
+
+@numba.jit(nopython=True, cache=True, parallel=True)
+def _transpose_frames(frames, vertices, out, start):
+    """Copy the values of the selected vertices from frames of shape (N_samples x N_points)
+    into columns of `out` of shape (N_vertices x N_samples), starting at column `start`.
+
+    The vertices are not bounds-checked, and must be validated by `_check_vertices`.
+    """
+
+    for index in numba.prange(vertices.size):
+        vertex = vertices[index]
+        for frame in range(frames.shape[0]):
+            out[index, start + frame] = frames[frame, vertex]
+
+
+def _read_igb(filename, vertices, out, chunk_size):
+    """Read the selected vertices from an .igb file, `chunk_size` time steps at a time."""
+
+    n_points, n_samples, dtype = _read_igb_header(filename)
+
+    # If the simulation has not finished, the file will contain fewer time steps
+    file_size = os.path.getsize(filename)
+    n_samples = min(n_samples, (file_size - _IGB_HEADER_SIZE) // (n_points * dtype.itemsize))
+
+    data = np.memmap(filename, dtype=dtype, mode='r', offset=_IGB_HEADER_SIZE, shape=(n_samples, n_points))
+    for start in range(0, n_samples, chunk_size):
+        frames = data[start:start + chunk_size].astype(dtype.newbyteorder('='), copy=False)
+        _transpose_frames(frames, vertices, out, start)
+
+    return n_samples
+
+
+@numba.jit(nopython=True, cache=True)
+def _skip_lines(buffer, start, n_lines):
+    """Find the end of the next `n_lines` non-empty lines in a buffer of bytes.
+
+    Returns:
+        end (int): Index of the byte that follows the last of these lines.
+        n_found (int): Number of non-empty lines found. This is fewer than `n_lines` if the
+            end of the buffer is reached.
+    """
+
+    n_bytes = buffer.size
+    n_found = 0
+    index = start
+
+    while index < n_bytes and n_found < n_lines:
+        is_empty = True
+        while index < n_bytes and buffer[index] != 10:  # '\n'
+            is_empty = is_empty and _is_space(buffer[index])
+            index += 1
+        index += 1
+        n_found += 0 if is_empty else 1
+
+    return min(index, n_bytes), n_found
+
+
+def _read_dat_header(filename):
+    """Count the lines (vertices) and columns (time steps) of a .dat file.
+
+    Returns:
+        n_points (int): Number of vertices.
+        n_samples (int): Number of time steps.
+    """
+
+    buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+
+    _, n_points = _skip_lines(buffer, 0, np.iinfo(np.int64).max)
+    end_first_line, _ = _skip_lines(buffer, 0, 1)
+    n_samples = _count_tokens(buffer[:end_first_line])
+
+    return n_points, n_samples
+
+
+def _read_dat(filename, vertices, out, chunk_size):
+    """Read the selected rows (vertices) of a text file of shape (N_points x N_samples),
+    `chunk_size` lines at a time."""
+
+    buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+    n_samples = out.shape[1]
+
+    # Sort the vertices so that those in each block of lines form a contiguous range
+    order = np.argsort(vertices, kind='stable')
+    sorted_vertices = vertices[order]
+
+    start = 0
+    first_row = 0
+    while start < buffer.size:
+
+        end, n_rows = _skip_lines(buffer, start, chunk_size)
+        if n_rows == 0:
+            break
+
+        first, last = np.searchsorted(sorted_vertices, [first_row, first_row + n_rows])
+        if last > first:
+            block = _parse_text(buffer[start:end], n_columns=n_samples, dtype=float, n_rows=n_rows)
+            out[order[first:last]] = block[sorted_vertices[first:last] - first_row]
+
+        start = end
+        first_row += n_rows
+
+    return n_samples
+
+
+def _write_text(filename, header, values, row_format, block_size=_WRITE_BLOCK_SIZE):
+    """Write a header line followed by one line per row of `values`.
+
+    Args:
+        filename (str): Path to the file to be written.
+        header (str): First line of the file.
+        values (np.ndarray): 2D array of values.
+        row_format (str): Format of each line, e.g. 'Tr %d %d %d %d'.
+        block_size (int): Number of rows to format at once.
+    """
+
+    row_format = row_format + '\n'
+
+    with open(filename, 'w') as file_pointer:
+        file_pointer.write(f'{header}\n')
+        for start in range(0, len(values), block_size):
+            block = values[start:start + block_size]
+            file_pointer.write((row_format * len(block)) % tuple(block.ravel().tolist()))
+
+
+def _write_binary(filename, n_items, values):
+    """Write a binary openCARP file with a 1024-byte header."""
+
+    header = f'{n_items} 0'.encode('ascii').ljust(_BINARY_HEADER_SIZE, b'\x00')
+
+    with open(filename, 'wb') as file_pointer:
+        file_pointer.write(header)
+        values.tofile(file_pointer)
+
+
+def _write_bpts(filename, points):
+    """Write the coordinates of points to a binary .bpts file."""
+
+    _write_binary(filename, len(points), np.ascontiguousarray(points, dtype='<f4'))
+
+
+def _write_belem(filename, indices, cell_region):
+    """Write triangles and their regions to a binary .belem file."""
+
+    elements = np.empty((len(indices), 5), dtype='<i4')
+    elements[:, 0] = _BINARY_TRIANGLE
+    elements[:, 1:4] = indices
+    elements[:, 4] = cell_region
+
+    _write_binary(filename, len(indices), elements)
@@ -17,13 +17,332 @@ import h5py
 import scipy.io
 import numpy as np
 
+from ..data_structures.electric import _find_electrical_points
+
 __all__ = []
 
 
-def _dereference_strings(file_pointer, references):
-    """Resolve an array of references that point to strings."""
+def _parse_field_selection(fields):
+    """Convert field names, e.g. `{'surface', 'electric.annotations'}`, into tuples of keys."""
+
+    if fields is None:
+        return None
+
+    if isinstance(fields, str):
+        fields = [fields]
+
+    return tuple(tuple(field.split('.')) for field in fields)
+
+
+def _startswith(keys, prefixes):
+    """Check whether the tuple of keys starts with any of the prefixes."""
+
+    return any(keys[:len(prefix)] == prefix for prefix in prefixes)
+
+
+def _is_selected(keys, include=None, exclude=None):
+    """Check whether a field should be loaded.
+
+    Args:
+        keys (tuple): Nested keys of the field, e.g. `('electric', 'annotations', 'woi')`.
+        include (tuple, optional): Prefixes of fields to load. If None, all fields are loaded
+            unless they are excluded.
+        exclude (tuple, optional): Prefixes of fields not to load. This takes precedence over
+            `include`.
+    """
+
+    if exclude is not None and _startswith(keys, exclude):
+        return False
+
+    return include is None or _startswith(keys, include)
+
+
+def _is_group_selected(keys, include=None, exclude=None):
+    """Check whether any field within a group will be loaded."""
+
+    if exclude is not None and _startswith(keys, exclude):
+        return False
+
+    return include is None or any(
+        keys[:len(prefix)] == prefix or prefix[:len(keys)] == keys for prefix in include
+    )
+
+
+class LazyArray:
+    """Read-only, sliceable proxy for an array stored in a v7.3 MATLAB (HDF5) file.
+
+    MATLAB stores arrays in column-major order, so the axes of the HDF5 dataset are reversed
+    relative to the array represented here. Data are only read from disk when the proxy is
+    indexed or converted to a numpy array.
+
+    Selecting rows (i.e. indexing only the first axis with a slice, or an integer or boolean
+    array) returns another `LazyArray`. Any other indexing reads the selected data and returns
+    a numpy array. The HDF5 file stays open while any proxy that refers to it exists.
+
+    Args:
+        dataset (h5py.Dataset): dataset containing the array.
+        dtype (np.dtype, optional): data type of the arrays that are returned. Defaults to the
+            data type of `dataset`.
+        rows (np.ndarray, optional): indices of the rows (first axis) represented by this proxy.
+            Defaults to None, in which case all rows are represented.
+        n_new_axes (int, optional): number of trailing axes of length one that are not present
+            in `dataset`.
+    """
+
+    __slots__ = ('_dataset', '_dtype', '_rows', '_n_new_axes')
+
+    def __init__(self, dataset, dtype=None, rows=None, n_new_axes=0):
+
+        self._dataset = dataset
+        self._dtype = np.dtype(dataset.dtype if dtype is None else dtype)
+        self._rows = rows
+        self._n_new_axes = n_new_axes
+
+    def __repr__(self):
+        return f"LazyArray(shape={self.shape}, dtype={self.dtype})"
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def shape(self):
+        n_rows, *other_dims = self._dataset.shape[::-1]
+        n_rows = n_rows if self._rows is None else len(self._rows)
+        return (n_rows, *other_dims, *(1,) * self._n_new_axes)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def dtype(self):
+        return self._dtype
 
-    return np.asarray([file_pointer.get(ref)[:].tobytes().decode('utf-16') for ref in references])
+    def astype(self, dtype, copy=True):
+        """Return a proxy whose data will be cast to `dtype` when read."""
+        return LazyArray(self._dataset, dtype=dtype, rows=self._rows, n_new_axes=self._n_new_axes)
+
+    def reshape(self, *shape):
+        """Add trailing axes of length one. Any other reshape reads the data."""
+
+        shape = tuple(shape[0]) if len(shape) == 1 and isinstance(shape[0], (tuple, list)) else shape
+        n_new_axes = len(shape) - self.ndim
+        if n_new_axes >= 0 and shape == self.shape + (1,) * n_new_axes:
+            return LazyArray(self._dataset, dtype=self._dtype, rows=self._rows, n_new_axes=self._n_new_axes + n_new_axes)
+
+        return np.asarray(self).reshape(shape)
+
+    def copy(self):
+        """Read the data into a new numpy array."""
+        return np.array(self)
+
+    def __array__(self, dtype=None, copy=None):
+        data = self._read(slice(None), ())
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def __getitem__(self, key):
+
+        key = key if isinstance(key, tuple) else (key,)
+        if any(k is None or k is Ellipsis for k in key):
+            return np.asarray(self)[key]
+
+        row_key, other_keys = key[0], key[1:]
+        selects_rows_only = all(isinstance(k, slice) and k == slice(None) for k in other_keys)
+        if selects_rows_only and not isinstance(row_key, (int, np.integer)):
+            return LazyArray(
+                self._dataset,
+                dtype=self._dtype,
+                rows=self._select_rows(row_key),
+                n_new_axes=self._n_new_axes,
+            )
+
+        return self._read(row_key, other_keys)
+
+    def _select_rows(self, row_key):
+        """Determine the indices of the rows selected by `row_key`."""
+
+        if isinstance(row_key, slice) and row_key == slice(None):
+            return self._rows
+
+        rows = np.arange(self._dataset.shape[-1]) if self._rows is None else self._rows
+        return rows[row_key]
+
+    def _read(self, row_key, other_keys):
+        """Read the data selected by `row_key` along the first axis and `other_keys` along the others."""
+
+        n_dataset_axes = self._dataset.ndim - 1
+        other_keys = (*other_keys, *(slice(None),) * (n_dataset_axes + self._n_new_axes - len(other_keys)))
+        dataset_keys, new_axis_keys = other_keys[:n_dataset_axes], other_keys[n_dataset_axes:]
+
+        # Only slices and integers can be passed directly to h5py. Anything else is applied in memory.
+        in_memory_keys = None
+        if not all(isinstance(k, (slice, int, np.integer)) for k in dataset_keys):
+            in_memory_keys = dataset_keys
+            dataset_keys = (slice(None),) * n_dataset_axes
+
+        is_single_row = isinstance(row_key, (int, np.integer))
+        rows = self._select_rows(np.atleast_1d(row_key) if is_single_row else row_key)
+        data = self._read_rows(rows, dataset_keys)
+
+        if in_memory_keys is not None:
+            data = data[(slice(None), *in_memory_keys)]
+        if self._n_new_axes > 0:
+            data = data.reshape(*data.shape, *(1,) * self._n_new_axes)
+            data = data[(Ellipsis, *new_axis_keys)]
+
+        return data[0] if is_single_row else data
+
+    def _read_rows(self, rows, dataset_keys):
+        """Read whole rows from the dataset, reversing the order of the axes."""
+
+        dataset_keys = tuple(dataset_keys[::-1])
+
+        if rows is None:
+            return self._dataset[(*dataset_keys, slice(None))].T.astype(self._dtype, copy=False)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size == 0:
+            return self._dataset[(*dataset_keys, slice(0, 0))].T.astype(self._dtype, copy=False)
+
+        # h5py can only read increasing indices. If the rows are close together it is faster to
+        # read a single block and select rows from that.
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        start, stop = unique_rows[0], unique_rows[-1] + 1
+        if 2 * unique_rows.size >= stop - start:
+            selection = slice(start, stop)
+            take = rows - start
+        else:
+            selection = unique_rows
+            take = inverse.ravel()
+
+        data = self._dataset[(*dataset_keys, selection)].T
+        if take.size != len(data) or np.any(take != np.arange(take.size)):
+            data = data[take]
+
+        return data.astype(self._dtype, copy=False)
+
+
+def _read_reference_addresses(dataset):
+    """Read the addresses of the objects referred to by a dataset of object references."""
+
+    addresses = np.empty(dataset.shape, dtype=np.uint64)
+    dataset.id.read(h5py.h5s.ALL, h5py.h5s.ALL, addresses, mtype=h5py.h5t.STD_REF_OBJ)
+
+    return addresses.ravel()
+
+
+def _read_char_datasets(file_pointer, dataset_ids):
+    """Read datasets of UTF-16 code units into a single array.
+
+    If the file was opened from a filename with the default driver, the raw data of contiguous
+    datasets is gathered from a memory map of the file in a single operation. Other datasets
+    (e.g. compressed ones, or all datasets of a file-like object) are read individually by h5py.
+
+    Returns:
+        chars (np.ndarray): Code units of all datasets, concatenated.
+        lengths (np.ndarray): Number of code units in each dataset.
+    """
+
+    n_datasets = len(dataset_ids)
+    lengths = np.zeros(n_datasets, dtype=np.int64)
+    file_offsets = np.full(n_datasets, fill_value=-1, dtype=np.int64)
+
+    # The file offsets are only those of the bytes of `file_pointer.filename` if it was opened with
+    # the default driver, and not e.g. from a file-like object or in memory.
+    use_file_offsets = file_pointer.driver == 'sec2'
+
+    for index, dataset_id in enumerate(dataset_ids):
+
+        # Empty strings are stored as the shape of the string
+        if h5py.h5a.exists(dataset_id, b'MATLAB_empty'):
+            continue
+
+        # The offset is None unless the dataset is contiguous, in which case the storage size is the
+        # size of the data
+        offset = dataset_id.get_offset() if use_file_offsets else None
+        if offset is not None:
+            file_offsets[index] = offset
+            lengths[index] = dataset_id.get_storage_size() // 2
+        else:
+            lengths[index] = np.prod(dataset_id.shape)
+
+    starts = np.zeros(n_datasets + 1, dtype=np.int64)
+    np.cumsum(lengths, out=starts[1:])
+    chars = np.empty(starts[-1], dtype=np.uint16)
+
+    is_contiguous = (file_offsets >= 0) & (lengths > 0)
+    if np.any(is_contiguous):
+        contiguous_lengths = lengths[is_contiguous]
+        byte_indices = _ranges(file_offsets[is_contiguous], 2 * contiguous_lengths)
+        file_bytes = np.memmap(file_pointer.filename, dtype=np.uint8, mode='r')
+        chars[_ranges(starts[:-1][is_contiguous], contiguous_lengths)] = file_bytes[byte_indices].view('<u2')
+        del file_bytes
+
+    for index in np.nonzero(~is_contiguous & (lengths > 0))[0]:
+        dataset_chars = np.empty(dataset_ids[index].shape, dtype=np.uint16)
+        dataset_ids[index].read(h5py.h5s.ALL, h5py.h5s.ALL, dataset_chars)
+        chars[starts[index]:starts[index + 1]] = dataset_chars.ravel()
+
+    return chars, lengths
+
+
+def _ranges(starts, lengths):
+    """Concatenate the ranges `start, start + 1, ..., start + length - 1` for each start and length."""
+
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1]) + np.repeat(starts - ends + lengths, lengths)
+
+
+def _decode_utf16(chars, lengths):
+    """Decode concatenated UTF-16 code units into an array of strings."""
+
+    n_strings = len(lengths)
+    max_length = max(lengths.max(initial=0), 1)
+
+    starts = np.cumsum(lengths) - lengths
+
+    # Characters outside the basic multilingual plane are encoded by two code units.
+    # These are rare, so in this case each string is decoded individually.
+    if np.any((chars >= 0xD800) & (chars < 0xE000)):
+        return np.asarray([
+            chars[start:start + length].tobytes().decode('utf-16-le') for start, length in zip(starts, lengths)
+        ])
+
+    code_points = np.zeros((n_strings, max_length), dtype=np.uint32)
+    rows = np.repeat(np.arange(n_strings), lengths)
+    columns = np.arange(chars.size) - np.repeat(starts, lengths)
+    code_points[rows, columns] = chars
+
+    return code_points.view(np.dtype(('U', max_length))).ravel()
+
+
+def _dereference_strings(file_pointer, dataset):
+    """Resolve a dataset of references that point to strings.
+
+    MATLAB stores each string in a cell array as a separate dataset. Each of these is opened
+    only once, however many times it is referenced, and all strings are then read and decoded
+    together.
+    """
+
+    # Empty cell arrays are stored as the shape of the array
+    if h5py.check_ref_dtype(dataset.dtype) is None:
+        return np.asarray([], dtype=str)
+
+    references = dataset[:].ravel()
+    if references.size == 0:
+        return np.asarray([], dtype=str)
+
+    addresses = _read_reference_addresses(dataset)
+    _, first_indices, inverse = np.unique(addresses, return_index=True, return_inverse=True)
+
+    dataset_ids = [h5py.h5r.dereference(references[index], file_pointer.id) for index in first_indices]
+    chars, lengths = _read_char_datasets(file_pointer, dataset_ids)
+
+    return _decode_utf16(chars, lengths)[inverse.ravel()]
 
 
 def _decode_string(ints):
@@ -42,8 +361,18 @@ def _dereference_impedances(file_pointer, references):
     elements = [element.astype(float) if element.size > 1 else float(element) for element in elements]
     return elements
 
-def _visit_mat_v73_(file_pointer):
-    """Extract all arrays from a HDF5 matlab file."""
+def _visit_mat_v73_(file_pointer, lazy=False, include=None, exclude=None):
+    """Extract all arrays from a HDF5 matlab file.
+
+    If `lazy` is True, electrograms and ECGs are not read. Instead, they are
+    represented by a :class:`LazyArray`.
+
+    Only the fields selected by `include` and `exclude` are read (see
+    :func:`_is_selected`). If any electric data is selected but the bipolar
+    electrograms are not, only enough of the bipolar electrograms is read to
+    determine which points are electrical, and this is stored as
+    'userdata/electric/isElectrical'.
+    """
 
     strings_to_dereference = {
         'userdata/notes',
@@ -63,6 +392,13 @@ def _visit_mat_v73_(file_pointer):
         'userdata/electric/impedances/value',
     }
 
+    lazy_arrays = {
+        'userdata/electric/egm',
+        'userdata/electric/egmUni',
+        'userdata/electric/egmRef',
+        'userdata/electric/ecg',
+    } if lazy else set()
+
     data = {}
 
     def _visitor(key, value):
@@ -72,15 +408,34 @@ def _visit_mat_v73_(file_pointer):
             and not key.startswith('#refs#')
         ):
 
-            values = value[:]
+            keys = tuple(key.split('/')[1:])
+            if not _is_selected(keys, include=include, exclude=exclude):
+
+                if (
+                    key == 'userdata/electric/egm'
+                    and _is_group_selected(('electric',), include=include, exclude=exclude)
+                    and value.ndim > 1
+                    and 'MATLAB_empty' not in value.attrs
+                ):
+                    data['userdata/electric/isElectrical'] = _find_electrical_points(LazyArray(value))
+
+                return
+
+            # Empty MATLAB arrays are stored as the shape of the array
+            if key in lazy_arrays and value.ndim > 1 and 'MATLAB_empty' not in value.attrs:
+                data[key] = LazyArray(value)
+                return
 
             if key in strings_to_dereference:
-                values = _dereference_strings(
+                data[key] = _dereference_strings(
                     file_pointer=file_pointer,
-                    references=values.ravel(),
+                    dataset=value,
                 )
+                return
 
-            elif key in strings_to_decode:
+            values = value[:]
+
+            if key in strings_to_decode:
                 values = _decode_string(values.ravel())
 
             elif key in impedances_to_dereference:
@@ -171,17 +526,29 @@ def _mat_v73_flat_to_nested(data):
     return nested_data
 
 
-def _load_mat_v73(filename):
+def _load_mat_v73(filename, lazy=False, include=None, exclude=None):
     """
     Load a v7.3 MATLAB file.
 
     h5py is used to read the file.
 
     Currently, all references in the HDF5 file are resolved except for 'userdata/rfindex/grid'
+
+    If `lazy` is True, the file is left open and electrograms and ECGs are represented
+    by a :class:`LazyArray` rather than being read into memory.
+
+    Fields that are not selected by `include` and `exclude` (e.g. `{'surface', 'electric.annotations'}`)
+    are never read from disk.
     """
 
-    with h5py.File(filename, "r") as f:
-        data = _visit_mat_v73_(f)
+    include = _parse_field_selection(include)
+    exclude = _parse_field_selection(exclude)
+
+    if lazy:
+        data = _visit_mat_v73_(h5py.File(filename, "r"), lazy=True, include=include, exclude=exclude)
+    else:
+        with h5py.File(filename, "r") as f:
+            data = _visit_mat_v73_(f, include=include, exclude=exclude)
 
     # rfindex is a matlab class - not readable with Python
     data.pop('userdata/rfindex/tag', None)
@@ -215,13 +582,56 @@ def _cast_to_float(arr):
     return [a.astype(float) if isinstance(a, np.ndarray) else a for a in arr]
 
 
-def _load_mat_below_v73(filename):
+def _select_fields(data, include=None, exclude=None, keys=()):
+    """Remove fields that are not selected from a nested dictionary."""
+
+    selected = {}
+    for key, value in data.items():
+
+        nested_keys = (*keys, key)
+        if isinstance(value, dict) and _is_group_selected(nested_keys, include=include, exclude=exclude):
+            selected[key] = _select_fields(value, include=include, exclude=exclude, keys=nested_keys)
+        elif _is_selected(nested_keys, include=include, exclude=exclude):
+            selected[key] = value
+
+    return selected
+
+
+def _select_loaded_fields(data, include, exclude):
+    """Discard the fields of a loaded dataset that are not selected by `include` and `exclude`.
+
+    If the electrograms are discarded, the electrical points are found from them first.
+    """
+
+    is_electrical = None
+    if (
+        not _is_selected(('electric', 'egm'), include=include, exclude=exclude)
+        and _is_group_selected(('electric',), include=include, exclude=exclude)
+        and np.ndim(data['electric']['egm']) > 1
+    ):
+        is_electrical = _find_electrical_points(data['electric']['egm'])
+
+    data = _select_fields(data, include=include, exclude=exclude)
+
+    if is_electrical is not None:
+        data['electric']['isElectrical'] = is_electrical
+
+    return data
+
+
+def _load_mat_below_v73(filename, include=None, exclude=None):
     """
     Load a MATLAB file of version less than v7.3
 
     scipy.io.loadmat is used to read the file.
+
+    scipy can only read whole variables, so all of `userdata` is read. Fields that are not
+    selected by `include` and `exclude` are then discarded before they are decoded.
     """
 
+    include = _parse_field_selection(include)
+    exclude = _parse_field_selection(exclude)
+
     data = scipy.io.loadmat(
         filename,
         appendmat=False,
@@ -232,17 +642,25 @@ def _load_mat_below_v73(filename):
         simplify_cells=True,
     )['userdata']
 
-    data['electric']['tags'] = _decode_tags(data['electric']['tags'])
+    if include is not None or exclude is not None:
+        data = _select_loaded_fields(data, include=include, exclude=exclude)
 
-    data['electric']['impedances']['time'] = _cast_to_float(data['electric']['impedances']['time'])
-    data['electric']['impedances']['value'] = _cast_to_float(data['electric']['impedances']['value'])
+    electric_data = data.get('electric', {})
+
+    if 'tags' in electric_data:
+        electric_data['tags'] = _decode_tags(electric_data['tags'])
+
+    for key in ['time', 'value']:
+        if key in electric_data.get('impedances', {}):
+            electric_data['impedances'][key] = _cast_to_float(electric_data['impedances'][key])
 
     try:
         # this will only exist if triRep is a struct, not TriRep or Triangulation object
-        data['surface']['triRep']['Triangulation']
-        
+        if 'triRep' in data.get('surface', {}):
+            data['surface']['triRep']['Triangulation']
+
     except ValueError as e:
-        
+
         if str(e) != 'no field of name Triangulation':
             raise e
         else:
@@ -48,7 +48,9 @@ See :class:`openep.data_structures.case.Case` for information on the attributes
 and methods of `Case`.
 
 .. autofunction:: load_openep_mat
+.. autofunction:: load_openep_npz
 .. autofunction:: load_opencarp
+.. autofunction:: load_opencarp_signals
 
 """
 
@@ -56,16 +58,23 @@ import os
 import scipy.io
 
 import numpy as np
-import pyvista
 
-from . import _circle_cvi
 from .matlab import _load_mat_v73, _load_mat_below_v73
+from ._npz import _load_npz, _arrays_to_case
 from ..data_structures.surface import extract_surface_data, Fields
 from ..data_structures.electric import extract_electric_data, Electric
 from ..data_structures.ablation import extract_ablation_data, Ablation
 from ..data_structures.case import Case
 
-__all__ = ["load_openep_mat", "_load_mat", "load_opencarp", "load_circle_cvi", "load_vtk"]
+__all__ = [
+    "load_openep_mat",
+    "_load_mat",
+    "load_openep_npz",
+    "load_opencarp",
+    "load_opencarp_signals",
+    "load_circle_cvi",
+    "load_vtk",
+]
 
 
 def _check_mat_version_73(filename):
@@ -77,13 +86,64 @@ def _check_mat_version_73(filename):
     return major_version == 2
 
 
-def _load_mat(filename):
+# Fields that must be present to create a Case. Any that are missing (e.g. because they were
+# not selected when loading) are replaced by empty arrays.
+_REQUIRED_FIELDS = [
+    'surface/triRep/X',
+    'surface/triRep/Triangulation',
+    'surface/act_bip',
+    'surface/uni_imp_frc',
+    'surface/thickness',
+    'surface/cell_region',
+    'surface/pacing_site',
+    'electric/tags',
+    'electric/names',
+    'electric/egm',
+    'electric/egmX',
+    'electric/egmUni',
+    'electric/egmUniX',
+    'electric/egmRef',
+    'electric/ecg',
+    'electric/egmSurfX',
+    'electric/barDirection',
+    'electric/voltages/bipolar',
+    'electric/voltages/unipolar',
+    'electric/annotations/woi',
+    'electric/annotations/mapAnnot',
+    'electric/annotations/referenceAnnot',
+    'electric/impedances/time',
+    'electric/impedances/value',
+]
+
+
+def _add_missing_fields(data):
+    """Add empty arrays for required fields that are not in the nested dictionary."""
+
+    for field in _REQUIRED_FIELDS:
+
+        *group_keys, key = field.split('/')
+
+        group = data
+        for group_key in group_keys:
+            if not isinstance(group.get(group_key), dict):
+                group[group_key] = {}
+            group = group[group_key]
+
+        if key not in group:
+            group[key] = np.array([])
+
+    return data
+
+
+def _load_mat(filename, lazy=False, include=None, exclude=None):
     """Load a MATLAB file."""
 
     if _check_mat_version_73(filename):
-        data = _load_mat_v73(filename)
+        data = _load_mat_v73(filename, lazy=lazy, include=include, exclude=exclude)
     else:
-        data = _load_mat_below_v73(filename)
+        data = _load_mat_below_v73(filename, include=include, exclude=exclude)
+
+    data = _add_missing_fields(data)
 
     # These are indices
     data['surface']['triRep']['Triangulation'] -= 1
@@ -91,7 +151,7 @@ def _load_mat(filename):
     return data
 
 
-def load_openep_mat(filename, name=None):
+def load_openep_mat(filename, name=None, lazy=False, include=None, exclude=None, egm_dtype=None):
     """
     Load a Case object from a MATLAB file.
 
@@ -103,18 +163,46 @@ def load_openep_mat(filename, name=None):
             extension.)
         name (str): name to give this dataset. The default is `None`, in which case
             the filename is used at the name.
+        lazy (bool): If True, the bipolar, unipolar and reference electrograms and the
+            ECGs will not be read into memory when the case is loaded. Instead, they are
+            read from disk when they are accessed. This only has an effect for v7.3 MATLAB
+            files; older files are always read in full. The default is False.
+        include (set, optional): Names of the fields to load, e.g. `{'surface', 'electric.annotations'}`.
+            Nested fields are separated by a full stop. All fields within a selected group
+            are loaded. The default is None, in which case all fields are loaded.
+        exclude (set, optional): Names of fields not to load, e.g. `{'electric.ecg', 'rf'}`.
+            This takes precedence over `include`. The default is None.
+        egm_dtype (np.dtype, optional): Data type used to store the electrograms and ECGs, either a
+            floating point type (e.g. np.float32) or np.int16 (see :class:`openep.data_structures.electric.Electrogram`).
+            The default is None, in which case they are stored as float64.
 
     Returns:
         case (Case): an OpenEP Case object that contains the surface, electric and
             ablation data.
+
+    Note
+    ----
+    With `lazy=True`, electrograms are represented by a :class:`openep.io.matlab.LazyArray`,
+    which can be sliced and used with numpy functions. The MATLAB file is kept open, and must
+    not be modified or deleted, for as long as the case exists. If `egm_dtype` is a floating point
+    type, the electrograms are converted when they are read. If it is np.int16, they are read and
+    converted when the case is loaded, a block of mapping points at a time.
+
+    Tip
+    ----
+    Fields that are not selected by `include` and `exclude` are not read from v7.3 MATLAB files,
+    and the corresponding attributes of the Case will be None. For older files, all data is read
+    but unselected fields are not decoded. Note that whether each mapping point has electrical
+    data is always determined, as it is needed to select the electrical points from the
+    remaining electric data.
     """
-    data = _load_mat(filename)
+    data = _load_mat(filename, lazy=lazy, include=include, exclude=exclude)
 
     if name is None:
         name = os.path.basename(filename)
 
     points, indices, fields = extract_surface_data(data['surface'])
-    electric = extract_electric_data(data['electric'])
+    electric = extract_electric_data(data['electric'], egm_dtype=egm_dtype)
     ablation = extract_ablation_data(data['rf']) if 'rf' in data else None
 
     if 'notes' in data:
@@ -125,6 +213,36 @@ def load_openep_mat(filename, name=None):
     return Case(name, points, indices, fields, electric, ablation, notes)
 
 
+def load_openep_npz(filename, name=None, mmap_mode=None):
+    """
+    Load a Case object from a file in the native OpenEP binary format.
+
+    Files in this format are created with :func:`openep.io.writers.export_openep_npz`.
+
+    Args:
+        filename (str): path to the .npz file to be loaded.
+        name (str): name to give this dataset. The default is `None`, in which case
+            the name stored in the file is used.
+        mmap_mode (str, optional): If not None, the arrays are memory-mapped from the file
+            rather than being read into memory, using the given mode ('r', 'r+' or 'c'; see
+            :func:`numpy.memmap`). The default is None.
+
+    Returns:
+        case (Case): an OpenEP Case object that contains the surface, electric and
+            ablation data.
+
+    Note
+    ----
+    With `mmap_mode='r'`, no data is copied when the case is loaded, but the arrays are read-only.
+    Use `mmap_mode='c'` (copy-on-write) if the case is to be modified; changes will not be
+    written to the file.
+    """
+
+    arrays = _load_npz(filename, mmap_mode=mmap_mode)
+
+    return _arrays_to_case(arrays, name=name)
+
+
 def load_opencarp(
     points,
     indices,
@@ -136,9 +254,10 @@ def load_opencarp(
     Load data from an OpenCARP simulation.
 
     Args:
-        points (str): Path to the openCARP points file.
-        indices (str): Path to the openCARP element file. Currently, only triangular meshes are
-            supported.
+        points (str): Path to the openCARP points file, either a text (.pts) or a binary
+            (.bpts) file.
+        indices (str): Path to the openCARP element file, either a text (.elem) or a binary
+            (.belem) file. Currently, only triangular meshes are supported.
         fibres (str, optional): Path to the openCARP fibres file.
         name (str, optional): Name of the dataset. If None, the basename of the points file
             will be used as the name.
@@ -154,17 +273,21 @@ def load_opencarp(
 
     """
 
+    from . import _opencarp
+
     name = os.path.basename(points) if name is None else name
 
-    points_data = np.loadtxt(points, skiprows=1)
+    read_points = _opencarp._read_bpts if str(points).endswith('.bpts') else _opencarp._read_pts
+    points_data = read_points(points)
     points_data *= scale_points
-    indices_data = np.loadtxt(indices, skiprows=1, usecols=[1, 2, 3], dtype=int)
-    cell_region = np.loadtxt(indices, skiprows=1, usecols=4, dtype=int)
+
+    read_elements = _opencarp._read_belem if str(indices).endswith('.belem') else _opencarp._read_elem
+    indices_data, cell_region = read_elements(indices)
 
     longitudinal_fibres = None
     transverse_fibres = None
     if fibres is not None:
-        fibres_data = np.loadtxt(fibres, skiprows=1, dtype=float)
+        fibres_data = _opencarp._read_lon(fibres)
         longitudinal_fibres = fibres_data[:, :3]
         if fibres_data.shape[1] == 6:
             transverse_fibres = fibres_data[:, 3:]
@@ -182,6 +305,70 @@ def load_opencarp(
     return Case(name, points_data, indices_data, fields, electric, ablation, notes)
 
 
+def load_opencarp_signals(
+    filename,
+    vertices=None,
+    dtype=np.float32,
+    out=None,
+    chunk_size=256,
+):
+    """
+    Load signals, e.g. extracellular potentials, from an OpenCARP simulation.
+
+    Binary (.igb) files store the value at every vertex for each time step in turn. These are
+    memory-mapped and read `chunk_size` time steps at a time, and the values of the selected
+    vertices are copied in parallel into an array of shape (N_vertices x N_samples).
+
+    Text (.dat) files must contain one row per vertex and one column per time step (i.e. the
+    same layout as would be read by `np.loadtxt`). These are memory-mapped and parsed
+    `chunk_size` lines at a time, and only the blocks that contain selected vertices are parsed.
+
+    Args:
+        filename (str): Path to the .igb or .dat file.
+        vertices (np.ndarray, optional): Indices of the vertices to load. Negative indices count
+            from the last vertex. The default is None, in which case all vertices are loaded.
+        dtype (type, optional): Data type of the returned signals. The default is np.float32.
+            This is ignored if `out` is given.
+        out (np.ndarray, optional): Array of shape (N_vertices x N_samples) into which the signals
+            are written, e.g. a `np.memmap` if the signals do not fit in memory. The default is
+            None, in which case an array is allocated.
+        chunk_size (int, optional): Number of time steps of an .igb file, or lines of a .dat file,
+            to read at once.
+
+    Returns:
+        signals (np.ndarray): Signals of shape (N_vertices x N_samples). These can be passed
+            to :meth:`openep.data_structures.case.Case.add_unipolar_electrograms`.
+
+    Raises:
+        IndexError: If any of the vertices is not in the file.
+
+    Note
+    ----
+    If the simulation did not finish, only the time steps that were written to the .igb file
+    are returned (and only these columns of `out` are filled).
+    """
+
+    from . import _opencarp
+
+    if str(filename).endswith('.igb'):
+        n_points, n_samples, _ = _opencarp._read_igb_header(filename)
+        read_signals = _opencarp._read_igb
+    else:
+        n_points, n_samples = _opencarp._read_dat_header(filename)
+        read_signals = _opencarp._read_dat
+
+    vertices = _opencarp._check_vertices(vertices, n_points)
+
+    if out is None:
+        out = np.empty((vertices.size, n_samples), dtype=dtype)
+    elif out.shape != (vertices.size, n_samples):
+        raise ValueError(f"out must have shape {(vertices.size, n_samples)}, not {out.shape}.")
+
+    n_samples = read_signals(filename, vertices=vertices, out=out, chunk_size=chunk_size)
+
+    return out[:, :n_samples]
+
+
 def load_vtk(filename, name=None):
     """
     Load data from a VTK file.
@@ -197,6 +384,8 @@ def load_vtk(filename, name=None):
             ablation data.
     """
 
+    import pyvista
+
     name = name if name is not None else os.path.basename(filename)
     mesh = pyvista.read(filename)
 
@@ -230,6 +419,8 @@ def load_circle_cvi(filename, dicoms_directory, extract_epi=True, extract_endo=T
         dicoms (pd.DataFrame): DataFrame containing information about each dicom used to construct the mesh.
     """
 
+    from . import _circle_cvi
+
     dicoms = _circle_cvi.load_dicoms(dicoms_directory=dicoms_directory)
     contour_nodes = _circle_cvi.get_contour_nodes(filename=filename)
 
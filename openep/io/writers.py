@@ -48,6 +48,7 @@ If a case has no fibre orientations (in `case.fields.longitudinal_fibres` and
 `case.fields.transverse_fibres`), then isotropic firbres will be used.
 
 .. autofunction:: export_openCARP
+.. autofunction:: export_openep_npz
 
 """
 
@@ -58,11 +59,13 @@ import scipy.io
 from openep.data_structures.ablation import Ablation
 from openep.data_structures.case import Case
 from openep.data_structures.surface import Fields
-from openep.data_structures.electric import Electric
+from openep.data_structures.electric import Electric, _decode_signals
+from ._npz import _case_to_arrays, _save_npz
 
 __all__ = [
     "export_openCARP",
     "export_openep_mat",
+    "export_openep_npz",
     "export_vtk",
 ]
 
@@ -72,6 +75,7 @@ def export_openCARP(
     prefix: str,
     scale_points: float = 1,
     export_transverse_fibres: bool = True,
+    binary: bool = False,
 ):
     """Export mesh data from an OpenEP data to openCARP format.
 
@@ -91,41 +95,36 @@ def export_openCARP(
         export_transverse_fibres (bool, optional). If True, both longitudinal and transverse
             fibres directions will be written to the .lon file. If False, only longitudinal fibre
             directions will be written.
+        binary (bool, optional): If True, the points and elements are written to binary
+            f'{prefix}'.bpts and f'{prefix}'.belem files rather than text files. Points are
+            then stored as single-precision floats. The default is False.
     """
 
-    output_path = pathlib.Path(prefix).resolve()
+    from . import _opencarp
 
-    # Save points info
-    np.savetxt(
-        output_path.with_suffix(".pts"),
-        case.points * scale_points,
-        fmt="%.6f",
-        header=str(case.points.size//3),
-        comments='',
-    )
+    output_path = pathlib.Path(prefix).resolve()
+    points = case.points * scale_points
 
     # Save elements info
     n_triangles = case.indices.shape[0]
-    cell_type = np.full(n_triangles, fill_value="Tr")
     cell_region = case.fields.cell_region if case.fields.cell_region is not None else np.zeros(n_triangles, dtype=int)
 
-    elements = np.concatenate(
-        [
-            cell_type[:, np.newaxis],
-            case.indices,
-            cell_region[:, np.newaxis],
-        ],
-        axis=1,
-        dtype=object,
-    )
-
-    np.savetxt(
-        output_path.with_suffix(".elem"),
-        elements,
-        fmt="%s %d %d %d %d",
-        header=str(n_triangles),
-        comments='',
-    )
+    if binary:
+        _opencarp._write_bpts(output_path.with_suffix(".bpts"), points)
+        _opencarp._write_belem(output_path.with_suffix(".belem"), case.indices, cell_region)
+    else:
+        _opencarp._write_text(
+            output_path.with_suffix(".pts"),
+            header=str(points.size//3),
+            values=points,
+            row_format="%.6f %.6f %.6f",
+        )
+        _opencarp._write_text(
+            output_path.with_suffix(".elem"),
+            header=str(n_triangles),
+            values=np.column_stack([case.indices, cell_region]),
+            row_format="Tr %d %d %d %d",
+        )
 
     # Save fibres
     n_fibre_vectors = 2 if export_transverse_fibres else 1
@@ -142,12 +141,11 @@ def export_openCARP(
         else:
             fibres[:, 3] = 1
 
-    np.savetxt(
+    _opencarp._write_text(
         output_path.with_suffix('.lon'),
-        fibres,
-        fmt="%.6f",
         header=str(n_fibre_vectors),
-        comments='',
+        values=fibres,
+        row_format=" ".join(["%.6f"] * n_fibre_vectors * 3),
     )
 
     # Saving pacing sites if they exist
@@ -202,6 +200,26 @@ def export_openep_mat(
     )
 
 
+def export_openep_npz(
+    case: Case,
+    filename: str,
+):
+    """Export data in the native OpenEP binary format.
+
+    All arrays in the case (the points, indices, fields, and all electric and ablation data)
+    are saved, uncompressed, to a numpy `.npz` archive. This is much faster to write and read
+    than a MATLAB file, and the arrays can be memory-mapped when the case is loaded with
+    :func:`openep.io.readers.load_openep_npz`.
+
+    Args:
+        case (Case): dataset to be exported
+        filename (str): name of file to be written. The `.npz` extension is appended if
+            it is not already present.
+    """
+
+    _save_npz(filename, _case_to_arrays(case))
+
+
 def export_vtk(
     case: Case,
     filename: str,
@@ -215,7 +233,8 @@ def export_vtk(
         filename (str): name of file to be written
     """
 
-    mesh = case.create_mesh()
+    # A shallow copy shares the geometry of the cached mesh but has its own point and cell data
+    mesh = case.get_mesh().copy(deep=False)
     for field in case.fields:
         if case.fields[field] is None:
             continue
@@ -311,6 +330,16 @@ def _extract_surface_data(
     return surface_data
 
 
+def _or_empty(array, empty):
+    """Return `array`, or `empty` if it is None, as scipy cannot save None."""
+    return array if array is not None else empty
+
+
+def _decoded(signals, scale):
+    """Decode stored signals (see :func:`_decode_signals`), or return an empty array if there are none."""
+    return _decode_signals(signals, scale) if signals is not None else np.array([], dtype=float)
+
+
 def _extract_electric_data(electric: Electric):
     """Create a dictionary of electric data.
 
@@ -329,41 +358,41 @@ def _extract_electric_data(electric: Electric):
     empty_int_array = np.array([], dtype=int)
 
     electric_data = {}
-    electric_data['tags'] = electric._names.astype(object) if electric._names is not None else empty_object_array
-    electric_data['names'] = electric._internal_names.astype(object) if electric._internal_names is not None else empty_object_array
-    electric_data['include'] = electric._include if electric._include is not None else empty_int_array
+    electric_data['tags'] = _or_empty(electric._names, empty_object_array).astype(object)
+    electric_data['names'] = _or_empty(electric._internal_names, empty_object_array).astype(object)
+    electric_data['include'] = _or_empty(electric._include, empty_int_array)
 
     electric_data['sampleFrequency'] = float(electric.frequency)
 
-    electric_data['electrodeNames_bip'] = electric.bipolar_egm._names.astype(object) if electric.bipolar_egm._names is not None else empty_object_array
-    electric_data['egmX'] = electric.bipolar_egm._points if electric.bipolar_egm._points is not None else empty_float_array
-    electric_data['egm'] = electric.bipolar_egm._egm if electric.bipolar_egm._egm is not None else empty_float_array
-    electric_data['egmGain'] = electric.bipolar_egm._gain if electric.bipolar_egm._gain is not None else empty_float_array
+    electric_data['electrodeNames_bip'] = _or_empty(electric.bipolar_egm._names, empty_object_array).astype(object)
+    electric_data['egmX'] = _or_empty(electric.bipolar_egm._points, empty_float_array)
+    electric_data['egm'] = _decoded(electric.bipolar_egm._egm, electric.bipolar_egm._egm_scale)
+    electric_data['egmGain'] = _or_empty(electric.bipolar_egm._gain, empty_float_array)
 
-    electric_data['electrodeNames_uni'] = electric.unipolar_egm._names.astype(object) if electric.unipolar_egm._names is not None else empty_object_array
-    electric_data['egmUniX'] = electric.unipolar_egm._points if electric.unipolar_egm._points is not None else empty_float_array
-    electric_data['egmUni'] = electric.unipolar_egm._egm if electric.unipolar_egm._egm is not None else empty_float_array
-    electric_data['egmUniGain'] = electric.unipolar_egm._gain if electric.unipolar_egm._gain is not None else empty_float_array
+    electric_data['electrodeNames_uni'] = _or_empty(electric.unipolar_egm._names, empty_object_array).astype(object)
+    electric_data['egmUniX'] = _or_empty(electric.unipolar_egm._points, empty_float_array)
+    electric_data['egmUni'] = _decoded(electric.unipolar_egm._egm, electric.unipolar_egm._egm_scale)
+    electric_data['egmUniGain'] = _or_empty(electric.unipolar_egm._gain, empty_float_array)
 
-    electric_data['egmRef'] = electric.reference_egm._egm if electric.reference_egm._egm is not None else empty_float_array
-    electric_data['egmRefGain'] = electric.reference_egm._gain if electric.reference_egm._gain is not None else empty_float_array
+    electric_data['egmRef'] = _decoded(electric.reference_egm._egm, electric.reference_egm._egm_scale)
+    electric_data['egmRefGain'] = _or_empty(electric.reference_egm._gain, empty_float_array)
 
-    electric_data['ecg'] = electric.ecg._ecg if electric.ecg._ecg is not None else empty_float_array
-    electric_data['ecgGain'] = electric.ecg._gain if electric.ecg._gain is not None else empty_float_array
-    electric_data['ecgNames'] = electric.ecg.channel_names.astype(object) if electric.ecg.channel_names is not None else empty_object_array
+    electric_data['ecg'] = _decoded(electric.ecg._ecg, electric.ecg._ecg_scale)
+    electric_data['ecgGain'] = _or_empty(electric.ecg._gain, empty_float_array)
+    electric_data['ecgNames'] = _or_empty(electric.ecg.channel_names, empty_object_array).astype(object)
 
-    electric_data['egmSurfX'] = electric.surface._nearest_point if electric.surface._nearest_point is not None else empty_float_array
-    electric_data['barDirection'] = electric.surface._normals if electric.surface._normals is not None else empty_float_array
+    electric_data['egmSurfX'] = _or_empty(electric.surface._nearest_point, empty_float_array)
+    electric_data['barDirection'] = _or_empty(electric.surface._normals, empty_float_array)
 
     annotations = electric.annotations
     electric_data['annotations'] = {}
-    electric_data['annotations']['woi'] = annotations._window_of_interest_indices if annotations._window_of_interest_indices is not None else empty_int_array
-    electric_data['annotations']['referenceAnnot'] = annotations._reference_activation_time_indices if annotations._reference_activation_time_indices is not None else empty_int_array
-    electric_data['annotations']['mapAnnot'] = annotations._local_activation_time_indices if annotations._local_activation_time_indices is not None else empty_int_array
+    electric_data['annotations']['woi'] = _or_empty(annotations._window_of_interest_indices, empty_int_array)
+    electric_data['annotations']['referenceAnnot'] = _or_empty(annotations._reference_activation_time_indices, empty_int_array)
+    electric_data['annotations']['mapAnnot'] = _or_empty(annotations._local_activation_time_indices, empty_int_array)
 
     electric_data['voltages'] = {}
-    electric_data['voltages']['bipolar'] = electric.bipolar_egm._voltage if electric.bipolar_egm._voltage is not None else empty_float_array
-    electric_data['voltages']['unipolar'] = electric.unipolar_egm._voltage if electric.unipolar_egm._voltage is not None else empty_float_array
+    electric_data['voltages']['bipolar'] = _or_empty(electric.bipolar_egm._voltage, empty_float_array)
+    electric_data['voltages']['unipolar'] = _or_empty(electric.unipolar_egm._voltage, empty_float_array)
 
     # Voltages are added when loading a dataset if egms are present
     # These should be removed before saving
@@ -372,8 +401,8 @@ def _extract_electric_data(electric: Electric):
             electric_data['voltages'][channel] = empty_float_array
 
     electric_data['impedances'] = {}
-    electric_data['impedances']['time'] = electric.impedance.times if electric.impedance.times is not None else empty_float_array
-    electric_data['impedances']['value'] = electric.impedance.values if electric.impedance.values is not None else empty_float_array
+    electric_data['impedances']['time'] = _or_empty(electric.impedance.times, empty_float_array)
+    electric_data['impedances']['value'] = _or_empty(electric.impedance.values, empty_float_array)
 
     return electric_data
 
@@ -397,16 +426,16 @@ def _export_ablation_data(ablation: Ablation):
     ablation_data['originaldata'] = {}
 
     ablation_data['originaldata']['ablparams'] = {}
-    ablation_data['originaldata']['ablparams']['time'] = ablation.times if ablation.times is not None else empty_float_array
-    ablation_data['originaldata']['ablparams']['power'] = ablation.power if ablation.power is not None else empty_float_array
-    ablation_data['originaldata']['ablparams']['impedance'] = ablation.impedance if ablation.impedance is not None else empty_float_array
-    ablation_data['originaldata']['ablparams']['distaltemp'] = ablation.temperature if ablation.temperature is not None else empty_float_array
+    ablation_data['originaldata']['ablparams']['time'] = _or_empty(ablation.times, empty_float_array)
+    ablation_data['originaldata']['ablparams']['power'] = _or_empty(ablation.power, empty_float_array)
+    ablation_data['originaldata']['ablparams']['impedance'] = _or_empty(ablation.impedance, empty_float_array)
+    ablation_data['originaldata']['ablparams']['distaltemp'] = _or_empty(ablation.temperature, empty_float_array)
 
     ablation_data['originaldata']['force'] = {}
-    ablation_data['originaldata']['force']['time'] = ablation.force.times if ablation.force.times is not None else empty_float_array
-    ablation_data['originaldata']['force']['force'] = ablation.force.force if ablation.force.force is not None else empty_float_array
-    ablation_data['originaldata']['force']['axialangle'] = ablation.force.axial_angle if ablation.force.axial_angle is not None else empty_float_array
-    ablation_data['originaldata']['force']['lateralangle'] = ablation.force.lateral_angle if ablation.force.lateral_angle is not None else empty_float_array
-    ablation_data['originaldata']['force']['position'] = ablation.force.points if ablation.force.points is not None else empty_float_array
+    ablation_data['originaldata']['force']['time'] = _or_empty(ablation.force.times, empty_float_array)
+    ablation_data['originaldata']['force']['force'] = _or_empty(ablation.force.force, empty_float_array)
+    ablation_data['originaldata']['force']['axialangle'] = _or_empty(ablation.force.axial_angle, empty_float_array)
+    ablation_data['originaldata']['force']['lateralangle'] = _or_empty(ablation.force.lateral_angle, empty_float_array)
+    ablation_data['originaldata']['force']['position'] = _or_empty(ablation.force.points, empty_float_array)
 
     return ablation_data
\ No newline at end of file
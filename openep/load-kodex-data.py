@@ -1,4 +1,3 @@
-import numpy as np
 import openep
 from openep._datasets.openep_datasets import DATASET_2
 
@@ -6,7 +5,7 @@ case = openep.load_opencarp(
     '../openep-misc/examples/data/pig21_endo_coarse.pts',
     '../openep-misc/examples/data/pig21_endo_coarse.elem'
 )
-egms = np.loadtxt('../openep-misc/examples/data/pig21_endo_coarse_phie.dat')
+egms = openep.io.readers.load_opencarp_signals('../openep-misc/examples/data/pig21_endo_coarse_phie.dat')
 case.add_unipolar_electrograms(
     egms,
 )
@@ -1,14 +1,34 @@
 __all__ = ['mesh_routines']
 
-from .mesh_routines import (
-    point_data_to_cell_data,
-    calculate_mesh_volume,
-    calculate_field_area,
-    calculate_vertex_distance,
-    calculate_vertex_path,
-    get_free_boundaries,
-    repair_mesh,
-    voxelise,
-    low_field_area_per_region,
-    mean_field_per_region,
-)
+import importlib
+
+# Functions are only imported from `mesh_routines` when they are first accessed
+_ATTRIBUTES = [
+    'point_data_to_cell_data',
+    'calculate_mesh_volume',
+    'calculate_field_area',
+    'calculate_vertex_distance',
+    'calculate_vertex_path',
+    'get_free_boundaries',
+    'repair_mesh',
+    'voxelise',
+    'low_field_area_per_region',
+    'mean_field_per_region',
+]
+
+
+def __getattr__(name):
+
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module('.mesh_routines', __name__), name)
+    elif name == 'mesh_routines':
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES) | {'mesh_routines'})
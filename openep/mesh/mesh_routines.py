@@ -72,8 +72,6 @@ import numpy as np
 import scipy.stats
 
 import pyvista
-import pymeshfix
-import trimesh
 
 __all__ = [
     "get_free_boundaries",
@@ -98,6 +96,7 @@ def _create_trimesh(pyvista_mesh):
     Returns:
         trimesh_mesh (trimesh.Trimesh): The generated trimesh mesh
     """
+    import trimesh
 
     vertices = pyvista_mesh.points
     faces = pyvista_mesh.faces.reshape(pyvista_mesh.n_faces, 4)[:, 1:]  # ignore to number of vertices per face
@@ -413,6 +412,8 @@ def repair_mesh(mesh: pyvista.PolyData) -> pyvista.PolyData:
     Returns:
         mesh (PolyData): the repaired mesh.
     """
+    import pymeshfix
+
     mf = pymeshfix.MeshFix(mesh)
     mf.repair()
 
@@ -23,6 +23,11 @@ setup(
     packages=find_packages(),
     py_modules=[os.path.splitext(os.path.basename(path))[0] for path in glob.glob('openep/*.py')],
     install_requires=requirements,
+    entry_points={
+        'console_scripts': [
+            'openep=openep.cli:main',
+        ],
+    },
     url='https://github.com/openep/openep-gui',
     project_urls={
         'Documentation': 'https://openep-py.readthedocs.io/en/latest/',
@@ -0,0 +1,42 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+
+import pytest
+
+from openep.data_structures.ablation import Ablation
+from openep.data_structures.case import Case
+from openep.data_structures.electric import Electric
+from openep.data_structures.surface import Fields
+
+
+@pytest.fixture(scope='session')
+def random_case():
+    """Create small cases with random points and triangles, and no electric or ablation data."""
+
+    def create(name, rng, n_points=40, n_cells=70, **fields):
+        return Case(
+            name,
+            rng.uniform(size=(n_points, 3)),
+            rng.integers(0, n_points, size=(n_cells, 3)),
+            Fields(**fields),
+            Electric(),
+            Ablation(),
+        )
+
+    return create
@@ -0,0 +1,84 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+import numpy as np
+import pandas as pd
+
+import openep
+from openep.batch import Step, run_batch
+
+
+@pytest.fixture(scope='module')
+def case_paths(tmp_path_factory, random_case):
+
+    rng = np.random.default_rng(seed=0)
+    directory = tmp_path_factory.mktemp('batch')
+
+    cases = []
+    for index in range(3):
+        case = random_case(
+            f'case_{index}',
+            rng,
+            cell_region=rng.integers(1, 4, size=70 if index != 2 else 10),
+            thickness=rng.uniform(size=40),
+        )
+        openep.export_openep_npz(case, (directory / f'case_{index}.npz').as_posix())
+        cases.append(case)
+
+    paths = [(directory / f'case_{index}.npz').as_posix() for index in range(3)]
+    paths.append((directory / 'missing.npz').as_posix())
+
+    return paths, cases
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_run_batch(case_paths, tmp_path, n_jobs):
+
+    paths, cases = case_paths
+    pipeline = [
+        Step('n_points', len, inputs=('case.points',)),
+        Step(
+            'mean_thickness',
+            openep.mesh.mean_field_per_region,
+            inputs=('mesh', 'case.fields.thickness', 'case.fields.cell_region'),
+            regions='case.fields.cell_region',
+        ),
+    ]
+
+    output = tmp_path / 'results.csv'
+    failures_output = tmp_path / 'failures.csv'
+    failures = run_batch(paths, pipeline, output.as_posix(), failures_output=failures_output.as_posix(), n_jobs=n_jobs)
+
+    results = pd.read_csv(output)
+    assert set(results['case']) == set(paths[:2])
+
+    assert results.loc[results['step'] == 'n_points', 'region'].isna().all()
+    for path, case in zip(paths[:2], cases[:2]):
+        case_results = results[(results['case'] == path) & (results['step'] == 'mean_thickness')].sort_values('index')
+        expected = openep.mesh.mean_field_per_region(case.create_mesh(), case.fields.thickness, case.fields.cell_region)
+        assert_allclose(expected, case_results['value'])
+        assert_array_equal(np.unique(case.fields.cell_region), case_results['region'])
+
+    failures = sorted(failures, key=lambda failure: failure.case)
+    assert [failure.case for failure in failures] == paths[2:]
+    assert [failure.step for failure in failures] == ['mean_thickness', 'load']
+    assert failures[1].error_type == 'FileNotFoundError'
+    assert len(pd.read_csv(failures_output)) == 2
@@ -16,10 +16,13 @@
 # You should have received a copy of the GNU General Public License along
 # with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
 
+import warnings
+
 import pytest
 from numpy.testing import assert_allclose, assert_array_equal
 
 import numpy as np
+import pyvista
 import scipy.interpolate
 
 import openep
@@ -29,12 +32,22 @@ from openep.case.case_routines import (
     get_mapping_points_within_woi,
     get_electrograms_at_points,
     calculate_voltage_from_electrograms,
+    get_sample_indices_within_woi,
     calculate_distance,
     calculate_points_within_distance,
     Interpolator,
+    InterpolatorCache,
     interpolate_voltage_onto_surface,
+    bipolar_from_unipolar_surface_points,
+    _find_connected_vertices,
+    _vertex_adjacency,
 )
+from openep.data_structures.ablation import Ablation
+from openep.data_structures.case import Case
+from openep.data_structures.electric import Annotations, Electric, Electrogram
+from openep.data_structures.surface import Fields
 from openep._datasets.openep_datasets import DATASET_2
+from openep._datasets.simple_meshes import SPHERE
 
 
 @pytest.fixture(scope='module')
@@ -243,6 +256,67 @@ def test_calculate_voltage_from_electrograms_unipolar(real_case):
     assert_allclose((n_electrograms),  amplitudes.shape)
 
 
+@pytest.mark.parametrize('dtype', [None, np.int16])
+@pytest.mark.parametrize('bipolar', [True, False])
+@pytest.mark.parametrize('indices', [None, 3, [5, 1, 1, 49]])
+def test_calculate_voltage_from_electrograms_window(dtype, bipolar, indices):
+
+    rng = np.random.default_rng(seed=0)
+    n_points, n_samples = 50, 200
+
+    bipolar_egm = rng.normal(size=(n_points, n_samples))
+    bipolar_egm[rng.uniform(size=bipolar_egm.shape) < 0.05] = np.NaN
+    unipolar_egm = rng.normal(size=(n_points, n_samples, 2))
+    woi = np.sort(rng.integers(-150, 150, size=(n_points, 2)), axis=1)
+    reference_activation_time = rng.integers(0, n_samples, size=n_points)
+    is_electrical = np.ones(n_points, dtype=bool)
+
+    electric = Electric(
+        is_electrical=is_electrical,
+        bipolar_egm=Electrogram(egm=bipolar_egm, is_electrical=is_electrical, dtype=dtype),
+        unipolar_egm=Electrogram(egm=unipolar_egm, is_electrical=is_electrical, dtype=dtype),
+        annotations=Annotations(woi, reference_activation_time, reference_activation_time, is_electrical=is_electrical),
+    )
+    case = Case('case', rng.uniform(size=(3, 3)), np.array([[0, 1, 2]]), Fields(), electric, Ablation())
+
+    # Mask the samples outside the window of interest, as the voltages are defined
+    electrograms = (bipolar_egm if bipolar else unipolar_egm[:, :, 0]).copy()
+    electrograms[~get_sample_indices_within_woi(case, buffer=20)] = np.NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # some windows contain only NaNs
+        expected = np.nanmax(electrograms, axis=1) - np.nanmin(electrograms, axis=1)
+    expected = expected[indices] if indices is not None else expected
+
+    amplitudes = calculate_voltage_from_electrograms(case, buffer=20, bipolar=bipolar, indices=indices)
+
+    tolerance = 0 if dtype is None else np.nanmax(np.abs(bipolar_egm)) / 32767
+    assert_allclose(expected, np.ravel(amplitudes), rtol=1e-12, atol=tolerance)
+
+
+def test_calculate_voltage_from_electrograms_nan_window():
+
+    n_points, n_samples = 4, 100
+    egm = np.tile(np.sin(np.linspace(0, 2 * np.pi, n_samples)), (n_points, 1))
+    woi = np.tile([-20.0, 20.0], (n_points, 1))
+    reference_activation_time = np.array([50.0, 50.0, np.NaN, 50.0])
+    woi[3] = np.NaN
+    is_electrical = np.ones(n_points, dtype=bool)
+
+    electric = Electric(
+        is_electrical=is_electrical,
+        bipolar_egm=Electrogram(egm=egm, is_electrical=is_electrical),
+        annotations=Annotations(woi, reference_activation_time, reference_activation_time, is_electrical=is_electrical),
+    )
+    case = Case('case', np.eye(3), np.array([[0, 1, 2]]), Fields(), electric, Ablation())
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', category=RuntimeWarning)
+        amplitudes = calculate_voltage_from_electrograms(case, buffer=0)
+
+    assert np.all(amplitudes[:2] > 0)
+    assert np.all(np.isnan(amplitudes[2:]))
+
+
 def test_calculate_distance(mock_case):
 
     origin = mock_case.electric.bipolar_egm.points
@@ -383,3 +457,183 @@ def test_interpolate_voltage_onto_surface_max_distance(real_case):
     interpolated_voltages = interpolate_voltage_onto_surface(real_case, max_distance=0)
 
     assert n_surface_points == np.sum(np.isnan(interpolated_voltages))
+
+
+@pytest.fixture(scope='module')
+def sphere_indices():
+    sphere = pyvista.read(SPHERE)
+    return sphere.faces.reshape(-1, 4)[:, 1:], sphere.n_points
+
+
+def test_vertex_adjacency(sphere_indices):
+
+    indices, n_points = sphere_indices
+    offsets, neighbours = _vertex_adjacency(indices, n_points=n_points)
+
+    assert n_points + 1 == offsets.size
+    for index in range(n_points):
+        assert_array_equal(
+            _find_connected_vertices(indices, index),
+            neighbours[offsets[index]:offsets[index + 1]],
+        )
+
+
+def test_bipolar_from_unipolar_surface_points(sphere_indices):
+
+    indices, n_points = sphere_indices
+    rng = np.random.default_rng(seed=42)
+    unipolar = rng.normal(size=(n_points, 50))
+
+    bipolar, pair_indices = bipolar_from_unipolar_surface_points(unipolar, indices)
+
+    for index in range(n_points):
+        neighbours = _find_connected_vertices(indices, index)
+        difference = unipolar[neighbours] - unipolar[index]
+        pair_index = np.argmax(np.ptp(difference, axis=1))
+        assert_array_equal([index, neighbours[pair_index]], pair_indices[index])
+        assert_allclose(difference[pair_index], bipolar[index])
+
+
+def test_bipolar_from_unipolar_surface_points_invalid_indices(sphere_indices):
+
+    indices, n_points = sphere_indices
+    unipolar = np.zeros((n_points - 1, 10))
+
+    with pytest.raises(IndexError):
+        bipolar_from_unipolar_surface_points(unipolar, indices)
+
+    with pytest.raises(IndexError):
+        bipolar_from_unipolar_surface_points(np.zeros((3, 10)), np.array([[0, 1, -1]]))
+
+
+@pytest.fixture(scope='module')
+def synthetic_interpolator():
+
+    rng = np.random.default_rng(seed=0)
+    points = rng.uniform(-10, 10, size=(200, 3))
+    field = np.linalg.norm(points, axis=1)
+
+    return Interpolator(points=points, field=field)
+
+
+@pytest.mark.parametrize('max_distance', [None, 2])
+def test_interpolator_chunk_size(synthetic_interpolator, max_distance):
+
+    surface_points = np.random.default_rng(seed=1).uniform(-12, 12, size=(1001, 3))
+
+    interpolated_field = synthetic_interpolator(surface_points, max_distance=max_distance)
+    chunked_field = synthetic_interpolator(surface_points, max_distance=max_distance, chunk_size=100)
+
+    assert_allclose(interpolated_field, chunked_field, equal_nan=True)
+
+
+def test_interpolator_invalid_chunk_size(synthetic_interpolator):
+
+    with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+        synthetic_interpolator(np.zeros((10, 3)), chunk_size=0)
+
+
+def test_interpolate_voltage_onto_surface_neighbors(mock_case):
+
+    rng = np.random.default_rng(seed=2)
+    mock_case.points = rng.uniform(size=(20, 3))
+    mock_case.electric.bipolar_egm.points = rng.uniform(size=(10, 3))
+
+    n_mapping_points = len(mock_case.electric.bipolar_egm.points)
+    mock_case.electric.include = np.ones(n_mapping_points, dtype=int)
+    mock_case.electric.bipolar_egm.voltage = np.linspace(0.1, 2, n_mapping_points)
+    mock_case.indices = np.arange(20).reshape(-1, 1)
+
+    global_voltages = interpolate_voltage_onto_surface(mock_case)
+    local_voltages = interpolate_voltage_onto_surface(mock_case, neighbors=n_mapping_points)
+
+    # Using every mapping point as a neighbour is equivalent to the global interpolant
+    assert_allclose(global_voltages, local_voltages)
+
+    # Interpolators are only reused if a cache is given
+    cache = InterpolatorCache()
+    cached_voltages = interpolate_voltage_onto_surface(mock_case, cache=cache)
+    interpolate_voltage_onto_surface(mock_case, max_distance=1, cache=cache)
+    assert_allclose(global_voltages, cached_voltages)
+    assert {'n_interpolators': 1, 'hits': 1, 'misses': 1}.items() <= cache.info().items()
+
+
+def test_interpolator_cache():
+
+    rng = np.random.default_rng(seed=3)
+    points = rng.uniform(size=(50, 3))
+    field = rng.uniform(size=50)
+
+    cache = InterpolatorCache()
+    interpolator = cache.get(points, field)
+
+    assert interpolator is cache.get(points.copy(), field.copy())
+    assert interpolator is not cache.get(points, field, method_kws={'smoothing': 1})
+    assert interpolator is not cache.get(points, field + 1)
+    assert {'n_interpolators': 3, 'hits': 1, 'misses': 3}.items() <= cache.info().items()
+
+    cache.clear()
+    assert 0 == len(cache)
+    assert 0 == cache.memory
+
+
+def test_interpolator_cache_memory():
+
+    rng = np.random.default_rng(seed=6)
+    points = rng.uniform(size=(50, 3))
+    field = rng.uniform(size=50)
+
+    # The KD-trees of a local interpolant and of `max_distance` are counted
+    cache = InterpolatorCache()
+    interpolator = cache.get(points, field, method_kws={'neighbors': 10})
+    memory = cache.memory
+    assert memory >= points.nbytes + field.nbytes + interpolator.interpolate._tree.data.nbytes
+
+    interpolator(points, max_distance=1)
+    assert cache.memory >= memory + interpolator._kdtree.indices.nbytes
+
+
+def test_interpolator_cache_eviction():
+
+    rng = np.random.default_rng(seed=4)
+    points = rng.uniform(size=(50, 3))
+    fields = rng.uniform(size=(3, 50))
+
+    cache = InterpolatorCache()
+    first_interpolator = cache.get(points, fields[0])
+    cache.max_memory = 2 * cache.memory
+
+    cache.get(points, fields[1])
+    cache.get(points, fields[0])  # the second interpolator is now the least recently used
+    cache.get(points, fields[2])
+
+    assert 2 == len(cache)
+    assert first_interpolator is cache.get(points, fields[0])
+
+
+def test_local_smoothing_interpolator():
+
+    rng = np.random.default_rng(seed=5)
+    points = rng.uniform(-10, 10, size=(300, 3))
+    field = rng.uniform(size=300)
+    new_points = rng.uniform(-20, 20, size=(500, 3))
+    smoothing_length = 4
+
+    interpolator = openep.case.interpolators.LocalSMoothingInterpolator(
+        points=points,
+        field=field,
+        smoothing_length=smoothing_length,
+    )
+    new_field = interpolator(new_points)
+
+    distances = calculate_distance(new_points, points)
+    expected_field = np.full(len(new_points), fill_value=np.NaN)
+    for index, distance in enumerate(distances):
+        within_cutoff = distance < smoothing_length
+        if not within_cutoff.any():
+            continue
+        weights = np.exp(-(distance[within_cutoff] / smoothing_length)**2)
+        expected_field[index] = np.sum(field[within_cutoff] * weights) / weights.sum()
+
+    assert np.isnan(new_field).any()
+    assert_allclose(expected_field, new_field, equal_nan=True)
@@ -0,0 +1,94 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+import numpy as np
+
+import openep
+from openep.cli import main
+
+
+@pytest.fixture
+def npz_cases(tmp_path, random_case):
+
+    rng = np.random.default_rng(seed=0)
+
+    cases = []
+    for index in range(2):
+        case = random_case(f'case_{index}', rng, cell_region=rng.integers(0, 3, size=70))
+        openep.export_openep_npz(case, (tmp_path / f'case_{index}.npz').as_posix())
+        cases.append(case)
+
+    return tmp_path, cases
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_convert(npz_cases, capsys, jobs):
+
+    directory, cases = npz_cases
+    output_dir = directory / 'opencarp'
+
+    status = main([
+        'convert', (directory / '*.npz').as_posix(), '--to', 'opencarp', '--binary', '-o', output_dir.as_posix(), '-j', jobs,
+    ])
+    assert status == 0
+
+    output = capsys.readouterr().out.splitlines()
+    assert len(output) == 2
+    assert all('load' in line and 'export' in line for line in output)
+
+    for index, case in enumerate(cases):
+        prefix = output_dir / f'case_{index}'
+        converted_case = openep.load_opencarp(
+            prefix.with_suffix('.bpts').as_posix(),
+            prefix.with_suffix('.belem').as_posix(),
+        )
+        assert_allclose(case.points, converted_case.points, rtol=1e-6)
+        assert_array_equal(case.indices, converted_case.indices)
+        assert_array_equal(case.fields.cell_region, converted_case.fields.cell_region)
+
+
+def test_convert_does_not_overwrite_input(npz_cases, capsys):
+
+    directory, _ = npz_cases
+    path = directory / 'case_0.npz'
+    contents = path.read_bytes()
+
+    status = main(['convert', path.as_posix(), '--to', 'npz'])
+    assert status == 1
+    assert 'would overwrite' in capsys.readouterr().err
+    assert contents == path.read_bytes()
+
+    status = main(['convert', path.as_posix(), '--to', 'npz', '-o', (directory / 'npz').as_posix()])
+    assert status == 0
+    assert (directory / 'npz' / 'case_0.npz').exists()
+
+
+def test_info_reports_failures(npz_cases, capsys):
+
+    directory, cases = npz_cases
+    (directory / 'corrupt.npz').write_bytes(b'not a zip file')
+
+    status = main(['info', (directory / '*.npz').as_posix()])
+    assert status == 1
+
+    captured = capsys.readouterr()
+    assert captured.out.count('40 points, 70 cells') == 2
+    assert 'FAILED' in captured.err and 'corrupt.npz' in captured.err
@@ -1,5 +1,5 @@
 import pytest
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 
 import numpy as np
 import pyvista
@@ -7,6 +7,8 @@ import pyvista
 import openep
 from openep.data_structures.case import Case
 from openep.data_structures.surface import Fields
+from openep.data_structures.electric import Electric, Electrogram, _decode_signals
+from openep.data_structures.ablation import Ablation
 from openep._datasets.openep_datasets import DATASET_2
 from openep._datasets.meshes import MESH_2_DENSE
 from openep._datasets.simple_meshes import CUBE
@@ -151,3 +153,253 @@ def test_remove_unreferenced_points(dataset_2, dataset_2_mesh):
     assert_allclose(dataset_2_mesh.points, dataset_2.points)
     assert_allclose(expected_indices, dataset_2.indices)
     assert_allclose(dataset_2_mesh.point_data['LAT'], dataset_2.fields.local_activation_time)
+
+
+@pytest.fixture()
+def cube_case(mesh):
+
+    return Case(
+        name="Cube",
+        points=np.array(mesh.points, dtype=float),
+        indices=mesh.faces.reshape(-1, 4)[:, 1:],
+        fields=Fields(),
+        electric=Electric(),
+        ablation=Ablation(),
+    )
+
+
+def test_surface_kdtree_cached(cube_case):
+
+    kdtree = cube_case.get_surface_kdtree()
+    assert kdtree is cube_case.get_surface_kdtree()
+
+    cube_case.translate(np.array([1.0, 0, 0]))
+    translated_kdtree = cube_case.get_surface_kdtree()
+
+    assert translated_kdtree is not kdtree
+    assert_allclose(cube_case.points, translated_kdtree.data)
+
+
+def test_add_landmark_nearest_point(cube_case):
+
+    vertex = cube_case.points[3]
+    cube_case.add_landmark('landmark', 'L1', point=vertex * 1.1)
+
+    assert_allclose(vertex, cube_case.electric.surface._nearest_point[-1])
+
+
+def test_mesh_cache(cube_case):
+
+    mesh = cube_case.get_mesh()
+    assert mesh is cube_case.get_mesh()
+    assert cube_case.create_mesh() is not mesh
+    assert_allclose(6 * 1.0, cube_case.get_cell_areas().sum())
+
+    cell_normals = cube_case.get_cell_normals()
+    assert_allclose(1, np.linalg.norm(cell_normals, axis=1))
+    assert not cube_case.get_point_normals().flags.writeable
+
+    # Changing the geometry invalidates the cache
+    cube_case.translate(np.ones(3))
+    assert cube_case.get_mesh() is not mesh
+    assert_allclose(cube_case.points, cube_case.get_mesh().points)
+
+    cube_case.indices = cube_case.indices[:2]
+    assert cube_case.get_mesh().n_cells == 2
+    assert cube_case.get_cell_areas().shape == (2,)
+
+
+def test_separate_regions(cube_case):
+
+    n_cells = len(cube_case.indices)
+    cube_case.fields.cell_region = np.arange(n_cells) % 3
+    cube_case.fields.bipolar_voltage = np.arange(len(cube_case.points), dtype=float)
+
+    region_cases = cube_case.separate_regions()
+    assert len(region_cases) == 3
+
+    for region_id, region_case in enumerate(region_cases):
+        cells = np.flatnonzero(cube_case.fields.cell_region == region_id)
+        assert_allclose(cube_case.points[cube_case.indices[cells]], region_case.points[region_case.indices])
+        assert_allclose(
+            cube_case.fields.bipolar_voltage[cube_case.indices[cells]],
+            region_case.fields.bipolar_voltage[region_case.indices],
+        )
+        assert_array_equal(region_id, region_case.fields.cell_region)
+        assert region_case.electric is not cube_case.electric
+
+
+def test_separate_regions_modify_original(cube_case):
+
+    cube_case.fields.cell_region = np.arange(len(cube_case.indices)) % 2
+    cube_case.ablation = None
+    cube_case.add_landmark('a', 'L1', np.zeros(3))
+    mapping_points = cube_case.electric.bipolar_egm._points.copy()
+
+    region_cases = cube_case.separate_regions()
+    assert region_cases[0].ablation is None
+
+    # The regions have read-only views, and the arrays of the original case are still writeable
+    bipolar_egm = cube_case.electric.bipolar_egm
+    for array in [cube_case.points, bipolar_egm._points, bipolar_egm._voltage, cube_case.electric._is_electrical]:
+        assert array.flags.writeable
+    for region_case in region_cases:
+        assert region_case.electric.bipolar_egm._points is not bipolar_egm._points
+        assert not region_case.electric.bipolar_egm._points.flags.writeable
+
+    cube_case.translate(np.ones(3))
+    for region_case in region_cases:
+        assert_allclose(mapping_points, region_case.electric.bipolar_egm._points)
+
+
+def test_shallow_copy(cube_case):
+
+    rng = np.random.default_rng(seed=0)
+    cube_case.add_unipolar_electrograms(rng.normal(size=(cube_case.points.shape[0], 30)))
+    cube_case.fields.bipolar_voltage = rng.uniform(size=cube_case.points.shape[0])
+    points = cube_case.points.copy()
+    mapping_points = cube_case.electric.bipolar_egm._points.copy()
+
+    case = cube_case.copy(deep=False)
+    assert np.shares_memory(case.points, cube_case.points)
+    assert np.shares_memory(case.electric.bipolar_egm._egm, cube_case.electric.bipolar_egm._egm)
+    assert not case.fields.bipolar_voltage.flags.writeable
+    assert case.get_mesh() is cube_case.get_mesh()
+
+    with pytest.raises(ValueError):
+        case.fields.bipolar_voltage[0] = 0
+
+    # Arrays are copied when they are first modified, leaving the original case unchanged
+    case.translate(np.ones(3))
+    case.electric.bipolar_egm.voltage = np.zeros(case.electric.n_points)
+    case.add_landmark('a', 'L1', np.zeros(3))
+
+    assert_allclose(points, cube_case.points)
+    assert_allclose(points + 1, case.points)
+    assert_allclose(mapping_points, cube_case.electric.bipolar_egm._points)
+    assert not np.any(cube_case.electric.bipolar_egm.voltage == 0)
+    assert cube_case.electric.bipolar_egm._points.shape[0] + 1 == case.electric.bipolar_egm._points.shape[0]
+    assert case.get_mesh() is not cube_case.get_mesh()
+
+
+def test_shallow_copy_modify_original(cube_case):
+
+    rng = np.random.default_rng(seed=0)
+    cube_case.add_unipolar_electrograms(rng.normal(size=(cube_case.points.shape[0], 30)))
+    points = cube_case.points.copy()
+    mapping_points = cube_case.electric.bipolar_egm._points.copy()
+    voltage = cube_case.electric.bipolar_egm.voltage.copy()
+    mesh = cube_case.get_mesh()
+
+    case = cube_case.copy(deep=False)
+    assert cube_case.points.flags.writeable
+    assert not case.points.flags.writeable
+    assert case._mesh_cache is not cube_case._mesh_cache
+
+    # As with numpy views, modifying an array of the original in-place also changes the copy
+    cube_case.electric.bipolar_egm._voltage[0] += 1
+    assert case.electric.bipolar_egm._voltage[0] == cube_case.electric.bipolar_egm._voltage[0]
+    cube_case.electric.bipolar_egm._voltage[0] -= 1
+
+    # Methods of the original case replace its arrays, leaving the shallow copy unchanged
+    cube_case.translate(np.ones(3))
+    cube_case.electric.bipolar_egm.voltage = np.zeros(cube_case.electric.n_points)
+    cube_case.add_landmark('a', 'L1', np.zeros(3))
+
+    assert_allclose(points, case.points)
+    assert_allclose(mapping_points, case.electric.bipolar_egm._points)
+    assert_allclose(mapping_points, case.electric.landmark_points._points)
+    assert_allclose(voltage, case.electric.bipolar_egm.voltage)
+    assert_allclose(points + 1, cube_case.points)
+    assert_allclose(mapping_points + 1, cube_case.electric.landmark_points._points[:-1])
+    assert case.get_mesh() is mesh
+    assert_allclose(case.points, case.get_mesh().points)
+
+
+def test_update_electric_surface(cube_case, mocker):
+
+    # Landmarks are not electrical points, so the unmasked arrays are checked
+    cube_case.add_landmarks(['a', 'b'], ['L1', 'L2'], cube_case.points[:2] * 1.1)
+
+    # Only the new landmarks are projected, using the cached KD-tree and normals
+    create_mesh = mocker.spy(cube_case, 'create_mesh')
+    cube_case.add_landmark('c', 'L3', cube_case.points[2] * 1.1)
+    nearest_point = cube_case.electric.surface._nearest_point
+    cube_case.add_landmark('d', 'L4', cube_case.points[3] * 1.1)
+    create_mesh.assert_not_called()
+    assert np.shares_memory(nearest_point, cube_case.electric.surface._nearest_point)
+    assert_allclose(cube_case.points[:4], cube_case.electric.surface._nearest_point)
+
+    # Move a landmark
+    cube_case.electric.bipolar_egm._points[0] = cube_case.points[5] * 1.1
+    cube_case.update_electric_surface(indices=[0])
+    assert_allclose(cube_case.points[[5, 1, 2, 3]], cube_case.electric.surface._nearest_point)
+
+    normals = cube_case.electric.surface._normals.copy()
+    cube_case.update_electric_surface()
+    assert_allclose(cube_case.points[[5, 1, 2, 3]], cube_case.electric.surface._nearest_point)
+    assert_allclose(normals, cube_case.electric.surface._normals)
+
+
+@pytest.mark.parametrize('dtype', [None, np.int16])
+def test_add_landmarks(cube_case, dtype):
+
+    rng = np.random.default_rng(seed=0)
+    cube_case.add_unipolar_electrograms(rng.normal(size=(cube_case.points.shape[0], 30)), dtype=dtype)
+    n_points = cube_case.electric.n_points
+
+    names = [f'landmark_{index}' for index in range(5)]
+    internal_names = [f'L{index}' for index in range(5)]
+    points = rng.uniform(size=(5, 3))
+
+    bulk_case = cube_case.copy()
+    bulk_case.add_landmarks(names, internal_names, points)
+
+    for name, internal_name, point in zip(names, internal_names, points):
+        egm = cube_case.electric.bipolar_egm._egm
+        cube_case.add_landmark(name, internal_name, point)
+
+    # The last landmark was written into the spare capacity of the previous electrogram array
+    assert np.shares_memory(egm, cube_case.electric.bipolar_egm._egm)
+
+    for case in [cube_case, bulk_case]:
+        electric = case.electric
+        assert electric.n_points == n_points
+        assert_allclose(points, electric.landmark_points.points[-5:])
+        assert list(electric.landmark_points.names[-5:]) == names
+        assert np.all(np.isnan(_decode_signals(electric.bipolar_egm._egm, electric.bipolar_egm._egm_scale)[-5:]))
+        assert electric.unipolar_egm._egm.shape[0] == n_points + 5
+        assert electric.annotations._window_of_interest_indices.shape == (n_points + 5, 2)
+        assert_allclose(cube_case.electric.bipolar_egm.egm, electric.bipolar_egm.egm)
+        assert_allclose(cube_case.electric.surface.nearest_point, electric.surface.nearest_point)
+
+    with pytest.raises(ValueError, match='empty string'):
+        cube_case.add_landmarks(['', 'name'], ['L5', 'L6'], points[:2])
+
+
+@pytest.mark.parametrize('is_electrical, is_view', [
+    (np.ones(10, dtype=bool), True),
+    (np.arange(10) < 8, True),
+    (np.arange(10) % 3 != 0, False),
+])
+def test_electrogram_masked_views(is_electrical, is_view):
+
+    egm = np.arange(40, dtype=float).reshape(10, 4)
+    electrogram = Electrogram(egm=egm, voltage=np.zeros(10), is_electrical=is_electrical)
+
+    assert_allclose(egm[is_electrical], electrogram.egm)
+    assert np.shares_memory(egm, electrogram.egm) == is_view
+    assert electrogram.n_points == is_electrical.sum()
+
+    # The masked arrays can be modified as before
+    electrogram.voltage = np.arange(is_electrical.sum(), dtype=float)
+    voltage = electrogram.voltage
+    voltage[voltage > 2] = 2
+    assert_allclose(np.minimum(np.arange(is_electrical.sum()), 2), voltage)
+
+    # Replacing the mask, or modifying it in-place, changes the masked arrays
+    electrogram._is_electrical = np.ones(10, dtype=bool)
+    assert_allclose(egm, electrogram.egm)
+    electrogram._is_electrical[1] = False
+    assert_allclose(np.delete(egm, 1, axis=0), electrogram.egm)
+    assert electrogram.n_points == 9
@@ -0,0 +1,130 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+import numpy as np
+
+from openep.case.case_routines import calculate_voltage_from_electrograms
+from openep.case.features import FEATURES, calculate_electrogram_features
+from openep.data_structures.ablation import Ablation
+from openep.data_structures.case import Case
+from openep.data_structures.electric import Annotations, Electric, Electrogram
+from openep.data_structures.surface import Fields
+
+N_POINTS = 6
+N_SAMPLES = 1000
+
+
+def _create_case(dtype=None):
+    """Create a case with known electrograms.
+
+    Bipolar electrograms are sine waves with a period of 100 samples, and unipolar electrograms
+    fall steeply at sample 300.
+    """
+
+    rng = np.random.default_rng(seed=0)
+    samples = np.arange(N_SAMPLES)
+
+    bipolar = np.sin(2 * np.pi * samples / 100) * np.arange(1, N_POINTS + 1)[:, np.newaxis]
+    bipolar[-1] = np.NaN  # no valid samples
+    unipolar = np.zeros((N_POINTS, N_SAMPLES, 2))
+    unipolar[:, :, 0] = -np.tanh((samples - 300.5) / 5)
+    unipolar[:, :, 1] = rng.normal(size=(N_POINTS, N_SAMPLES))
+
+    # windows of interest cover samples 200 to 600
+    window_of_interest = np.tile([-200, 200], reps=(N_POINTS, 1))
+    reference_activation_time = np.full(N_POINTS, fill_value=400)
+    is_electrical = np.ones(N_POINTS, dtype=bool)
+
+    electric = Electric(
+        is_electrical=is_electrical,
+        bipolar_egm=Electrogram(egm=bipolar, is_electrical=is_electrical, dtype=dtype),
+        unipolar_egm=Electrogram(egm=unipolar, is_electrical=is_electrical, dtype=dtype),
+        annotations=Annotations(
+            window_of_interest, reference_activation_time, reference_activation_time, is_electrical=is_electrical,
+        ),
+    )
+
+    return Case('case', rng.uniform(size=(3, 3)), np.array([[0, 1, 2]]), Fields(), electric, Ablation())
+
+
+@pytest.mark.parametrize('dtype', [None, np.int16])
+def test_calculate_electrogram_features(dtype):
+
+    case = _create_case(dtype=dtype)
+    features = calculate_electrogram_features(case, buffer=0)
+
+    assert features.dtype.names == FEATURES
+    assert features.shape == (N_POINTS,)
+
+    assert_allclose(calculate_voltage_from_electrograms(case, buffer=0), features['bipolar_voltage'])
+    assert_allclose(2, features['unipolar_voltage'], rtol=1e-3)
+    assert_allclose(300, features['local_activation_time'])
+
+    # Four periods plus the final sample (a new peak), with deflections between peaks and troughs 50 samples apart
+    assert_array_equal([9, 9, 9, 9, 9, 0], features['n_deflections'])
+    assert_allclose(400, features['duration'][:-1], atol=1)
+    assert_allclose(400 / 9, features['fractionation_index'][:-1], atol=0.2)
+    assert np.isnan(features['duration'][-1])
+
+
+def test_calculate_electrogram_features_selected():
+
+    case = _create_case()
+    features = calculate_electrogram_features(
+        case, features=['local_activation_time', 'n_deflections'], buffer=0, indices=[4, 0, 0],
+    )
+
+    assert features.dtype.names == ('local_activation_time', 'n_deflections')
+    assert_allclose(300, features['local_activation_time'])
+    assert_array_equal(9, features['n_deflections'])
+
+    # A large threshold removes all deflections
+    features = calculate_electrogram_features(case, features=['n_deflections'], deflection_threshold=100)
+    assert_array_equal(0, features['n_deflections'])
+
+    with pytest.raises(ValueError, match='Unknown features'):
+        calculate_electrogram_features(case, features=['not_a_feature'])
+
+
+def test_calculate_electrogram_features_nan_window():
+
+    case = _create_case()
+    case.electric.annotations._reference_activation_time_indices = np.array([400, 400, np.NaN, 400, 400, 400])
+    features = calculate_electrogram_features(case, buffer=0)
+
+    assert np.isnan(features['bipolar_voltage'][2])
+    assert np.isnan(features['local_activation_time'][2])
+    assert features['n_deflections'][2] == 0
+    assert_allclose(300, features['local_activation_time'][[0, 1, 3, 4, 5]])
+
+
+def test_calculate_electrogram_features_mismatched_unipolar():
+
+    case = _create_case()
+    unipolar_egm = case.electric.unipolar_egm
+    case.electric.unipolar_egm = Electrogram(egm=unipolar_egm._egm[:3], is_electrical=np.ones(3, dtype=bool))
+
+    with pytest.raises(ValueError, match='same number of points and samples'):
+        calculate_electrogram_features(case)
+
+    # Only the bipolar electrograms are needed for bipolar features
+    features = calculate_electrogram_features(case, features=['bipolar_voltage'])
+    assert features.shape == (N_POINTS,)
@@ -0,0 +1,90 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import openep
+
+HEAVY_MODULES = ['pyvista', 'matplotlib', 'numba', 'pandas', 'pydicom', 'trimesh', 'pymeshfix', 'scipy.stats']
+
+_IMPORT_SCRIPT = """
+import json, sys
+{statement}
+print(json.dumps([module for module in {modules} if module in sys.modules]))
+"""
+
+
+def _import_in_subprocess(statement):
+    """Run the statement in a new interpreter, returning the heavy modules that were imported."""
+
+    script = _IMPORT_SCRIPT.format(statement=statement, modules=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize('statement', [
+    'import openep',
+    'import openep.cli',
+    'import openep.mesh',
+    'from openep import load_openep_mat, load_openep_npz, export_openep_npz',
+])
+def test_import_heavy_modules(statement):
+    """Heavy dependencies should only be imported when the functions that need them are used."""
+
+    assert [] == _import_in_subprocess(statement)
+
+
+def test_import_time():
+    """Importing openep should be fast, as the heavy dependencies are not imported."""
+
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import openep'], check=True, capture_output=True, text=True,
+    ).stderr
+
+    # Each line is 'import time: self [us] | cumulative [us] | module'
+    cumulative_times = {
+        line.split('|')[2].strip(): int(line.split('|')[1])
+        for line in output.splitlines()
+        if line.startswith('import time:') and line.split('|')[1].strip().isdigit()
+    }
+
+    # Importing the heavy dependencies takes several seconds
+    assert cumulative_times['openep'] < 250_000
+
+
+def test_import_heavy_modules_on_access():
+    """Accessing a function imports the heavy dependencies of its module (and possibly their own dependencies)."""
+
+    modules = _import_in_subprocess('from openep.mesh import calculate_field_area')
+    assert {'pyvista', 'scipy.stats'} <= set(modules)
+
+
+def test_lazy_attributes():
+
+    assert openep.load_openep_mat is openep.io.readers.load_openep_mat
+    assert openep.interpolators is openep.case.interpolators
+    assert openep.mesh.mean_field_per_region is openep.mesh.mesh_routines.mean_field_per_region
+    assert 'export_openCARP' in dir(openep)
+
+    with pytest.raises(AttributeError):
+        openep.not_an_attribute
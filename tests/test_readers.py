@@ -0,0 +1,461 @@
+# OpenEP
+# Copyright (c) 2021 OpenEP Collaborators
+#
+# This file is part of OpenEP.
+#
+# OpenEP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# OpenEP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program (LICENSE.txt).  If not, see <http://www.gnu.org/licenses/>
+
+import io
+
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+import h5py
+import numpy as np
+
+import openep
+from openep.data_structures.electric import _decode_signals
+from openep.io.matlab import LazyArray, _dereference_strings
+from openep.io._opencarp import _parse_text
+
+N_POINTS = 30
+N_SAMPLES = 40
+
+
+def _write_strings(file_pointer, key, strings):
+    """Write a cell array of strings as references to MATLAB char arrays."""
+
+    references = np.empty((1, len(strings)), dtype=h5py.ref_dtype)
+    for index, string in enumerate(strings):
+        chars = np.frombuffer(string.encode('utf-16-le'), dtype=np.uint16)
+        chars = chars if chars.size > 0 else np.zeros(2, dtype=np.uint64)
+        dataset = file_pointer.create_dataset(f'#refs#/{key.replace("/", "_")}_{index}', data=chars[:, np.newaxis])
+        if chars.dtype == np.uint64:
+            dataset.attrs['MATLAB_empty'] = np.uint8(1)
+        references[0, index] = dataset.ref
+
+    file_pointer.create_dataset(key, data=references)
+
+
+def _write_arrays(file_pointer, key, arrays):
+    """Write MATLAB (column-major) arrays, with column vectors for 1D arrays."""
+
+    arrays = np.asarray(arrays)
+    arrays = arrays[:, np.newaxis] if arrays.ndim == 1 else arrays
+    file_pointer.create_dataset(key, data=arrays.T)
+
+
+def _write_mat_v73(filename, userdata, strings):
+
+    with h5py.File(filename, 'w', userblock_size=512) as f:
+
+        for key, value in userdata.items():
+            _write_arrays(f, f'userdata/{key}', value)
+
+        for key, value in strings.items():
+            _write_strings(f, f'userdata/{key}', value)
+
+    # v7.3 MAT-files are HDF5 files with a MATLAB header
+    header = b'MATLAB 7.3 MAT-file, synthetic test data'.ljust(116) + bytes(8) + b'\x00\x02IM'
+    with open(filename, 'r+b') as f:
+        f.write(header)
+
+
+@pytest.fixture(scope='module')
+def mat_v73(tmp_path_factory):
+
+    rng = np.random.default_rng(seed=0)
+    n_landmarks = 2
+
+    egm = rng.normal(size=(N_POINTS, N_SAMPLES))
+    egm[-n_landmarks:] = np.NaN
+
+    userdata = {
+        'surface/triRep/X': rng.uniform(size=(10, 3)),
+        'surface/triRep/Triangulation': np.array([[1, 2, 3], [2, 3, 4], [5, 6, 7]], dtype=float),
+        'surface/act_bip': rng.uniform(size=(10, 2)),
+        'surface/uni_imp_frc': rng.uniform(size=(10, 3)),
+        'surface/thickness': np.array([]),
+        'surface/cell_region': np.array([]),
+        'surface/pacing_site': np.array([]),
+        'electric/egm': egm,
+        'electric/egmX': rng.uniform(size=(N_POINTS, 3)),
+        'electric/egmUni': rng.normal(size=(N_POINTS, N_SAMPLES, 2)),
+        'electric/egmUniX': rng.uniform(size=(N_POINTS, 3, 2)),
+        'electric/egmRef': rng.normal(size=(N_POINTS, N_SAMPLES)),
+        'electric/ecg': rng.normal(size=(N_POINTS, N_SAMPLES)),
+        'electric/egmSurfX': rng.uniform(size=(N_POINTS, 3)),
+        'electric/barDirection': rng.uniform(size=(N_POINTS, 3)),
+        'electric/voltages/bipolar': rng.uniform(size=N_POINTS),
+        'electric/voltages/unipolar': rng.uniform(size=N_POINTS),
+        'electric/annotations/woi': np.tile([-20, 20], reps=(N_POINTS, 1)),
+        'electric/annotations/mapAnnot': rng.integers(0, N_SAMPLES, size=N_POINTS),
+        'electric/annotations/referenceAnnot': np.full(N_POINTS, fill_value=20),
+    }
+
+    tags = [''] * (N_POINTS - n_landmarks) + ['landmark'] * n_landmarks
+    strings = {
+        'electric/tags': tags,
+        'electric/names': [f'P{index}' for index in range(N_POINTS)],
+        'electric/electrodeNames_bip': ['1-2'] * N_POINTS,
+    }
+
+    filename = tmp_path_factory.mktemp('mat') / 'synthetic_v73.mat'
+    _write_mat_v73(filename.as_posix(), userdata, strings)
+
+    with h5py.File(filename, 'a') as f:
+        for key in ['time', 'value']:
+            dataset = f.create_dataset(f'#refs#/impedance_{key}', data=rng.uniform(size=(1, 5)))
+            references = np.full((1, N_POINTS), fill_value=dataset.ref, dtype=h5py.ref_dtype)
+            f.create_dataset(f'userdata/electric/impedances/{key}', data=references)
+
+    return filename.as_posix(), userdata
+
+
+def test_load_mat_v73(mat_v73):
+
+    filename, userdata = mat_v73
+    case = openep.load_openep_mat(filename)
+
+    assert_allclose(userdata['surface/triRep/X'], case.points)
+    assert_allclose(userdata['surface/triRep/Triangulation'] - 1, case.indices)
+    assert N_POINTS - 2 == case.electric.n_points
+    assert_allclose(userdata['electric/egm'][:-2], case.electric.bipolar_egm.egm)
+    assert_array_equal(['landmark', 'landmark'], case.electric.landmark_points.names)
+
+
+def test_load_mat_v73_lazy(mat_v73):
+
+    filename, userdata = mat_v73
+    case = openep.load_openep_mat(filename)
+    lazy_case = openep.load_openep_mat(filename, lazy=True)
+
+    assert isinstance(lazy_case.electric.bipolar_egm._egm, LazyArray)
+    assert isinstance(lazy_case.electric.unipolar_egm._egm, LazyArray)
+    assert isinstance(lazy_case.electric.reference_egm._egm, LazyArray)
+    assert isinstance(lazy_case.electric.ecg._ecg, LazyArray)
+
+    assert_array_equal(case.electric._is_electrical, lazy_case.electric._is_electrical)
+    assert_allclose(case.electric.bipolar_egm.egm, lazy_case.electric.bipolar_egm.egm)
+    assert_allclose(case.electric.unipolar_egm.egm, lazy_case.electric.unipolar_egm.egm)
+    assert_allclose(case.electric.reference_egm.egm, lazy_case.electric.reference_egm.egm)
+    assert_allclose(case.electric.ecg.ecg, lazy_case.electric.ecg.ecg)
+
+    assert case.electric.ecg.ecg.shape == lazy_case.electric.ecg.ecg.shape
+    assert case.electric.n_samples == lazy_case.electric.n_samples
+
+
+@pytest.mark.parametrize(
+    'key',
+    [
+        0,
+        -1,
+        slice(3, 10),
+        slice(None, None, -2),
+        np.array([5, 1, 1, 18]),
+        np.array([0, 19]),
+        (slice(None), 0),
+        (np.array([4, 2]), slice(5, 10), 1),
+        (slice(None), np.array([0, 3])),
+    ]
+)
+def test_lazy_array_indexing(mat_v73, key):
+
+    filename, userdata = mat_v73
+    egm = userdata['electric/egmUni']
+
+    with h5py.File(filename, 'r') as f:
+        lazy_egm = LazyArray(f['userdata/electric/egmUni'])
+        assert egm.shape == lazy_egm.shape
+        assert_allclose(egm[key], np.asarray(lazy_egm[key]))
+
+        is_electrical = np.arange(N_POINTS) % 3 != 0
+        assert_allclose(egm[is_electrical][key], np.asarray(lazy_egm[is_electrical][key]))
+
+
+@pytest.mark.parametrize('include, exclude', [({'surface', 'electric.annotations'}, None), (None, {'electric.egm'})])
+def test_load_mat_v73_selected_fields(mat_v73, include, exclude):
+
+    filename, userdata = mat_v73
+    case = openep.load_openep_mat(filename)
+    selected_case = openep.load_openep_mat(filename, include=include, exclude=exclude)
+
+    assert_allclose(case.points, selected_case.points)
+    assert_allclose(case.fields.bipolar_voltage, selected_case.fields.bipolar_voltage)
+    assert_array_equal(case.electric._is_electrical, selected_case.electric._is_electrical)
+    assert_allclose(
+        case.electric.annotations.local_activation_time,
+        selected_case.electric.annotations.local_activation_time,
+    )
+    assert selected_case.electric.bipolar_egm.egm is None
+
+
+def test_load_mat_v73_excluded_fields_not_read(mat_v73, mocker):
+
+    filename, userdata = mat_v73
+    dereference_strings = mocker.patch('openep.io.matlab._dereference_strings')
+
+    case = openep.load_openep_mat(filename, include={'surface', 'electric.annotations'})
+
+    dereference_strings.assert_not_called()
+    assert case.electric.names is None
+    assert case.electric.unipolar_egm.egm is None
+    assert case.electric.ecg.ecg is None
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+@pytest.mark.parametrize('source', ['filename', 'fileobj', 'core'])
+def test_dereference_strings(tmp_path, compression, source):
+
+    strings = ['', 'LM', 'P1', '1-2', 'caf\u00e9', '\U0001F600']
+    indices = np.array([1, 0, 2, 1, 3, 0, 4, 1])
+
+    filename = (tmp_path / 'strings.h5').as_posix()
+    with h5py.File(filename, 'w', userblock_size=512) as f:
+
+        datasets = []
+        for index, string in enumerate(strings):
+            chars = np.frombuffer(string.encode('utf-16-le'), dtype=np.uint16)
+            if chars.size == 0:
+                dataset = f.create_dataset(f'#refs#/{index}', data=np.zeros(2, dtype=np.uint64))
+                dataset.attrs['MATLAB_empty'] = np.uint8(1)
+            else:
+                dataset = f.create_dataset(f'#refs#/{index}', data=chars[:, np.newaxis], compression=compression)
+            datasets.append(dataset)
+
+        references = np.array([[datasets[index].ref for index in indices]], dtype=h5py.ref_dtype)
+        f.create_dataset('bmp', data=references)
+
+        references = np.array([[dataset.ref for dataset in datasets]], dtype=h5py.ref_dtype)
+        f.create_dataset('all', data=references)
+
+    # Only files opened from a filename with the default driver are memory-mapped
+    if source == 'fileobj':
+        with open(filename, 'rb') as file_pointer:
+            f = h5py.File(io.BytesIO(file_pointer.read()), 'r')
+    else:
+        f = h5py.File(filename, 'r', driver='core' if source == 'core' else None)
+
+    with f:
+        assert_array_equal(np.asarray(strings)[indices], _dereference_strings(f, f['bmp']))
+        assert_array_equal(strings, _dereference_strings(f, f['all']))
+
+
+def test_load_openep_npz_mmap(mat_v73, tmp_path):
+
+    filename, userdata = mat_v73
+    case = openep.load_openep_mat(filename)
+
+    npz_filename = (tmp_path / 'case.npz').as_posix()
+    openep.export_openep_npz(case, npz_filename)
+    mapped_case = openep.load_openep_npz(npz_filename, mmap_mode='r')
+
+    assert isinstance(mapped_case.electric.bipolar_egm._egm, np.memmap)
+    assert isinstance(mapped_case.points, np.memmap)
+    assert mapped_case.ablation is None
+
+    assert_allclose(case.points, mapped_case.points)
+    assert_array_equal(case.indices, mapped_case.indices)
+    assert_allclose(case.fields.bipolar_voltage, mapped_case.fields.bipolar_voltage)
+    assert_allclose(case.electric.bipolar_egm.egm, mapped_case.electric.bipolar_egm.egm)
+    assert_allclose(case.electric.unipolar_egm.egm, mapped_case.electric.unipolar_egm.egm)
+    assert_array_equal(case.electric.names, mapped_case.electric.names)
+    assert_array_equal(case.electric.landmark_points.names, mapped_case.electric.landmark_points.names)
+    assert_allclose(case.electric.annotations.local_activation_time, mapped_case.electric.annotations.local_activation_time)
+
+    for times, mapped_times in zip(case.electric.impedance.times, mapped_case.electric.impedance.times):
+        assert_allclose(times, mapped_times)
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('egm_dtype', [np.float32, np.int16])
+def test_load_mat_v73_egm_dtype(mat_v73, tmp_path, lazy, egm_dtype):
+
+    filename, userdata = mat_v73
+    case = openep.load_openep_mat(filename)
+    compact_case = openep.load_openep_mat(filename, lazy=lazy, egm_dtype=egm_dtype)
+
+    assert compact_case.electric.bipolar_egm.dtype == egm_dtype
+    assert compact_case.electric.unipolar_egm.dtype == egm_dtype
+    assert compact_case.electric.ecg.dtype == egm_dtype
+    assert compact_case.electric.bipolar_egm.egm.dtype == np.float32
+    assert case.electric.n_samples == compact_case.electric.n_samples
+
+    # int16 signals are quantised to within half a step of 1/32767 of the peak amplitude of each trace
+    peak = np.nanmax(np.abs(userdata['electric/egm']))
+    assert_allclose(case.electric.bipolar_egm.egm, compact_case.electric.bipolar_egm.egm, rtol=0, atol=peak / 32767)
+    peak = np.nanmax(np.abs(userdata['electric/egmUni']))
+    assert_allclose(case.electric.unipolar_egm.egm, compact_case.electric.unipolar_egm.egm, rtol=0, atol=peak / 32767)
+    peak = np.nanmax(np.abs(userdata['electric/ecg']))
+    assert_allclose(case.electric.ecg.ecg, compact_case.electric.ecg.ecg, rtol=0, atol=peak / 32767)
+
+    # Landmark points are added in the same storage dtype
+    compact_case.electric._add_landmark('new', 'P_new', np.zeros(3))
+    bipolar_egm = compact_case.electric.bipolar_egm
+    assert bipolar_egm.dtype == egm_dtype
+    assert np.all(np.isnan(_decode_signals(bipolar_egm._egm, bipolar_egm._egm_scale)[-3:]))
+
+    npz_filename = (tmp_path / 'case.npz').as_posix()
+    openep.export_openep_npz(compact_case, npz_filename)
+    mapped_case = openep.load_openep_npz(npz_filename, mmap_mode='r')
+
+    assert mapped_case.electric.bipolar_egm.dtype == egm_dtype
+    assert_array_equal(compact_case.electric.bipolar_egm.egm, mapped_case.electric.bipolar_egm.egm)
+    assert_array_equal(compact_case.electric.ecg.ecg, mapped_case.electric.ecg.ecg)
+
+
+@pytest.fixture(scope='module')
+def opencarp_mesh(tmp_path_factory):
+
+    rng = np.random.default_rng(seed=0)
+    points = rng.uniform(-1000, 1000, size=(50, 3))
+    indices = rng.integers(0, 50, size=(80, 3))
+    cell_region = rng.integers(0, 4, size=80)
+    fibres = rng.uniform(-1, 1, size=(80, 6))
+
+    prefix = tmp_path_factory.mktemp('opencarp') / 'mesh'
+
+    np.savetxt(prefix.with_suffix('.pts'), points, fmt='%.6f', header=str(len(points)), comments='')
+    with open(prefix.with_suffix('.elem'), 'w') as f:
+        f.write(f'{len(indices)}\n')
+        f.writelines(f'Tr {i} {j} {k} {region}\n' for (i, j, k), region in zip(indices, cell_region))
+    np.savetxt(prefix.with_suffix('.lon'), fibres, fmt='%.6f', header='2', comments='')
+
+    # Binary files have a 1024-byte header containing the number of items and byte order
+    with open(prefix.with_suffix('.bpts'), 'wb') as f:
+        f.write(f'{len(points)} 0'.encode().ljust(1024, b'\x00'))
+        f.write(points.astype('<f4').tobytes())
+
+    elements = np.column_stack([np.full(len(indices), fill_value=6), indices, cell_region])
+    with open(prefix.with_suffix('.belem'), 'wb') as f:
+        f.write(f'{len(indices)} 0'.encode().ljust(1024, b'\x00'))
+        f.write(elements.astype('<i4').tobytes())
+
+    return prefix, points, indices, cell_region, fibres
+
+
+@pytest.mark.parametrize('points_suffix, indices_suffix', [('.pts', '.elem'), ('.bpts', '.belem')])
+def test_load_opencarp(opencarp_mesh, points_suffix, indices_suffix):
+
+    prefix, points, indices, cell_region, fibres = opencarp_mesh
+
+    case = openep.load_opencarp(
+        points=prefix.with_suffix(points_suffix).as_posix(),
+        indices=prefix.with_suffix(indices_suffix).as_posix(),
+        fibres=prefix.with_suffix('.lon').as_posix(),
+        scale_points=1e-3,
+    )
+
+    assert_allclose(points * 1e-3, case.points, atol=1e-7)
+    assert_array_equal(indices, case.indices)
+    assert_array_equal(cell_region, case.fields.cell_region)
+    assert_allclose(fibres[:, :3], case.fields.longitudinal_fibres, atol=1e-6)
+    assert_allclose(fibres[:, 3:], case.fields.transverse_fibres, atol=1e-6)
+
+
+@pytest.mark.parametrize('text', [
+    b'1 -2 +3.5\n0.1 1e3 -2.5E-3\n.5 5. -0.0\n',
+    b'  123456.789012 0.000001 1e22\r\n1e-22 007 -0.30000000000000004\n1.7976931348623157e308 2 3',
+])
+def test_parse_text_floats(text):
+
+    values = _parse_text(np.frombuffer(text, dtype=np.uint8), n_columns=3, dtype=float)
+
+    assert_array_equal([float(value) for value in text.split()], values.ravel())
+
+
+def test_parse_text_ints():
+
+    text = b'Tr 1 2 3 0\nTr 4 5 6 -1\n'
+    values = _parse_text(np.frombuffer(text, dtype=np.uint8), n_columns=4, dtype=int, element_type=b'Tr')
+    assert_array_equal([[1, 2, 3, 0], [4, 5, 6, -1]], values)
+
+    with pytest.raises(ValueError):
+        text = b'Tr 1 2 3 0\nTt 4 5 6 7 -1\n'
+        _parse_text(np.frombuffer(text, dtype=np.uint8), n_columns=4, dtype=int, n_rows=2, element_type=b'Tr')
+
+
+@pytest.fixture(scope='module')
+def opencarp_signals(tmp_path_factory):
+
+    rng = np.random.default_rng(seed=0)
+    signals = rng.normal(size=(30, 70))
+
+    directory = tmp_path_factory.mktemp('opencarp')
+    np.savetxt(directory / 'phie.dat', signals, fmt='%.6f')
+
+    header = f'x:{len(signals)} y:1 z:1 t:{signals.shape[1]} type:float systeme:little_endian'
+    with open(directory / 'phie.igb', 'wb') as f:
+        f.write(header.encode().ljust(1024, b' '))
+        f.write(signals.T.astype('<f4').tobytes())
+
+    return directory, signals
+
+
+@pytest.mark.parametrize('filename', ['phie.dat', 'phie.igb'])
+@pytest.mark.parametrize('vertices', [None, np.array([3, 1, 1, 29])])
+def test_load_opencarp_signals(opencarp_signals, filename, vertices):
+
+    directory, signals = opencarp_signals
+    loaded_signals = openep.io.readers.load_opencarp_signals(
+        (directory / filename).as_posix(),
+        vertices=vertices,
+        chunk_size=16,
+    )
+
+    expected_signals = signals if vertices is None else signals[vertices]
+    assert loaded_signals.dtype == np.float32
+    assert_allclose(expected_signals, loaded_signals, atol=1e-6)
+
+
+@pytest.mark.parametrize('filename', ['phie.dat', 'phie.igb'])
+def test_load_opencarp_signals_negative_vertices(opencarp_signals, filename):
+
+    directory, signals = opencarp_signals
+    loaded_signals = openep.io.readers.load_opencarp_signals(
+        (directory / filename).as_posix(),
+        vertices=[-1, 0, -30],
+        chunk_size=7,
+    )
+
+    assert_allclose(signals[[29, 0, 0]], loaded_signals, atol=1e-6)
+
+
+@pytest.mark.parametrize('filename', ['phie.dat', 'phie.igb'])
+@pytest.mark.parametrize('vertices', [[30], [-31], [10**7]])
+def test_load_opencarp_signals_out_of_bounds(opencarp_signals, filename, vertices):
+
+    directory, _ = opencarp_signals
+    with pytest.raises(IndexError):
+        openep.io.readers.load_opencarp_signals((directory / filename).as_posix(), vertices=vertices)
+
+
+def test_load_opencarp_signals_dat_out(opencarp_signals, tmp_path):
+
+    _, signals = opencarp_signals
+    filename = tmp_path / 'phie.dat'
+    np.savetxt(filename, signals, fmt='%.6f')
+    with open(filename, 'a') as f:
+        f.write('\n\n')
+
+    out = np.zeros((3, signals.shape[1]))
+    loaded_signals = openep.io.readers.load_opencarp_signals(
+        filename.as_posix(),
+        vertices=[25, 2, 17],
+        out=out,
+        chunk_size=4,
+    )
+
+    assert np.shares_memory(loaded_signals, out)
+    assert_allclose(signals[[25, 2, 17]], out, atol=1e-6)
@@ -23,6 +23,10 @@ import numpy as np
 
 import openep
 from openep._datasets.openep_datasets import DATASET_2
+from openep.data_structures.ablation import Ablation
+from openep.data_structures.case import Case
+from openep.data_structures.electric import Electric
+from openep.data_structures.surface import Fields
 
 
 @pytest.fixture()
@@ -97,3 +101,82 @@ def test_openep_mat_export(case, exported_case):
     assert_allclose(case.ablation.force.force, exported_case.ablation.force.force)
     assert_allclose(case.ablation.force.axial_angle, exported_case.ablation.force.axial_angle)
     assert_allclose(case.ablation.force.lateral_angle, exported_case.ablation.force.lateral_angle)
+
+
+@pytest.mark.parametrize('mmap_mode', [None, 'r'])
+def test_openep_npz_export(case, tmp_path, mmap_mode):
+    """Check the arrays of the original and exported data set are equal."""
+
+    filename = (tmp_path / "exported_case.npz").as_posix()
+    openep.export_openep_npz(case, filename)
+    exported_case = openep.load_openep_npz(filename, mmap_mode=mmap_mode)
+
+    assert case.name == exported_case.name
+    assert np.all(case.notes == exported_case.notes)
+
+    assert_allclose(case.points, exported_case.points)
+    assert_allclose(case.indices, exported_case.indices)
+    for field in case.fields:
+        if case.fields[field] is None:
+            assert exported_case.fields[field] is None
+        else:
+            assert_allclose(case.fields[field], exported_case.fields[field], equal_nan=True)
+
+    assert np.all(case.electric.names == exported_case.electric.names)
+    assert_allclose(case.electric.bipolar_egm.egm, exported_case.electric.bipolar_egm.egm)
+    assert_allclose(case.electric.unipolar_egm.egm, exported_case.electric.unipolar_egm.egm)
+    assert_allclose(case.electric.reference_egm.egm, exported_case.electric.reference_egm.egm)
+    assert_allclose(case.electric.ecg.ecg, exported_case.electric.ecg.ecg)
+    assert_allclose(case.electric.annotations.window_of_interest, exported_case.electric.annotations.window_of_interest)
+    assert np.all(case.electric.landmark_points.names == exported_case.electric.landmark_points.names)
+
+    assert_allclose(case.ablation.times, exported_case.ablation.times)
+    assert_allclose(case.ablation.force.points, exported_case.ablation.force.points)
+
+
+@pytest.fixture()
+def opencarp_case():
+
+    rng = np.random.default_rng(seed=0)
+    points = rng.uniform(-100, 100, size=(40, 3))
+    indices = rng.integers(0, 40, size=(70, 3))
+    fields = Fields(
+        cell_region=rng.integers(0, 3, size=70),
+        longitudinal_fibres=rng.uniform(-1, 1, size=(70, 3)),
+    )
+
+    return Case('opencarp', points, indices, fields, Electric(), Ablation())
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_export_openCARP(opencarp_case, tmp_path, binary):
+
+    prefix = tmp_path / 'exported'
+    openep.export_openCARP(opencarp_case, prefix.as_posix(), binary=binary)
+
+    points_suffix, indices_suffix = ('.bpts', '.belem') if binary else ('.pts', '.elem')
+    case = openep.load_opencarp(
+        points=prefix.with_suffix(points_suffix).as_posix(),
+        indices=prefix.with_suffix(indices_suffix).as_posix(),
+        fibres=prefix.with_suffix('.lon').as_posix(),
+    )
+
+    assert_allclose(opencarp_case.points, case.points, rtol=1e-6, atol=1e-6)
+    assert np.array_equal(opencarp_case.indices, case.indices)
+    assert np.array_equal(opencarp_case.fields.cell_region, case.fields.cell_region)
+    assert_allclose(opencarp_case.fields.longitudinal_fibres, case.fields.longitudinal_fibres, atol=1e-6)
+    assert_allclose(case.fields.transverse_fibres, np.tile([1, 0, 0], reps=(70, 1)))
+
+
+def test_export_openCARP_text_format(opencarp_case, tmp_path):
+    """The text files should be formatted in the same way as by np.savetxt."""
+
+    prefix = tmp_path / 'exported'
+    openep.export_openCARP(opencarp_case, prefix.as_posix())
+
+    np.savetxt(tmp_path / 'expected.pts', opencarp_case.points, fmt="%.6f", header="40", comments='')
+    assert prefix.with_suffix('.pts').read_text() == (tmp_path / 'expected.pts').read_text()
+
+    elements = np.column_stack([opencarp_case.indices, opencarp_case.fields.cell_region])
+    np.savetxt(tmp_path / 'expected.elem', elements, fmt="Tr %d %d %d %d", header="70", comments='')
+    assert prefix.with_suffix('.elem').read_text() == (tmp_path / 'expected.elem').read_text()